@@ -0,0 +1,166 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from Batch.ZonesBatch import calculer_zones_batch, calculer_zones_tps_batch
+from Batch.VolumePICBatch import calculer_volume_pic_batch
+from Batch.DureePhasesBatch import calculer_Duree_Phases_batch
+
+# Schéma stable des résultats de calculer() en colonnes : zones (bornes dans l'ordre des
+# tuples de calculer(), soit (basse, haute) pour FC et vitesse, (rapide, lente) pour
+# l'allure et le TPS), puis VolumePIC et DureePhases.
+_BORNES = {'fc': ('bas', 'haut'), 'vitesse': ('bas', 'haut'), 'allure': ('rapide', 'lente'), 'tps': ('rapide', 'lente')}
+COLONNES_REELLES = tuple(f'{zones}_z{i}_{borne}' for zones, bornes in _BORNES.items()
+                         for i in range(1, 6) for borne in bornes) + ('VolumePICSecurise', 'VolumePIC')
+COLONNES_ENTIERES = ('phaseGenerale', 'phaseSpecifique', 'phaseAffutage')
+COLONNES = COLONNES_REELLES + COLONNES_ENTIERES
+
+
+class ResultatsBatch:
+    """
+    Résultats de calculer_batch stockés par colonnes.
+
+    Les colonnes réelles forment un seul bloc de forme (colonnes, athlètes) et les phases
+    un bloc d'entiers : chaque colonne est une tranche contiguë du bloc, que l'on peut
+    remettre à NumPy, Arrow ou pandas sans la copier. En précision réduite
+    (dtype=np.float32) les blocs sont en float32 et int16 : moitié moins de mémoire.
+    """
+
+    def __init__(self, nb_athletes, dtype=np.float64):
+        self.nb_athletes = nb_athletes
+        self.reels = np.empty((len(COLONNES_REELLES), nb_athletes), dtype=dtype)
+        self.entiers = np.empty((len(COLONNES_ENTIERES), nb_athletes), dtype=_type_entiers(dtype))
+        self._indices = {nom: (self.reels, i) for i, nom in enumerate(COLONNES_REELLES)}
+        self._indices.update({nom: (self.entiers, i) for i, nom in enumerate(COLONNES_ENTIERES)})
+
+    def __len__(self):
+        return self.nb_athletes
+
+    def colonne(self, nom):
+        """Vue (sans copie) sur une colonne."""
+        bloc, i = self._indices[nom]
+        return bloc[i]
+
+    def tampons(self):
+        """Dictionnaire {colonne: memoryview} exposant les colonnes par le protocole buffer."""
+        return {nom: memoryview(self.colonne(nom)) for nom in COLONNES}
+
+    def vers_arrow(self):
+        """RecordBatch Arrow dont les tampons pointent sur les blocs NumPy (pyarrow requis)."""
+        if pa is None:
+            raise ImportError('pyarrow est nécessaire pour exporter les résultats au format Arrow')
+        tableaux = []
+        for nom in COLONNES:
+            valeurs = self.colonne(nom)
+            tableaux.append(pa.Array.from_buffers(pa.from_numpy_dtype(valeurs.dtype), len(valeurs),
+                                                  [None, pa.py_buffer(valeurs)]))
+        return pa.RecordBatch.from_arrays(tableaux, schema=schema_arrow(self.reels.dtype))
+
+    def vers_dataframe(self):
+        """
+        DataFrame pandas (pandas requis). Le bloc réel est repris tel quel comme bloc
+        interne du DataFrame ; seules les trois colonnes de phases sont ajoutées à part.
+        """
+        if pd is None:
+            raise ImportError('pandas est nécessaire pour exporter les résultats en DataFrame')
+        tableau = pd.DataFrame(self.reels.T, columns=list(COLONNES_REELLES), copy=False)
+        for nom in COLONNES_ENTIERES:
+            tableau[nom] = self.colonne(nom)
+        return tableau
+
+    def ligne(self, i):
+        """Résultat d'un athlète au format de calculer() (tuples imbriqués)."""
+        def zones(prefixe):
+            bornes = _BORNES[prefixe]
+            return tuple((self.colonne(f'{prefixe}_z{z}_{bornes[0]}')[i], self.colonne(f'{prefixe}_z{z}_{bornes[1]}')[i])
+                         for z in range(1, 6))
+        VolumePIC = (self.colonne('VolumePICSecurise')[i], self.colonne('VolumePIC')[i])
+        DureePhases = tuple(int(self.colonne(nom)[i]) for nom in COLONNES_ENTIERES)
+        return (zones('allure'), zones('fc'), zones('vitesse'), zones('tps'), VolumePIC, DureePhases)
+
+
+def _type_entiers(dtype):
+    return np.int64 if np.dtype(dtype) == np.float64 else np.int16
+
+
+def schema_arrow(dtype=np.float64):
+    """Schéma Arrow stable des résultats pour la précision dtype (pyarrow requis)."""
+    if pa is None:
+        raise ImportError('pyarrow est nécessaire pour construire le schéma Arrow')
+    type_reels = pa.from_numpy_dtype(np.dtype(dtype))
+    type_entiers = pa.from_numpy_dtype(np.dtype(_type_entiers(dtype)))
+    return pa.schema([pa.field(nom, type_reels, nullable=False) for nom in COLONNES_REELLES]
+                     + [pa.field(nom, type_entiers, nullable=False) for nom in COLONNES_ENTIERES])
+
+
+def calculer_batch(age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS,
+                   VMA=None, dtype=np.float64):
+    """
+    Version vectorisée de calculer (main.py) sur des tableaux d'athlètes diffusables.
+
+    :param VMA: VMA ajustées remplaçant la formule (NaN : formule), comme dans calculer_zones_batch.
+    :param dtype: np.float64, ou np.float32 pour le mode précision réduite dont les
+                  erreurs maximales sont documentées dans Batch/PrecisionReduite.py.
+    :return: ResultatsBatch (une valeur par athlète et par colonne de COLONNES).
+    """
+    arguments = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x)) for x in (
+        age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS)))
+    age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS = arguments
+    resultats = ResultatsBatch(len(age), dtype)
+
+    if VMA is not None:
+        VMA = np.broadcast_to(np.asarray(VMA, dtype=np.float64), age.shape)
+    zones = calculer_zones_batch(age, sexe, poids, FCRepos, dtype=dtype, VMA=VMA)
+    zones['zonesTPS'] = calculer_zones_tps_batch(zones['zonesAllure'], Distance)
+    # (athlètes, 5, 2) -> 10 lignes consécutives du bloc, dans l'ordre de COLONNES_REELLES
+    for numero, nom in enumerate(('zonesFC', 'zonesVitesse', 'zonesAllure', 'zonesTPS')):
+        resultats.reels[10 * numero:10 * (numero + 1)] = zones[nom].reshape(len(age), 10).T
+
+    VolumePICSecurise, VolumePIC = calculer_volume_pic_batch(
+        VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, zones['VMA'], dtype)
+    resultats.colonne('VolumePICSecurise')[:] = VolumePICSecurise
+    resultats.colonne('VolumePIC')[:] = VolumePIC
+    resultats.entiers[:] = calculer_Duree_Phases_batch(ObjectifDistance, DureeProgramme)
+    return resultats
+
+
+if __name__ == '__main__':
+    from main import calculer
+
+    nb_athletes = int(input("nombre d'athlètes à générer :"))
+    rng = np.random.default_rng(0)
+    arguments = (rng.integers(18, 70, nb_athletes), rng.choice(['H', 'F'], nb_athletes),
+                 rng.integers(45, 100, nb_athletes), rng.integers(40, 80, nb_athletes), 10,
+                 rng.uniform(15, 80, nb_athletes), rng.integers(8, 25, nb_athletes), 10, rng.uniform(35, 70, nb_athletes))
+
+    debut = time.perf_counter()
+    resultats = calculer_batch(*arguments)
+    print(f'\n{nb_athletes} athlètes calculés en {(time.perf_counter() - debut) * 1000:.1f} ms')
+
+    reference = calculer(*(a if np.ndim(a) == 0 else a[0].item() for a in arguments))
+    ecart = np.abs(np.array(resultats.ligne(0)[0]) - np.array(reference[0])).max()
+    print(f'Écart avec calculer() sur le premier athlète : {ecart:.1e} min/km')
+
+    tampons = resultats.tampons()
+    partage = np.shares_memory(np.frombuffer(tampons['VolumePIC'], dtype=np.float64), resultats.reels)
+    print(f"Tampons exposés sans copie : {'oui' if partage else 'non'}")
+    if pa is not None:
+        debut = time.perf_counter()
+        lot = resultats.vers_arrow()
+        print(f'RecordBatch Arrow ({lot.num_columns} colonnes) en {(time.perf_counter() - debut) * 1e6:.0f} µs')
+    if pd is not None:
+        debut = time.perf_counter()
+        tableau = resultats.vers_dataframe()
+        print(f'DataFrame pandas {tableau.shape} en {(time.perf_counter() - debut) * 1e6:.0f} µs')
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+
+def calculer_Duree_Phases_batch(ObjectifDistance, DureeProgramme):
+    """
+    Version vectorisée de calculer_Duree_Phases sur des tableaux diffusables.
+
+    np.rint arrondit au pair le plus proche comme round : les résultats sont
+    identiques à la version scalaire.
+    :return: (phaseGenerale, phaseSpecifique, phaseAffutage) en tableaux d'entiers.
+    """
+    ObjectifDistance = np.asarray(ObjectifDistance, dtype=np.float64)
+    DureeProgramme = np.asarray(DureeProgramme, dtype=np.int64)
+    Kbase = 10
+    K = Kbase + (ObjectifDistance * 0.5)
+    Sd = ObjectifDistance / (21 + K)
+    phaseGenerale = np.rint(((40 + (30 * Sd)) / 100) * DureeProgramme).astype(np.int64)
+    phaseAffutage = np.rint(0.1 * DureeProgramme).astype(np.int64)
+    phaseSpecifique = DureeProgramme - phaseGenerale - phaseAffutage
+    return phaseGenerale, phaseSpecifique, phaseAffutage
+
+
+if __name__ == '__main__':
+    ObjectifDistance = float(input('votre objectif de distance :'))
+    durees = np.arange(4, 53)
+    phaseGenerale, phaseSpecifique, phaseAffutage = calculer_Duree_Phases_batch(ObjectifDistance, durees)
+    print('\nDuree  Generale  Specifique  Affutage')
+    for ligne in zip(durees, phaseGenerale, phaseSpecifique, phaseAffutage):
+        print('{:5d}  {:8d}  {:10d}  {:8d}'.format(*ligne))
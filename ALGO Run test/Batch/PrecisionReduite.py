@@ -0,0 +1,137 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Batch.CalculBatch import calculer_batch, COLONNES_REELLES
+
+# Mode précision réduite : calculer_batch(..., dtype=np.float32) et les fonctions
+# batch de zones et de volume pic acceptent le même paramètre dtype.
+#
+# Erreurs maximales garanties par rapport aux fonctions scalaires de référence
+# (vérifiées par verifier_precision sur toute la plage de GRILLE_VERIFICATION, sans saisie
+# dans l'oracle différentiel : moteur 'precision_reduite' d'Oracle/OracleDifferentiel.py) :
+#   - float32 : erreur relative <= 2e-6 sur toutes les colonnes réelles, soit moins de
+#     0,001 bpm, 0,0001 km/h, 0,01 s/km et 0,001 km de volume pic sous 500 km ;
+#     les phases (int16) sont exactes.
+#   - virgule fixe int16 (compacter_zones) : demi-pas de quantification en plus,
+#     soit 0,05 bpm, 0,005 km/h et 0,05 s/km.
+# Le plus petit écart affiché par les modules de zones (:.0f bpm, :.2f km/h, secondes
+# entières d'allure) est donc respecté, à l'arrondi d'affichage près.
+ERREUR_RELATIVE_FLOAT32 = 2e-6
+# Virgule fixe : valeur entière = round(valeur * échelle), bornée par l'int16
+ECHELLES_FIXES = {
+    'fc': 10,        # dixièmes de bpm
+    'vitesse': 100,  # centièmes de km/h
+    'allure': 600,   # dixièmes de seconde par km (allures en min/km)
+}
+ERREURS_MAX_FIXES = {prefixe: 0.5 / echelle for prefixe, echelle in ECHELLES_FIXES.items()}
+# Plage couverte par la vérification (âge, poids, FCRepos, distance, volume, durée, temps objectif)
+GRILLE_VERIFICATION = {
+    'age': (10, 90), 'poids': (30, 150), 'FCRepos': (30, 100),
+    'VolumeHebdoMoyenDistance': (5, 150), 'DureeProgramme': (4, 52), 'ObjectifTPS': (15, 400),
+}
+DISTANCES_VERIFICATION = (1, 5, 10, 21.0975, 42.195)
+
+
+def compacter_zones(resultats, prefixe):
+    """
+    Colonnes de zones d'un ResultatsBatch en virgule fixe int16, forme (10, athlètes).
+
+    :param prefixe: 'fc', 'vitesse' ou 'allure' (voir ECHELLES_FIXES).
+    """
+    echelle = ECHELLES_FIXES[prefixe]
+    indices = [i for i, nom in enumerate(COLONNES_REELLES) if nom.startswith(prefixe + '_')]
+    valeurs = np.rint(resultats.reels[indices] * echelle)
+    info = np.iinfo(np.int16)
+    if valeurs.size and (valeurs.min() < info.min or valeurs.max() > info.max):
+        raise ValueError(f'zones {prefixe} hors de la plage représentable en int16 (échelle {echelle})')
+    return valeurs.astype(np.int16)
+
+
+def decompacter_zones(valeurs, prefixe):
+    """Inverse de compacter_zones, en float32 et dans les unités des modules de zones."""
+    return valeurs.astype(np.float32) / np.float32(ECHELLES_FIXES[prefixe])
+
+
+def _population(nb_athletes, graine):
+    rng = np.random.default_rng(graine)
+    g = GRILLE_VERIFICATION
+    return (rng.integers(g['age'][0], g['age'][1] + 1, nb_athletes), rng.choice(['H', 'F'], nb_athletes),
+            rng.integers(g['poids'][0], g['poids'][1] + 1, nb_athletes),
+            rng.integers(g['FCRepos'][0], g['FCRepos'][1] + 1, nb_athletes),
+            rng.choice(DISTANCES_VERIFICATION, nb_athletes),
+            rng.uniform(*g['VolumeHebdoMoyenDistance'], nb_athletes),
+            rng.integers(g['DureeProgramme'][0], g['DureeProgramme'][1] + 1, nb_athletes),
+            rng.choice(DISTANCES_VERIFICATION, nb_athletes), rng.uniform(*g['ObjectifTPS'], nb_athletes))
+
+
+def verifier_precision(nb_athletes=200000, nb_scalaires=2000, graine=0):
+    """
+    Vérifie les erreurs maximales documentées et lève AssertionError si l'une est dépassée.
+
+    Les nb_scalaires premiers athlètes sont comparés à calculer() (fonctions scalaires de
+    référence) ; toute la population est comparée à la version float64, elle-même
+    contrôlée contre calculer() sur le même échantillon.
+    :return: dictionnaire {contrôle: (erreur mesurée, borne)}.
+    """
+    from main import calculer
+
+    arguments = _population(nb_athletes, graine)
+    reference = calculer_batch(*arguments)
+    reduit = calculer_batch(*arguments, dtype=np.float32)
+    mesures = {}
+
+    # 1. Float64 vectorisé contre les fonctions scalaires
+    ecart64 = 0.0
+    ecart32 = 0.0
+    for i in range(min(nb_scalaires, nb_athletes)):
+        scalaire = calculer(*(a[i].item() for a in arguments))
+        attendu = np.concatenate([np.ravel(x) for x in scalaire[:5]])
+        for resultats, nom in ((reference, 64), (reduit, 32)):
+            obtenu = np.concatenate([np.ravel(x) for x in resultats.ligne(i)[:5]]).astype(np.float64)
+            ecart = np.max(np.abs(obtenu - attendu) / np.abs(attendu))
+            if nom == 64:
+                ecart64 = max(ecart64, ecart)
+            else:
+                ecart32 = max(ecart32, ecart)
+        assert tuple(reduit.ligne(i)[5]) == tuple(scalaire[5]), f'DureePhases différente pour l\'athlète {i}'
+    mesures['float64 / scalaire (relatif)'] = (ecart64, 1e-12)
+    mesures['float32 / scalaire (relatif)'] = (ecart32, ERREUR_RELATIVE_FLOAT32)
+
+    # 2. Float32 contre float64 sur toute la population
+    relatif = np.abs(reduit.reels.astype(np.float64) - reference.reels) / np.abs(reference.reels)
+    mesures['float32 / float64 (relatif)'] = (float(relatif.max()), ERREUR_RELATIVE_FLOAT32)
+    assert np.array_equal(reduit.entiers, reference.entiers), 'phases différentes en précision réduite'
+
+    # 3. Virgule fixe int16 contre float64
+    for prefixe, borne in ERREURS_MAX_FIXES.items():
+        indices = [i for i, nom in enumerate(COLONNES_REELLES) if nom.startswith(prefixe + '_')]
+        exact = reference.reels[indices]
+        fixe = decompacter_zones(compacter_zones(reduit, prefixe), prefixe).astype(np.float64)
+        tolerance = borne + ERREUR_RELATIVE_FLOAT32 * np.abs(exact).max()
+        mesures[f'int16 {prefixe} (absolu)'] = (float(np.abs(fixe - exact).max()), tolerance)
+
+    for controle, (erreur, borne) in mesures.items():
+        assert erreur <= borne, f'{controle} : erreur {erreur:.3g} > borne {borne:.3g}'
+    return mesures
+
+
+if __name__ == '__main__':
+    nb_athletes = int(input("nombre d'athlètes pour la vérification (ex: 200000) :"))
+    debut = time.perf_counter()
+    mesures = verifier_precision(nb_athletes)
+    print(f'\nVérification réussie en {time.perf_counter() - debut:.1f} s :')
+    for controle, (erreur, borne) in mesures.items():
+        print(f'  {controle:32s} : {erreur:.3g} (borne {borne:.3g})')
+
+    arguments = _population(nb_athletes, 1)
+    reference = calculer_batch(*arguments)
+    reduit = calculer_batch(*arguments, dtype=np.float32)
+    octets64 = reference.reels.nbytes + reference.entiers.nbytes
+    octets32 = reduit.reels.nbytes + reduit.entiers.nbytes
+    print(f'\nMémoire des résultats : {octets64 / 1e6:.1f} Mo en float64, {octets32 / 1e6:.1f} Mo en float32/int16')
+    zones_fixes = sum(compacter_zones(reduit, prefixe).nbytes for prefixe in ECHELLES_FIXES)
+    print(f'Zones FC, vitesse et allure en int16 : {zones_fixes / 1e6:.1f} Mo')
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from VMA.Formule_de_Leger_et_Mercier.Formule_de_Leger_et_Mercier import calculer_formule_de_Leger_Mercier
+from VolumePIC.VolumePIC import calculer_volume_pic
+
+
+def calculer_volume_pic_batch(VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA, dtype=np.float64):
+    """
+    Version vectorisée de calculer_volume_pic : tous les arguments sont des tableaux
+    (ou scalaires) NumPy diffusables entre eux, la VMA étant déjà calculée. Le calcul
+    se fait en dtype (np.float32 pour le mode précision réduite).
+
+    :return: (VolumePICSecurise, VolumePIC) sous forme de tableaux.
+    """
+    VolumeHebdoMoyenDistance = np.asarray(VolumeHebdoMoyenDistance, dtype=dtype)
+    DureeProgramme = np.asarray(DureeProgramme, dtype=dtype)
+    ObjectifDistance = np.asarray(ObjectifDistance, dtype=dtype)
+    ObjectifTPS = np.asarray(ObjectifTPS, dtype=dtype)
+    VMA = np.asarray(VMA, dtype=dtype)
+    VolumePICSecurise = VolumeHebdoMoyenDistance * np.asarray(1.10, dtype=dtype) ** (DureeProgramme - 3)
+    Vcible = ObjectifDistance / ObjectifTPS
+    A = 10 * (Vcible / VMA) - 5
+    VolumePIC = ObjectifDistance * (1 + (A / ObjectifTPS))
+    return VolumePICSecurise, VolumePIC
+
+
+if __name__ == '__main__':
+    import time
+
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    ObjectifDistance = float(input('votre objectif de distance :'))
+    ObjectifTPS = float(input('votre objectif de temps :'))
+    VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
+
+    volumes = np.linspace(10, 100, 1000)[:, None]
+    durees = np.arange(4, 54)[None, :]
+    debut = time.perf_counter()
+    VolumePICSecurise, VolumePIC = calculer_volume_pic_batch(volumes, durees, ObjectifDistance, ObjectifTPS, VMA)
+    duree_batch = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    for volume in volumes[:, 0]:
+        for duree in durees[0]:
+            calculer_volume_pic(age, sexe, poids, FCRepos, volume, duree, ObjectifDistance, ObjectifTPS, VMA=VMA)
+    duree_boucle = time.perf_counter() - debut
+    print(f'\n{VolumePICSecurise.size} combinaisons : {duree_batch * 1000:.2f} ms vectorisé, '
+          f'{duree_boucle * 1000:.1f} ms en boucle Python')
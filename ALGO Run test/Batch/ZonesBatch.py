@@ -0,0 +1,114 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from ZonesAllure.Zones_A import calculer_zones_allure
+from ZonesFC.Methode_de_Karvonen.Zones_FC import calculer_zones_karvonen
+
+# Coefficients des régressions de la chaîne de zones, tels que codés dans
+# FCM.py, K_dynamique.py et Formule_de_Leger_et_Mercier.py. Chaque valeur peut
+# être remplacée par un tableau diffusable (perturbations Monte Carlo).
+COEFFICIENTS = {
+    'fcm_age2': -0.007,
+    'fcm_age': -2.819,
+    'fcm_poids': -0.11,
+    'fcm_constante_H': 1043.554,
+    'fcm_constante_F': 1042.554,
+    'fcm_diviseur': 5,
+    'k_base': 9.2,
+    'k_pente': 1.9,
+    'vma_constante': 2.209,
+    'vma_diviseur': 3.163,
+}
+# Bornes des 5 zones en fraction de FC de réserve / de VMA
+POURCENTAGES_ZONES = np.array([0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+
+
+def calculer_chaine_batch(age, sexe, poids, FCRepos, coefficients=COEFFICIENTS, dtype=np.float64):
+    """
+    FCM, K, VO2max et VMA pour des tableaux d'athlètes (arguments diffusables).
+
+    :param sexe: 'H'/'F' ou tableau de ces chaînes ; toute autre valeur donne une ligne
+                 de NaN, comme calculer_fcm qui retourne None.
+    :param dtype: np.float64, ou np.float32 pour le mode précision réduite (voir PrecisionReduite).
+    :return: dictionnaire de tableaux {'FCM', 'K', 'VO2max', 'VMA'}.
+    """
+    c = coefficients
+    age = np.asarray(age, dtype=dtype)
+    poids = np.asarray(poids, dtype=dtype)
+    FCRepos = np.asarray(FCRepos, dtype=dtype)
+    sexe = np.asarray(sexe)
+    constante = np.asarray(np.where(sexe == 'H', c['fcm_constante_H'],
+                                    np.where(sexe == 'F', c['fcm_constante_F'], np.nan)), dtype=dtype)
+    FCM = (c['fcm_age2'] * age ** 2 + c['fcm_age'] * age + c['fcm_poids'] * poids + constante) / c['fcm_diviseur']
+    rapport = FCM / FCRepos
+    K = c['k_base'] + c['k_pente'] * rapport
+    VO2max = K * rapport
+    VMA = (VO2max - c['vma_constante']) / c['vma_diviseur']
+    return {'FCM': FCM, 'K': K, 'VO2max': VO2max, 'VMA': VMA}
+
+
+def calculer_zones_batch(age, sexe, poids, FCRepos, coefficients=COEFFICIENTS, dtype=np.float64, VMA=None):
+    """
+    Zones FC (Karvonen), de vitesse et d'allure pour des tableaux d'athlètes.
+
+    Les zones ont la forme (..., 5, 2) : bornes (basse, haute) pour la FC et la
+    vitesse, (rapide, lente) pour l'allure comme calculer_zones_allure.
+    :param VMA: VMA ajustées (voir VitesseCritique) qui remplacent celles de la formule ;
+                NaN garde la formule pour l'athlète concerné.
+    :return: le dictionnaire de calculer_chaine_batch complété de
+             'zonesFC', 'zonesVitesse' et 'zonesAllure'.
+    """
+    chaine = calculer_chaine_batch(age, sexe, poids, FCRepos, coefficients, dtype)
+    if VMA is not None:
+        VMA = np.asarray(VMA, dtype=dtype)
+        chaine['VMA'] = np.where(np.isnan(VMA), chaine['VMA'], VMA)
+    chaine.update(calculer_zones_depuis(chaine['FCM'], chaine['VMA'], FCRepos, dtype))
+    return chaine
+
+
+def calculer_zones_depuis(FCM, VMA, FCRepos, dtype=np.float64):
+    """Zones FC, de vitesse et d'allure à partir de FCM et VMA déjà connues (voir calculer_zones_batch)."""
+    pourcentages = POURCENTAGES_ZONES.astype(dtype)
+    FCM = np.asarray(FCM, dtype=dtype)[..., None]
+    FCRepos = np.asarray(FCRepos, dtype=dtype)[..., None]
+    bornesFC = FCRepos + (FCM - FCRepos) * pourcentages
+    bornesV = np.asarray(VMA, dtype=dtype)[..., None] * pourcentages
+    bornesA = 60 / bornesV
+    return {
+        'zonesFC': np.stack([bornesFC[..., :-1], bornesFC[..., 1:]], axis=-1),
+        'zonesVitesse': np.stack([bornesV[..., :-1], bornesV[..., 1:]], axis=-1),
+        'zonesAllure': np.stack([bornesA[..., 1:], bornesA[..., :-1]], axis=-1),
+    }
+
+
+def calculer_zones_tps_batch(zonesAllure, Distance):
+    """Temps (minutes) par zone pour une Distance (km), comme calculer_Zones_TPS."""
+    zonesAllure = np.asarray(zonesAllure)
+    return zonesAllure * np.asarray(Distance, dtype=zonesAllure.dtype)[..., None, None]
+
+
+if __name__ == '__main__':
+    nb_athletes = int(input("nombre d'athlètes à générer :"))
+    rng = np.random.default_rng(0)
+    age = rng.integers(18, 70, nb_athletes)
+    sexe = rng.choice(['H', 'F'], nb_athletes)
+    poids = rng.integers(45, 100, nb_athletes)
+    FCRepos = rng.integers(40, 80, nb_athletes)
+
+    debut = time.perf_counter()
+    zones = calculer_zones_batch(age, sexe, poids, FCRepos)
+    duree_batch = time.perf_counter() - debut
+
+    nb_boucle = min(nb_athletes, 2000)
+    debut = time.perf_counter()
+    for i in range(nb_boucle):
+        allure = calculer_zones_allure(int(age[i]), sexe[i], int(poids[i]), int(FCRepos[i]))
+        fc = calculer_zones_karvonen(int(age[i]), sexe[i], int(poids[i]), int(FCRepos[i]))
+    duree_boucle = (time.perf_counter() - debut) / nb_boucle * nb_athletes
+    ecart = np.abs(zones['zonesAllure'][nb_boucle - 1] - np.array(allure)).max()
+    print(f'\n{nb_athletes} athlètes : {duree_batch * 1000:.1f} ms vectorisé, '
+          f'~{duree_boucle * 1000:.0f} ms en boucle Python (écart max {ecart:.1e} min/km)')
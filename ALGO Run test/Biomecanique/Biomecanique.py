@@ -0,0 +1,200 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from ZonesVitesse.Zones_V import calculer_zones_vitesse
+from Flux.NettoyageFlux import ECART_MAX, decouper
+
+# Flux au format de Flux/NettoyageFlux : 'temps' (s), 'vitesse' (m/s), 'cadence' (pas/min),
+# et si la montre les fournit 'contact_sol' (ms) et 'oscillation' (cm, oscillation
+# verticale). Un canal 'pause' (detecter_pauses) exclut les échantillons concernés.
+# Seuils de l'application (analyzeCadence / analyzeRunBiomechanics)
+PLAGE_CADENCE_OPTIMALE = (170, 190)
+CADENCE_FAIBLE = 165
+CADENCE_OPTIMALE = 175
+# Histogramme de cadence : classes de 2 pas/min
+BORNES_CADENCE = np.arange(100, 252, 2)
+# Grandeurs moyennées par zone, pondérées par la durée des échantillons
+GRANDEURS = ('vitesse', 'cadence', 'longueur_foulee', 'contact_sol', 'duty_factor', 'oscillation', 'ratio_vertical')
+# Zone 0 : sous la zone 1, zone 6 : au-dessus de la zone 5 (vitesse > VMA)
+NOMS_ZONES = ('sous Z1', 'Z1', 'Z2', 'Z3', 'Z4', 'Z5', 'au-dessus Z5')
+
+
+def calculer_longueur_foulee(vitesse, cadence):
+    """Longueur de foulée (m, deux pas) à partir de la vitesse (m/s) et de la cadence (pas/min)."""
+    return 2 * vitesse * 60 / cadence
+
+
+def calculer_duty_factor(contact_sol, cadence):
+    """
+    Fraction du cycle de foulée passée au sol par un pied : temps de contact (ms)
+    rapporté à la durée d'une foulée, 2 * 60 / cadence secondes.
+    """
+    return contact_sol / 1000 / (2 * 60 / cadence)
+
+
+def analyser_cadence(cadence_moyenne):
+    """Conseil de cadence de l'application pour une cadence moyenne (pas/min)."""
+    if not cadence_moyenne:
+        return 'Pas de données de cadence'
+    if cadence_moyenne < CADENCE_FAIBLE:
+        return (f'Cadence faible ({cadence_moyenne:.0f}) : raccourcissez la foulée '
+                f'(cible {PLAGE_CADENCE_OPTIMALE[0]}-{PLAGE_CADENCE_OPTIMALE[1]} pas/min)')
+    if cadence_moyenne > PLAGE_CADENCE_OPTIMALE[1]:
+        return 'Cadence élevée : réduisez-la pour économiser l\'énergie'
+    if cadence_moyenne > CADENCE_OPTIMALE:
+        return f'Cadence optimale ({cadence_moyenne:.0f})'
+    return f'Cadence correcte ({cadence_moyenne:.0f})'
+
+
+def bornes_zones(zonesVitesse):
+    """Six bornes croissantes (m/s) des zones de calculer_zones_vitesse (km/h)."""
+    return np.array([zonesVitesse[0][0]] + [zone[1] for zone in zonesVitesse]) / 3.6
+
+
+class AnalyseBiomecanique:
+    """
+    Réductions par morceaux d'un flux de course : distribution de cadence et moyennes
+    des grandeurs de GRANDEURS par zone de vitesse.
+
+    Chaque morceau est réduit à quelques sommes (np.bincount sur l'indice de zone) : la
+    mémoire ne dépend pas de la longueur du flux et le résultat est le même que le flux
+    soit traité d'un bloc ou par morceaux. Chaque échantillon pèse la durée écoulée
+    depuis le précédent (0 après un trou de plus de ecart_max secondes).
+    """
+
+    def __init__(self, zonesVitesse, ecart_max=ECART_MAX):
+        self.bornes = bornes_zones(zonesVitesse)
+        self.ecart_max = ecart_max
+        nb_zones = len(NOMS_ZONES)
+        self.duree_zones = np.zeros(nb_zones)
+        self.sommes = {grandeur: np.zeros(nb_zones) for grandeur in GRANDEURS}
+        self.poids = {grandeur: np.zeros(nb_zones) for grandeur in GRANDEURS}
+        self.histogramme = np.zeros(len(BORNES_CADENCE) - 1)
+        self.somme_cadence2 = 0.0
+        self._dernier_temps = None
+
+    def ajouter(self, morceau):
+        temps = np.asarray(morceau['temps'], dtype=np.float64)
+        if not len(temps):
+            return
+        precedent = temps[0] if self._dernier_temps is None else self._dernier_temps
+        duree = np.diff(temps, prepend=precedent)
+        duree[duree > self.ecart_max] = 0.0
+        self._dernier_temps = temps[-1]
+        if 'pause' in morceau:
+            duree[np.asarray(morceau['pause'], dtype=bool)] = 0.0
+
+        vitesse = np.asarray(morceau['vitesse'], dtype=np.float64)
+        cadence = np.asarray(morceau['cadence'], dtype=np.float64) if 'cadence' in morceau else np.full(len(temps), np.nan)
+        valeurs = {'vitesse': vitesse, 'cadence': cadence}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cadence_valide = np.where(cadence > 0, cadence, np.nan)
+            valeurs['longueur_foulee'] = calculer_longueur_foulee(vitesse, cadence_valide)
+            if 'contact_sol' in morceau:
+                valeurs['contact_sol'] = np.asarray(morceau['contact_sol'], dtype=np.float64)
+                valeurs['duty_factor'] = calculer_duty_factor(valeurs['contact_sol'], cadence_valide)
+            if 'oscillation' in morceau:
+                valeurs['oscillation'] = np.asarray(morceau['oscillation'], dtype=np.float64)
+                # Oscillation (cm) rapportée à la longueur d'un pas (m), en %
+                valeurs['ratio_vertical'] = valeurs['oscillation'] / (valeurs['longueur_foulee'] / 2)
+
+        # Vitesse NaN : échantillon sans zone, ignoré (searchsorted place NaN en dernier)
+        zone = np.searchsorted(self.bornes, vitesse, side='right')
+        dans_zone = ~np.isnan(vitesse)
+        zone, duree_zone = zone[dans_zone], duree[dans_zone]
+        nb_zones = len(NOMS_ZONES)
+        self.duree_zones += np.bincount(zone, weights=duree_zone, minlength=nb_zones)
+        for grandeur, serie in valeurs.items():
+            serie = serie[dans_zone]
+            valide = np.isfinite(serie)
+            poids = np.where(valide, duree_zone, 0.0)
+            self.sommes[grandeur] += np.bincount(zone, weights=np.where(valide, serie, 0.0) * poids, minlength=nb_zones)
+            self.poids[grandeur] += np.bincount(zone, weights=poids, minlength=nb_zones)
+
+        courue = np.isfinite(cadence) & (cadence > 0)
+        self.histogramme += np.histogram(cadence[courue], BORNES_CADENCE, weights=duree[courue])[0]
+        self.somme_cadence2 += float(np.dot(cadence[courue] ** 2, duree[courue]))
+
+    def resultat(self):
+        """
+        :return: {'zones': {grandeur: moyenne par zone (NOMS_ZONES), 'duree': s par zone},
+                  'cadence': {'moyenne', 'ecart_type', 'p10', 'p50', 'p90',
+                  'part_optimale' (fraction du temps dans PLAGE_CADENCE_OPTIMALE),
+                  'histogramme' (s par classe de BORNES_CADENCE), 'conseil'}}.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            zones = {grandeur: self.sommes[grandeur] / self.poids[grandeur] for grandeur in GRANDEURS}
+        zones['duree'] = self.duree_zones.copy()
+
+        duree_cadence = self.poids['cadence'].sum()
+        cadence = {'histogramme': self.histogramme.copy()}
+        if duree_cadence > 0:
+            moyenne = self.sommes['cadence'].sum() / duree_cadence
+            cadence['moyenne'] = moyenne
+            cadence['ecart_type'] = float(np.sqrt(max(self.somme_cadence2 / duree_cadence - moyenne ** 2, 0.0)))
+            # Percentiles interpolés dans les classes de l'histogramme
+            cumul = np.concatenate(([0.0], np.cumsum(self.histogramme))) / max(self.histogramme.sum(), 1e-12)
+            for p in (10, 50, 90):
+                cadence[f'p{p}'] = float(np.interp(p / 100, cumul, BORNES_CADENCE))
+            centres = (BORNES_CADENCE[:-1] + BORNES_CADENCE[1:]) / 2
+            optimale = (centres >= PLAGE_CADENCE_OPTIMALE[0]) & (centres <= PLAGE_CADENCE_OPTIMALE[1])
+            cadence['part_optimale'] = float(self.histogramme[optimale].sum() / max(self.histogramme.sum(), 1e-12))
+        else:
+            moyenne = None
+            cadence.update(moyenne=np.nan, ecart_type=np.nan, p10=np.nan, p50=np.nan, p90=np.nan, part_optimale=0.0)
+        cadence['conseil'] = analyser_cadence(moyenne)
+        return {'zones': zones, 'cadence': cadence}
+
+
+def analyser_flux(morceaux, zonesVitesse, ecart_max=ECART_MAX):
+    """Analyse biomécanique d'un flux découpé en morceaux (voir AnalyseBiomecanique.resultat)."""
+    analyse = AnalyseBiomecanique(zonesVitesse, ecart_max)
+    for morceau in morceaux:
+        analyse.ajouter(morceau)
+    return analyse.resultat()
+
+
+def _generer_flux_course(n, graine=0):
+    # Sortie à ~1 Hz alternant endurance et fractions rapides, avec capteurs de foulée
+    rng = np.random.default_rng(graine)
+    temps = np.cumsum(rng.uniform(0.9, 1.1, n))
+    rapide = (temps // 300) % 4 == 3
+    vitesse = np.where(rapide, 4.4, 3.1) + rng.normal(0, 0.1, n)
+    cadence = np.where(rapide, 182, 166) + rng.normal(0, 3, n)
+    contact_sol = np.where(rapide, 215, 255) + rng.normal(0, 8, n)
+    oscillation = np.where(rapide, 8.6, 9.4) + rng.normal(0, 0.4, n)
+    cadence[rng.random(n) < 0.01] = np.nan
+    return {'temps': temps, 'vitesse': vitesse, 'cadence': cadence, 'contact_sol': contact_sol,
+            'oscillation': oscillation}
+
+
+if __name__ == '__main__':
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    zonesVitesse = calculer_zones_vitesse(age, sexe, poids, FCRepos)
+
+    flux = _generer_flux_course(3600)
+    resultat = analyser_flux(decouper(flux, 1000), zonesVitesse)
+    cadence = resultat['cadence']
+    print(f"\nCadence : {cadence['moyenne']:.0f} ± {cadence['ecart_type']:.0f} pas/min "
+          f"(p10 {cadence['p10']:.0f}, p50 {cadence['p50']:.0f}, p90 {cadence['p90']:.0f}), "
+          f"{cadence['part_optimale'] * 100:.0f} % du temps dans la plage optimale")
+    print(cadence['conseil'])
+    zones = resultat['zones']
+    print('\nZone           durée   cadence  foulée  contact  duty factor  ratio vertical')
+    for i, nom in enumerate(NOMS_ZONES):
+        if zones['duree'][i] > 0:
+            print(f"{nom:13s} {zones['duree'][i] / 60:5.1f} min {zones['cadence'][i]:6.0f}  {zones['longueur_foulee'][i]:5.2f} m"
+                  f"  {zones['contact_sol'][i]:4.0f} ms  {zones['duty_factor'][i]:10.2f}  {zones['ratio_vertical'][i]:11.1f} %")
+
+    # Retraitement en masse : un flux long traité par morceaux
+    flux = _generer_flux_course(5000000, 1)
+    debut = time.perf_counter()
+    analyser_flux(decouper(flux), zonesVitesse)
+    print(f"\n{len(flux['temps'])} échantillons analysés en {time.perf_counter() - debut:.2f} s")
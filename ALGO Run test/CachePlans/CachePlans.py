@@ -0,0 +1,241 @@
+import sys
+import os
+import json
+import time
+import hashlib
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import fcntl
+except ImportError:  # Windows : l'éviction se fait sans verrou inter-processus
+    fcntl = None
+
+from beta import calculer_profil, generer_plan_structure, formater_plan
+
+# À incrémenter à chaque changement des formules ou de la génération du plan :
+# les anciennes entrées ne sont alors plus jamais relues et finissent évincées.
+VERSION_FORMULES = 3
+TAILLE_MAX_DEFAUT = 256 * 1024 * 1024
+# Nombre de plans gardés en mémoire (premier niveau, propre au processus)
+NB_PLANS_MEMOIRE_DEFAUT = 1024
+EXTENSION = '.json'
+
+
+def normaliser_entrees(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS):
+    """
+    Forme canonique des entrées du plan : types fixés et arrondis à la précision
+    utile, pour que deux saisies équivalentes donnent la même clé.
+    """
+    return {
+        'age': int(age),
+        'sexe': str(sexe).strip().upper(),
+        'poids': round(float(poids), 1),
+        'FCRepos': int(round(float(FCRepos))),
+        'VolumeHebdoMoyenDistance': round(float(VolumeHebdoMoyenDistance), 1),
+        'DureeProgramme': int(DureeProgramme),
+        'ObjectifDistance': round(float(ObjectifDistance), 3),
+        'ObjectifTPS': round(float(ObjectifTPS), 1),
+    }
+
+
+def calculer_cle(entrees):
+    """Empreinte SHA-256 des entrées normalisées et de la version des formules."""
+    canonique = json.dumps({'version': VERSION_FORMULES, 'entrees': entrees},
+                           sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonique.encode()).hexdigest()
+
+
+def copier_plan(semaines):
+    """
+    Copie d'un plan structuré : semaines et séances sont des dictionnaires neufs, les
+    valeurs (nombres, chaînes, couples) sont immuables et partagées.
+    """
+    return [dict(semaine, seances=[dict(seance) for seance in semaine['seances']]) for semaine in semaines]
+
+
+def restaurer_plan(semaines):
+    """Plan relu du JSON : les couples 'allure' et 'fc' redeviennent des tuples, comme à la génération."""
+    for semaine in semaines:
+        for seance in semaine['seances']:
+            seance['allure'] = tuple(seance['allure'])
+            seance['fc'] = tuple(seance['fc'])
+    return semaines
+
+
+class CachePlans:
+    """
+    Cache des plans adressé par contenu, à deux niveaux : une LRU en mémoire propre au
+    processus, puis un cache disque partageable entre processus.
+
+    Sur disque, chaque plan est un fichier JSON rangé dans un sous-dossier de 256
+    répertoires (deux premiers caractères de la clé). Les écritures passent par un
+    fichier temporaire renommé avec os.replace : un lecteur voit l'ancien fichier ou le
+    nouveau, jamais un fichier partiel. Quand la taille dépasse taille_max, les entrées
+    les moins récemment utilisées (mtime) sont supprimées jusqu'à revenir à 90 % de la
+    limite, sous un verrou de fichier.
+
+    Les lectures servies par la mémoire ne touchent pas le disque : la date de dernière
+    utilisation est gardée en mémoire et reportée sur le mtime du fichier quand le plan
+    sort de la LRU, ou avant une éviction disque.
+    """
+
+    def __init__(self, dossier='cache_plans', taille_max=TAILLE_MAX_DEFAUT, nb_plans_memoire=NB_PLANS_MEMOIRE_DEFAUT):
+        self.dossier = Path(dossier)
+        self.taille_max = taille_max
+        self.nb_plans_memoire = nb_plans_memoire
+        # cle -> (plan, date de dernière utilisation), du moins au plus récemment utilisé
+        self._memoire = OrderedDict()
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        self._chemin_verrou = self.dossier / '.verrou'
+        # Estimation locale de la taille, recalculée exactement lors de chaque éviction
+        self._taille_estimee = self._mesurer()[1]
+
+    def _chemin(self, cle):
+        return self.dossier / cle[:2] / (cle + EXTENSION)
+
+    def _mesurer(self):
+        entrees = []
+        total = 0
+        for sous_dossier in os.scandir(self.dossier):
+            if not sous_dossier.is_dir():
+                continue
+            for entree in os.scandir(sous_dossier.path):
+                if not entree.name.endswith(EXTENSION):
+                    continue
+                try:
+                    stat = entree.stat()
+                except FileNotFoundError:  # évincée par un autre processus
+                    continue
+                entrees.append((stat.st_mtime, stat.st_size, entree.path))
+                total += stat.st_size
+        return entrees, total
+
+    def _memoriser(self, cle, plan):
+        self._memoire[cle] = (plan, time.time())
+        self._memoire.move_to_end(cle)
+        while len(self._memoire) > self.nb_plans_memoire:
+            ancienne, (_, date) = self._memoire.popitem(last=False)
+            self._dater(ancienne, date)
+
+    def _dater(self, cle, date):
+        try:
+            os.utime(self._chemin(cle), (date, date))
+        except OSError:  # évincée entre-temps
+            pass
+
+    def lire(self, cle):
+        """Copie du plan associé à la clé, ou None s'il est absent ou illisible."""
+        entree = self._memoire.get(cle)
+        if entree is not None:
+            self._memoire[cle] = (entree[0], time.time())
+            self._memoire.move_to_end(cle)
+            return copier_plan(entree[0])
+        chemin = self._chemin(cle)
+        try:
+            with open(chemin, 'rb') as fichier:
+                donnees = fichier.read()
+        except FileNotFoundError:
+            return None
+        try:
+            plan = restaurer_plan(json.loads(donnees))
+        except (ValueError, KeyError, TypeError):
+            self._supprimer(chemin)
+            return None
+        self._memoriser(cle, plan)
+        return copier_plan(plan)
+
+    def ecrire(self, cle, plan):
+        chemin = self._chemin(cle)
+        chemin.parent.mkdir(exist_ok=True)
+        donnees = json.dumps(plan, separators=(',', ':')).encode()
+        descripteur, temporaire = tempfile.mkstemp(dir=chemin.parent, suffix='.tmp')
+        try:
+            with os.fdopen(descripteur, 'wb') as fichier:
+                fichier.write(donnees)
+            os.replace(temporaire, chemin)
+        except BaseException:
+            self._supprimer(temporaire)
+            raise
+        self._memoriser(cle, copier_plan(plan))
+        self._taille_estimee += len(donnees)
+        if self._taille_estimee > self.taille_max:
+            self.evincer()
+
+    def _supprimer(self, chemin):
+        try:
+            os.remove(chemin)
+        except FileNotFoundError:
+            pass
+
+    def evincer(self):
+        """Supprime les entrées les plus anciennes jusqu'à 90 % de taille_max."""
+        with open(self._chemin_verrou, 'a') as verrou:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(verrou, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Un autre processus évince déjà : inutile de l'attendre
+                    self._taille_estimee = 0
+                    return
+            # Les plans servis depuis la mémoire sont datés avant de trier par mtime
+            for cle, (_, date) in self._memoire.items():
+                self._dater(cle, date)
+            entrees, total = self._mesurer()
+            cible = 0.9 * self.taille_max
+            entrees.sort()
+            for _, taille, chemin in entrees:
+                if total <= cible:
+                    break
+                self._supprimer(chemin)
+                total -= taille
+            self._taille_estimee = total
+
+    def vider(self):
+        self._memoire.clear()
+        for _, _, chemin in self._mesurer()[0]:
+            self._supprimer(chemin)
+        self._taille_estimee = 0
+
+
+def generer_plan_en_cache(cache, age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS):
+    """
+    Plan structuré (voir generer_plan_structure) servi depuis le cache s'il existe,
+    calculé puis mis en cache sinon.
+    """
+    entrees = normaliser_entrees(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance,
+                                 DureeProgramme, ObjectifDistance, ObjectifTPS)
+    cle = calculer_cle(entrees)
+    semaines = cache.lire(cle)
+    if semaines is None:
+        profil = calculer_profil(**entrees)
+        semaines = generer_plan_structure(profil)
+        cache.ecrire(cle, semaines)
+    return semaines
+
+
+if __name__ == '__main__':
+    dossier = input('dossier du cache (ex: cache_plans) :')
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    VolumeHebdoMoyenDistance = float(input('votre volume hebdomadaire moyen :'))
+    DureeProgramme = int(input('la duree du programme (semaines) :'))
+    ObjectifDistance = float(input('votre objectif de distance :'))
+    ObjectifTPS = float(input('votre objectif de temps :'))
+    cache = CachePlans(dossier)
+    arguments = (age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS)
+
+    debut = time.perf_counter()
+    semaines = generer_plan_en_cache(cache, *arguments)
+    print(f'\nPremier appel : {(time.perf_counter() - debut) * 1e6:.0f} µs')
+
+    nb_appels = 1000
+    debut = time.perf_counter()
+    for _ in range(nb_appels):
+        generer_plan_en_cache(cache, *arguments)
+    print(f'Appel servi par le cache : {(time.perf_counter() - debut) / nb_appels * 1e6:.0f} µs')
+    print(formater_plan(semaines))
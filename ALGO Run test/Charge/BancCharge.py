@@ -0,0 +1,195 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Charge.Population import CHAMPS, generer_population, profil
+
+SCENARIOS = ('scalaire', 'plan', 'batch', 'cli', 'async')
+PERCENTILES = (50, 95, 99)
+TAILLE_LOT_BATCH = 1000
+CHEMIN_MAIN = str(Path(__file__).parent.parent / 'main.py')
+
+
+def resumer(latences, duree, concurrence, scenario, unites_par_requete=1, services=None):
+    """
+    Rapport d'un scénario : latences (ms) p50/p95/p99, moyenne et max, débit en requêtes/s.
+
+    :param latences: de la soumission de chaque requête à sa fin, vues du processus principal.
+    :param services: temps d'exécution mesurés dans le travailleur (sans file d'attente ni
+                     transfert), résumés sous les clés service_p50, service_p95...
+    """
+    latences = np.asarray(latences, dtype=np.float64) * 1000
+    rapport = {'scenario': scenario, 'concurrence': concurrence, 'nb_requetes': len(latences), 'duree': duree,
+               'debit': len(latences) / duree, 'debit_athletes': len(latences) * unites_par_requete / duree,
+               'moyenne': float(latences.mean()), 'max': float(latences.max())}
+    for p, valeur in zip(PERCENTILES, np.percentile(latences, PERCENTILES)):
+        rapport[f'p{p}'] = float(valeur)
+    if services is not None:
+        services = np.asarray(services, dtype=np.float64) * 1000
+        rapport['service_moyenne'] = float(services.mean())
+        for p, valeur in zip(PERCENTILES, np.percentile(services, PERCENTILES)):
+            rapport[f'service_p{p}'] = float(valeur)
+    return rapport
+
+
+# Chaque requête retourne son temps de service, chronométré dans le processus qui
+# l'exécute ; la latence est mesurée à part, depuis le processus principal.
+def _requete_scalaire(arguments):
+    from main import calculer
+    debut = time.perf_counter()
+    calculer(*arguments)
+    return time.perf_counter() - debut
+
+
+def _requete_plan(arguments):
+    from beta import calculer_profil, generer_plan_entrainement_complet
+    age, sexe, poids, FCRepos, _, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS = arguments
+    debut = time.perf_counter()
+    generer_plan_entrainement_complet(calculer_profil(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance,
+                                                      DureeProgramme, ObjectifDistance, ObjectifTPS))
+    return time.perf_counter() - debut
+
+
+def _requete_batch(colonnes):
+    from Batch.CalculBatch import calculer_batch
+    debut = time.perf_counter()
+    calculer_batch(*(colonnes[champ] for champ in CHAMPS))
+    return time.perf_counter() - debut
+
+
+def _requete_cli(arguments):
+    # Le programme interactif reçoit ses réponses sur l'entrée standard, dans l'ordre de ses input()
+    age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS = arguments
+    reponses = [age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, ObjectifDistance, ObjectifTPS,
+                DureeProgramme, '']
+    debut = time.perf_counter()
+    subprocess.run([sys.executable, CHEMIN_MAIN], input='\n'.join(map(str, reponses)) + '\n', text=True,
+                   capture_output=True, check=True, cwd=os.path.dirname(CHEMIN_MAIN))
+    return time.perf_counter() - debut
+
+
+_REQUETES = {'scalaire': _requete_scalaire, 'plan': _requete_plan, 'batch': _requete_batch, 'cli': _requete_cli}
+
+
+def _executer(requete, charges, concurrence, processus):
+    # Boucle fermée : concurrence clients soumettent chacun leur requête suivante dès que la
+    # précédente est terminée ; la latence de chaque requête part de sa propre soumission
+    suivantes = iter(enumerate(charges))
+    verrou = threading.Lock()
+    latences = [None] * len(charges)
+    services = [None] * len(charges)
+
+    def client(executer):
+        while True:
+            with verrou:
+                suivante = next(suivantes, None)
+            if suivante is None:
+                return
+            i, charge = suivante
+            soumission = time.perf_counter()
+            services[i] = executer(charge)
+            latences[i] = time.perf_counter() - soumission
+
+    if concurrence <= 1:
+        requete(charges[0])   # imports et caches chargés hors mesure
+        debut = time.perf_counter()
+        client(requete)
+        return latences, services, time.perf_counter() - debut
+    # Calcul pur Python : des processus contournent le GIL ; la CLI n'a besoin que de threads.
+    # Les clients sont des threads du processus principal qui attendent leur résultat.
+    executeur = ProcessPoolExecutor if processus else ThreadPoolExecutor
+    with executeur(max_workers=concurrence) as pool, ThreadPoolExecutor(max_workers=concurrence) as clients:
+        # Démarrage des travailleurs hors mesure
+        list(pool.map(requete, charges[:1] * concurrence))
+        debut = time.perf_counter()
+        travaux = [clients.submit(client, lambda charge: pool.submit(requete, charge).result())
+                   for _ in range(concurrence)]
+        for travail in travaux:
+            travail.result()
+        duree = time.perf_counter() - debut
+    return latences, services, duree
+
+
+async def _synchroniser(nb_athletes, concurrence, activites_par_athlete):
+    from Historique.StockageActivites import StockageActivites
+    from Synchronisation.ClientSync import ClientSync
+    from Synchronisation.FournisseurMock import FournisseurMock
+
+    fournisseur = FournisseurMock(activites_par_athlete=activites_par_athlete, latence=0.005, limite_requetes=100000)
+    port = await fournisseur.demarrer()
+    client = ClientSync('127.0.0.1', port, concurrence=concurrence, taille_pool=concurrence)
+    stockage = StockageActivites(':memory:')
+    suivants = iter(range(nb_athletes))
+    latences = []
+
+    async def synchroniser():
+        # Boucle fermée, comme _executer : athlète suivant dès la fin du précédent
+        for i in suivants:
+            soumission = time.perf_counter()
+            await client.synchroniser_incremental(f'charge{i}', stockage)
+            latences.append(time.perf_counter() - soumission)
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(synchroniser() for _ in range(concurrence)))
+    duree = time.perf_counter() - debut
+    await client.fermer()
+    await fournisseur.arreter()
+    stockage.fermer()
+    # Sans file d'attente côté banc, le service d'une synchronisation est sa latence
+    return latences, latences, duree
+
+
+def mesurer(scenario, nb_requetes, concurrence=1, graine=0, taille_lot=TAILLE_LOT_BATCH, activites_par_athlete=20):
+    """
+    Exécute nb_requetes requêtes d'un scénario de SCENARIOS à la concurrence demandée.
+
+    'scalaire' et 'plan' appellent calculer() et la génération de plan par athlète,
+    'batch' calculer_batch par lots de taille_lot athlètes, 'cli' lance main.py en
+    sous-processus et 'async' synchronise un athlète par requête contre le fournisseur
+    simulé. La population est générée avec graine : deux mesures sont comparables.
+    Charge en boucle fermée : concurrence clients enchaînent chacun leurs requêtes, la
+    latence va de la soumission de chaque requête à sa fin vue du processus principal
+    (transfert compris), le temps de service est mesuré dans le travailleur.
+    :return: rapport de resumer().
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f'scénario inconnu : {scenario} (choix : {", ".join(SCENARIOS)})')
+    if scenario == 'async':
+        latences, services, duree = asyncio.run(_synchroniser(nb_requetes, concurrence, activites_par_athlete))
+        return resumer(latences, duree, concurrence, scenario, services=services)
+
+    if scenario == 'batch':
+        population = generer_population(nb_requetes * taille_lot, graine)
+        charges = [{champ: population[champ][i:i + taille_lot] for champ in CHAMPS}
+                   for i in range(0, nb_requetes * taille_lot, taille_lot)]
+    else:
+        population = generer_population(nb_requetes, graine)
+        charges = [profil(population, i) for i in range(nb_requetes)]
+    latences, services, duree = _executer(_REQUETES[scenario], charges, concurrence, processus=scenario != 'cli')
+    return resumer(latences, duree, concurrence, scenario, taille_lot if scenario == 'batch' else 1, services)
+
+
+def afficher_rapport(rapport):
+    print(f"{rapport['scenario']:9s} x{rapport['concurrence']:<3d} {rapport['nb_requetes']:6d} req  "
+          f"p50 {rapport['p50']:8.2f} ms  p95 {rapport['p95']:8.2f} ms  p99 {rapport['p99']:8.2f} ms  "
+          f"{rapport['debit']:9.1f} req/s  {rapport['debit_athletes']:10.0f} athlètes/s  "
+          f"service p50 {rapport['service_p50']:7.2f} ms  p99 {rapport['service_p99']:7.2f} ms")
+
+
+if __name__ == '__main__':
+    scenarios = input(f'scénarios séparés par des virgules ({", ".join(SCENARIOS)}) :').replace(' ', '').split(',')
+    nb_requetes = int(input('nombre de requêtes par scénario :'))
+    concurrences = [int(c) for c in input('niveaux de concurrence (ex: 1,4) :').split(',')]
+    print()
+    for scenario in scenarios:
+        for concurrence in concurrences:
+            nombre = max(1, nb_requetes // 50) if scenario == 'cli' else nb_requetes
+            afficher_rapport(mesurer(scenario, nombre, concurrence))
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Batch.ZonesBatch import calculer_chaine_batch
+
+# Ordre des arguments de calculer() (main.py) et de calculer_batch
+CHAMPS = ('age', 'sexe', 'poids', 'FCRepos', 'Distance', 'VolumeHebdoMoyenDistance', 'DureeProgramme',
+          'ObjectifDistance', 'ObjectifTPS')
+OBJECTIFS = (5, 10, 21.0975, 42.195)
+PART_OBJECTIFS = (0.25, 0.35, 0.25, 0.15)
+# Fraction de VMA tenue sur la distance objectif (coureurs amateurs)
+FRACTIONS_VMA = (0.90, 0.85, 0.80, 0.75)
+PART_HOMMES = 0.55
+
+
+def generer_population(nb_athletes, graine=0):
+    """
+    Population d'athlètes réaliste et reproductible (même graine, mêmes athlètes).
+
+    Âge, poids et FC de repos suivent des lois normales bornées, le volume une loi
+    log-normale ; le temps objectif (minutes) découle de la VMA de la formule et d'une
+    fraction de VMA propre à chaque distance, à ±7 % près.
+    :return: dictionnaire de colonnes NumPy {champ de CHAMPS: tableau}.
+    """
+    rng = np.random.default_rng(graine)
+    homme = rng.random(nb_athletes) < PART_HOMMES
+    population = {
+        'age': np.clip(np.rint(rng.normal(38, 11, nb_athletes)), 16, 75).astype(np.int64),
+        'sexe': np.where(homme, 'H', 'F'),
+        'poids': np.clip(np.rint(np.where(homme, rng.normal(75, 10, nb_athletes), rng.normal(62, 9, nb_athletes))),
+                         40, 130).astype(np.int64),
+        'FCRepos': np.clip(np.rint(rng.normal(60, 8, nb_athletes)), 40, 90).astype(np.int64),
+        'VolumeHebdoMoyenDistance': np.round(np.clip(rng.lognormal(np.log(25), 0.5, nb_athletes), 5, 120), 1),
+        'DureeProgramme': rng.integers(8, 25, nb_athletes),
+    }
+    objectif = rng.choice(len(OBJECTIFS), nb_athletes, p=PART_OBJECTIFS)
+    population['ObjectifDistance'] = np.array(OBJECTIFS)[objectif]
+    population['Distance'] = population['ObjectifDistance']
+    VMA = calculer_chaine_batch(population['age'], population['sexe'], population['poids'], population['FCRepos'])['VMA']
+    vitesse = VMA * np.array(FRACTIONS_VMA)[objectif] * rng.normal(1, 0.07, nb_athletes)
+    population['ObjectifTPS'] = np.round(population['ObjectifDistance'] / vitesse * 60, 1)
+    return population
+
+
+def profil(population, i):
+    """Arguments de calculer() pour l'athlète i, en scalaires Python."""
+    return tuple(population[champ][i].item() for champ in CHAMPS)
+
+
+def profils(population):
+    """Itère sur les arguments de calculer() de toute la population."""
+    for i in range(len(population['age'])):
+        yield profil(population, i)
+
+
+def generer_flux_activite(population, i, duree=3600, graine=0):
+    """
+    Flux d'une sortie d'endurance de l'athlète i à 1 Hz : {'temps', 'fc', 'cadence', 'vitesse'}.
+
+    La FC dérive lentement dans la zone 2 (Karvonen) et la vitesse suit la VMA de la formule.
+    """
+    rng = np.random.default_rng((graine, i))
+    chaine = calculer_chaine_batch(population['age'][i], population['sexe'][i], population['poids'][i],
+                                   population['FCRepos'][i])
+    FCRepos = population['FCRepos'][i]
+    temps = np.arange(duree, dtype=np.float64)
+    derive = temps / duree * 0.05
+    fc = FCRepos + (chaine['FCM'] - FCRepos) * (0.65 + derive) + rng.normal(0, 2, duree)
+    vitesse = chaine['VMA'] / 3.6 * 0.65 + rng.normal(0, 0.1, duree)
+    return {'temps': temps, 'fc': fc, 'cadence': rng.normal(170, 4, duree), 'vitesse': vitesse}
+
+
+if __name__ == '__main__':
+    nb_athletes = int(input("nombre d'athlètes à générer :"))
+    graine = int(input('graine :'))
+    population = generer_population(nb_athletes, graine)
+    print(f"\n{nb_athletes} athlètes, {np.mean(population['sexe'] == 'H') * 100:.0f} % d'hommes")
+    for champ in CHAMPS:
+        if champ != 'sexe':
+            valeurs = population[champ]
+            print(f'{champ:26s} : médiane {np.median(valeurs):.1f}, de {valeurs.min():.1f} à {valeurs.max():.1f}')
+    print(f'Premier athlète : {profil(population, 0)}')
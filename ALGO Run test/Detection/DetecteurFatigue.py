@@ -0,0 +1,204 @@
+import sys
+import bisect
+import math
+import time
+from collections import deque
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from FCM.FCM import calculer_fcm
+
+# Types d'événements émis
+FATIGUE = 'FATIGUE'                    # FC de repos durablement au-dessus de la ligne de base
+PIC_FC = 'PIC_FC'                      # échantillon isolé très loin de la médiane glissante
+FC_HORS_LIMITES = 'FC_HORS_LIMITES'    # valeur physiologiquement impossible (capteur)
+FC_AU_DESSUS_FCM = 'FC_AU_DESSUS_FCM'  # médiane au-dessus de la FCM pendant trop longtemps
+
+# Ligne de base de la FC de repos : EWMA sur environ 20 mesures
+ALPHA_REPOS = 0.1
+ECART_TYPE_REPOS_INITIAL = 3.0
+Z_FATIGUE = 2.0
+ECART_MIN_FATIGUE = 5.0   # bpm au-dessus de la ligne de base
+JOURS_FATIGUE = 2         # mesures consécutives avant de signaler
+# Flux d'effort (1 échantillon par seconde)
+FENETRE_MEDIANE = 15
+ALPHA_ECART = 0.05
+Z_PIC = 4.0
+ECART_MIN_PIC = 20.0      # bpm
+FC_MIN_PHYSIOLOGIQUE = 30
+MARGE_FCM = 1.10          # au-delà de 110 % de la FCM, la valeur est rejetée
+DUREE_MAX_AU_DESSUS_FCM = 60
+
+
+class MedianeGlissante:
+    """
+    Médiane des taille dernières valeurs, tenues triées dans une liste (bisect).
+
+    La mémoire est bornée par la fenêtre : chaque valeur sortante est retirée de la liste
+    triée au moment où elle quitte la fenêtre. Ajout en O(taille) par décalage mémoire,
+    plus rapide que deux tas pour les petites fenêtres d'un flux de FC, médiane en O(1).
+    """
+
+    __slots__ = ('taille', 'fenetre', 'triees')
+
+    def __init__(self, taille):
+        self.taille = taille
+        self.fenetre = deque()
+        self.triees = []
+
+    def ajouter(self, valeur):
+        self.fenetre.append(valeur)
+        if len(self.fenetre) > self.taille:
+            del self.triees[bisect.bisect_left(self.triees, self.fenetre.popleft())]
+        bisect.insort(self.triees, valeur)
+
+    def mediane(self):
+        triees = self.triees
+        milieu = len(triees) // 2
+        if len(triees) % 2:
+            return triees[milieu]
+        return (triees[milieu - 1] + triees[milieu]) / 2
+
+    def __len__(self):
+        return len(self.fenetre)
+
+
+class _EtatAthlete:
+    __slots__ = ('FCRepos', 'FCM', 'base_repos', 'variance_repos', 'jours_eleves', 'fatigue_signalee',
+                 'mediane', 'ecart_moyen', 'secondes_au_dessus_fcm', 'au_dessus_signale')
+
+    def __init__(self, FCRepos, FCM):
+        self.FCRepos = FCRepos
+        self.FCM = FCM
+        self.base_repos = float(FCRepos)
+        self.variance_repos = ECART_TYPE_REPOS_INITIAL ** 2
+        self.jours_eleves = 0
+        self.fatigue_signalee = False
+        self.reinitialiser_effort()
+
+    def reinitialiser_effort(self):
+        self.mediane = MedianeGlissante(FENETRE_MEDIANE)
+        self.ecart_moyen = 3.0
+        self.secondes_au_dessus_fcm = 0
+        self.au_dessus_signale = False
+
+
+class DetecteurFatigue:
+    """
+    Détecteur en ligne de fatigue et d'anomalies de FC pour de nombreux athlètes.
+
+    Chaque mesure met à jour des statistiques glissantes en temps constant (EWMA, écart
+    moyen) ou proportionnel à la fenêtre (médiane glissante sur FENETRE_MEDIANE valeurs).
+    Les événements sont transmis à callback sous forme de dictionnaires {'type',
+    'athlete', 'horodatage', 'valeur', 'reference', 'z'}.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.athletes = {}
+
+    def enregistrer_athlete(self, athlete, FCRepos, FCM):
+        self.athletes[athlete] = _EtatAthlete(FCRepos, FCM)
+
+    def enregistrer_profil(self, athlete, age, sexe, poids, FCRepos):
+        """
+        Enregistre un athlète à partir de son profil (FCM par calculer_fcm).
+
+        Lève ValueError si sexe n'est ni 'H' ni 'F' (calculer_fcm ne donne alors pas de FCM).
+        """
+        FCM = calculer_fcm(age, sexe, poids)
+        if FCM is None:
+            raise ValueError(f"sexe inconnu pour l'athlète {athlete} : {sexe!r} (H ou F)")
+        self.enregistrer_athlete(athlete, FCRepos, FCM)
+
+    def _emettre(self, type_evenement, athlete, horodatage, valeur, reference, z=None):
+        self.callback({'type': type_evenement, 'athlete': athlete, 'horodatage': horodatage,
+                       'valeur': valeur, 'reference': reference, 'z': z})
+
+    def ajouter_fc_repos(self, athlete, horodatage, fc):
+        """Mesure de FC de repos (une par jour) : signale une fatigue persistante."""
+        etat = self.athletes[athlete]
+        ecart = fc - etat.base_repos
+        z = ecart / math.sqrt(etat.variance_repos)
+        if z >= Z_FATIGUE and ecart >= ECART_MIN_FATIGUE:
+            etat.jours_eleves += 1
+            if etat.jours_eleves >= JOURS_FATIGUE and not etat.fatigue_signalee:
+                etat.fatigue_signalee = True
+                self._emettre(FATIGUE, athlete, horodatage, fc, etat.base_repos, z)
+        else:
+            etat.jours_eleves = 0
+            if z < 1.0:
+                etat.fatigue_signalee = False
+        # EWMA de la moyenne et de la variance
+        etat.base_repos += ALPHA_REPOS * ecart
+        etat.variance_repos = (1 - ALPHA_REPOS) * (etat.variance_repos + ALPHA_REPOS * ecart * ecart)
+
+    def ajouter_fc_effort(self, athlete, horodatage, fc):
+        """Échantillon de FC pendant une séance : signale les pics et valeurs aberrantes."""
+        etat = self.athletes[athlete]
+        # Écrit en négatif pour rejeter aussi NaN, qui fausserait l'ordre de la fenêtre triée
+        if not FC_MIN_PHYSIOLOGIQUE <= fc <= MARGE_FCM * etat.FCM:
+            self._emettre(FC_HORS_LIMITES, athlete, horodatage, fc, etat.FCM)
+            return
+
+        mediane = etat.mediane
+        if len(mediane) >= FENETRE_MEDIANE // 2:
+            reference = mediane.mediane()
+            ecart = fc - reference
+            # L'écart moyen absolu (EWMA) estime la dispersion : 1.25 * écart moyen ~ écart-type
+            z = ecart / max(1.25 * etat.ecart_moyen, 1.0)
+            if abs(ecart) >= ECART_MIN_PIC and abs(z) >= Z_PIC:
+                self._emettre(PIC_FC, athlete, horodatage, fc, reference, z)
+            else:
+                etat.ecart_moyen += ALPHA_ECART * (abs(ecart) - etat.ecart_moyen)
+        mediane.ajouter(fc)
+
+        if mediane.mediane() > etat.FCM:
+            etat.secondes_au_dessus_fcm += 1
+            if etat.secondes_au_dessus_fcm >= DUREE_MAX_AU_DESSUS_FCM and not etat.au_dessus_signale:
+                etat.au_dessus_signale = True
+                self._emettre(FC_AU_DESSUS_FCM, athlete, horodatage, mediane.mediane(), etat.FCM)
+        else:
+            etat.secondes_au_dessus_fcm = 0
+
+    def terminer_seance(self, athlete):
+        """Oublie les statistiques d'effort (la ligne de base de repos est conservée)."""
+        self.athletes[athlete].reinitialiser_effort()
+
+
+if __name__ == '__main__':
+    import random
+
+    nb_athletes = int(input("nombre d'athlètes simultanés :"))
+    duree = int(input('duree de la seance (secondes) :'))
+    evenements = {}
+
+    def compter(evenement):
+        evenements[evenement['type']] = evenements.get(evenement['type'], 0) + 1
+
+    detecteur = DetecteurFatigue(compter)
+    aleatoire = random.Random(0)
+    for a in range(nb_athletes):
+        detecteur.enregistrer_profil(a, aleatoire.randint(18, 65), aleatoire.choice('HF'),
+                                     aleatoire.randint(50, 90), aleatoire.randint(45, 70))
+
+    # Trois semaines de FC de repos, les 10 % derniers athlètes fatigués la dernière semaine
+    for jour in range(21):
+        for a, etat in detecteur.athletes.items():
+            fatigue = 8 if jour >= 14 and a >= 0.9 * nb_athletes else 0
+            detecteur.ajouter_fc_repos(a, jour, etat.FCRepos + aleatoire.gauss(0, 2) + fatigue)
+
+    # Séance simultanée : flux entrelacés avec 0,1 % de pics capteur
+    debut = time.perf_counter()
+    for seconde in range(duree):
+        for a, etat in detecteur.athletes.items():
+            fc = etat.FCRepos + 0.7 * (etat.FCM - etat.FCRepos) + aleatoire.gauss(0, 2)
+            if aleatoire.random() < 0.001:
+                fc += aleatoire.choice((-1, 1)) * 45
+            detecteur.ajouter_fc_effort(a, seconde, fc)
+    ecoule = time.perf_counter() - debut
+    nb_echantillons = nb_athletes * duree
+    print(f'\n{nb_echantillons} échantillons traités en {ecoule:.2f} s '
+          f'({nb_echantillons / ecoule / 1000:.0f} k échantillons/s)')
+    for type_evenement, nombre in sorted(evenements.items()):
+        print(f'{type_evenement} : {nombre}')
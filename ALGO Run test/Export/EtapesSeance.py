@@ -0,0 +1,46 @@
+# Découpage d'une séance du plan (voir generer_plan_structure dans beta.py) en étapes
+# structurées communes aux formats d'export.
+#
+# Une étape est un dictionnaire :
+#   {'intensite': 'echauffement' | 'actif' | 'recuperation' | 'retour_calme',
+#    'duree_type': 'distance' (m) | 'temps' (s), 'duree': valeur,
+#    'cible': None | ('fc', bas, haut) en bpm | ('vitesse', basse, haute) en m/s}
+# Un bloc répété est un dictionnaire {'repetitions': n, 'etapes': [...]}.
+
+
+def allure_vers_vitesse(allure_minutes):
+    """Convertit une allure en min/km en vitesse en m/s."""
+    return 1000 / (allure_minutes * 60)
+
+
+def cible_seance(seance):
+    allure_rapide, allure_lente = seance['allure']
+    return ('vitesse', allure_vers_vitesse(allure_lente), allure_vers_vitesse(allure_rapide))
+
+
+def decomposer_seance(seance):
+    """Liste des étapes (et blocs répétés) d'une séance du plan."""
+    if seance['type'] in ('EF_LONGUE', 'EF_COURTE'):
+        return [{
+            'intensite': 'actif',
+            'duree_type': 'distance',
+            'duree': seance['distance'] * 1000,
+            'cible': ('fc', seance['fc'][0], seance['fc'][1]),
+        }]
+
+    demi_echauffement = seance['echauffement'] * 1000 / 2
+    return [
+        {'intensite': 'echauffement', 'duree_type': 'distance', 'duree': demi_echauffement, 'cible': None},
+        {'repetitions': seance['nb_repetitions'], 'etapes': [
+            {'intensite': 'actif', 'duree_type': 'distance', 'duree': seance['distance_repetition'],
+             'cible': cible_seance(seance)},
+            {'intensite': 'recuperation', 'duree_type': 'temps', 'duree': seance['recuperation'] * 60,
+             'cible': None},
+        ]},
+        {'intensite': 'retour_calme', 'duree_type': 'distance', 'duree': demi_echauffement, 'cible': None},
+    ]
+
+
+def nommer_seance(numero_semaine, numero_seance, seance):
+    """Nom court (15 caractères au plus, limite TCX) : S03-2 SEUIL."""
+    return f"S{numero_semaine:02d}-{numero_seance} {seance['type']}"[:15]
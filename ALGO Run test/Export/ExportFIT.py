@@ -0,0 +1,120 @@
+import sys
+import struct
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Export.EtapesSeance import decomposer_seance, nommer_seance
+
+# Fichier FIT de type "workout" (protocole 2.0) : file_id, workout puis une workout_step par étape.
+# Les blocs répétés deviennent une étape repeat_until_steps_cmplt qui pointe vers leur première étape.
+_EPOQUE_FIT = 631065600  # 31/12/1989 00:00 UTC
+_INVALIDE_UINT32 = 0xFFFFFFFF
+_TAILLE_NOM = 16
+
+_ENUM, _UINT16, _UINT32, _STRING = 0x00, 0x84, 0x86, 0x07
+# (message global, type local, [(numéro de champ, taille, type de base)])
+_FILE_ID = (0, 0, [(0, 1, _ENUM), (1, 2, _UINT16), (2, 2, _UINT16), (4, 4, _UINT32)])
+_WORKOUT = (26, 1, [(4, 1, _ENUM), (6, 2, _UINT16), (8, _TAILLE_NOM, _STRING)])
+_WORKOUT_STEP = (27, 2, [(254, 2, _UINT16), (1, 1, _ENUM), (2, 4, _UINT32), (3, 1, _ENUM),
+                         (4, 4, _UINT32), (5, 4, _UINT32), (6, 4, _UINT32), (7, 1, _ENUM)])
+_FORMATS = {
+    0: '<BBHHI',
+    1: f'<BBH{_TAILLE_NOM}s',
+    2: '<BHBIBIIIB',
+}
+
+_DUREE_TEMPS, _DUREE_DISTANCE, _DUREE_REPETITION = 0, 1, 6
+_CIBLE_VITESSE, _CIBLE_FC, _CIBLE_LIBRE = 0, 1, 2
+_INTENSITES = {'actif': 0, 'recuperation': 1, 'echauffement': 2, 'retour_calme': 3}
+
+# CRC-16 du protocole FIT (polynôme 0xA001 réfléchi), table précalculée par octet
+_TABLE_CRC = []
+for _octet in range(256):
+    _crc = _octet
+    for _ in range(8):
+        _crc = (_crc >> 1) ^ 0xA001 if _crc & 1 else _crc >> 1
+    _TABLE_CRC.append(_crc)
+
+
+def calculer_crc_fit(donnees, crc=0):
+    for octet in donnees:
+        crc = (crc >> 8) ^ _TABLE_CRC[(crc ^ octet) & 0xFF]
+    return crc
+
+
+def _definition(message):
+    numero_global, local, champs = message
+    octets = struct.pack('<BBBHB', 0x40 | local, 0, 0, numero_global, len(champs))
+    return octets + b''.join(struct.pack('<BBB', *champ) for champ in champs)
+
+
+def _etape_fit(index, etape):
+    if etape['cible'] is None:
+        cible_type, basse, haute = _CIBLE_LIBRE, _INVALIDE_UINT32, _INVALIDE_UINT32
+    elif etape['cible'][0] == 'fc':
+        cible_type, basse, haute = _CIBLE_FC, round(etape['cible'][1]) + 100, round(etape['cible'][2]) + 100
+    else:
+        cible_type, basse, haute = _CIBLE_VITESSE, round(etape['cible'][1] * 1000), round(etape['cible'][2] * 1000)
+    if etape['duree_type'] == 'distance':
+        duree_type, duree = _DUREE_DISTANCE, round(etape['duree'] * 100)
+    else:
+        duree_type, duree = _DUREE_TEMPS, round(etape['duree'] * 1000)
+    return struct.pack(_FORMATS[2], 2, index, duree_type, duree, cible_type, 0,
+                       basse, haute, _INTENSITES[etape['intensite']])
+
+
+def _etapes_fit(etapes, messages):
+    for etape in etapes:
+        if 'repetitions' in etape:
+            premiere = len(messages)
+            _etapes_fit(etape['etapes'], messages)
+            messages.append(struct.pack(_FORMATS[2], 2, len(messages), _DUREE_REPETITION, premiere,
+                                        _CIBLE_LIBRE, etape['repetitions'],
+                                        _INVALIDE_UINT32, _INVALIDE_UINT32, _INTENSITES['actif']))
+        else:
+            messages.append(_etape_fit(len(messages), etape))
+
+
+def seance_vers_fit(nom, seance, horodatage=None):
+    """Octets d'un fichier FIT workout pour une séance du plan."""
+    horodatage = time.time() if horodatage is None else horodatage
+    etapes = []
+    _etapes_fit(decomposer_seance(seance), etapes)
+
+    corps = b''.join((
+        _definition(_FILE_ID),
+        struct.pack(_FORMATS[0], 0, 5, 255, 0, int(horodatage) - _EPOQUE_FIT),
+        _definition(_WORKOUT),
+        struct.pack(_FORMATS[1], 1, 1, len(etapes), nom.encode('utf-8')[:_TAILLE_NOM - 1]),
+        _definition(_WORKOUT_STEP),
+    ) + tuple(etapes))
+
+    entete = struct.pack('<BBHI4s', 14, 0x20, 2140, len(corps), b'.FIT')
+    entete += struct.pack('<H', calculer_crc_fit(entete))
+    fichier = entete + corps
+    return fichier + struct.pack('<H', calculer_crc_fit(fichier))
+
+
+class EcrivainFIT:
+    """
+    Écrit un fichier FIT par séance dans une archive zip ouverte en écriture (zipfile.ZipFile).
+
+    Les séances sont écrites au fil de l'eau, mais la mémoire n'est pas constante :
+    zipfile garde l'entrée du répertoire central de chaque fichier (environ 470 octets
+    par séance, soit ~20 Ko par plan de 12 semaines) jusqu'à la fermeture de l'archive.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.horodatage = time.time()
+
+    def ecrire_plan(self, identifiant, semaines):
+        for semaine in semaines:
+            for numero, seance in enumerate(semaine['seances'], 1):
+                nom = nommer_seance(semaine['semaine'], numero, seance)
+                self.archive.writestr(f"{identifiant}/S{semaine['semaine']:02d}-{numero}.fit",
+                                      seance_vers_fit(nom, seance, self.horodatage))
+
+    def fermer(self):
+        pass
@@ -0,0 +1,44 @@
+import sys
+import json
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Export.EtapesSeance import decomposer_seance
+
+# Schéma JSON consommé par l'application : une ligne JSON par plan (JSON Lines)
+SCHEMA_PLAN = 'drawrun.plan/1'
+
+
+def plan_vers_json(identifiant, semaines):
+    return {
+        'schema': SCHEMA_PLAN,
+        'id': identifiant,
+        'semaines': [{
+            'semaine': semaine['semaine'],
+            'phase': semaine.get('phase'),
+            'volume_km': round(semaine['volume'], 2),
+            'seances': [{
+                'type': seance['type'],
+                'distance_km': round(seance['distance'], 2),
+                'zone': seance['zone'],
+                'allure_min_km': [round(a, 3) for a in seance['allure']],
+                'fc_bpm': [round(fc) for fc in seance['fc']],
+                'temps_estime_min': round(seance['temps_estime'], 1),
+                'etapes': decomposer_seance(seance),
+            } for seance in semaine['seances']],
+        } for semaine in semaines],
+    }
+
+
+class EcrivainJSON:
+    """Écrit les plans un par un dans un fichier texte (ou tampon) au format JSON Lines."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+
+    def ecrire_plan(self, identifiant, semaines):
+        self.fichier.write(json.dumps(plan_vers_json(identifiant, semaines), separators=(',', ':')))
+        self.fichier.write('\n')
+
+    def fermer(self):
+        self.fichier.flush()
@@ -0,0 +1,79 @@
+import sys
+import io
+import time
+import zipfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Export.ExportJSON import EcrivainJSON
+from Export.ExportTCX import EcrivainTCX
+from Export.ExportFIT import EcrivainFIT
+
+FORMATS_EXPORT = ('json', 'tcx', 'fit')
+
+
+def exporter_plans(plans, format_export, fichier):
+    """
+    Exporte un flux de plans en une seule passe, sans les garder en mémoire. En 'fit', la
+    mémoire croît toutefois d'environ 470 octets par séance : l'archive zip garde son
+    répertoire central jusqu'à la fin (voir EcrivainFIT).
+
+    :param plans: itérable (ou générateur) de couples (identifiant, semaines) où semaines est
+                  le résultat de generer_plan_structure.
+    :param format_export: 'json' (JSON Lines), 'tcx' (un document TCX) ou 'fit' (archive zip
+                          contenant un fichier FIT par séance).
+    :param fichier: fichier ou tampon ouvert en écriture, texte pour json/tcx, binaire pour fit.
+    :return: le nombre de plans exportés.
+    """
+    archive = None
+    if format_export == 'json':
+        ecrivain = EcrivainJSON(fichier)
+    elif format_export == 'tcx':
+        ecrivain = EcrivainTCX(fichier)
+    elif format_export == 'fit':
+        archive = zipfile.ZipFile(fichier, 'w', zipfile.ZIP_DEFLATED)
+        ecrivain = EcrivainFIT(archive)
+    else:
+        raise ValueError(f"format d'export inconnu : {format_export}")
+
+    nb_plans = 0
+    try:
+        for identifiant, semaines in plans:
+            ecrivain.ecrire_plan(identifiant, semaines)
+            nb_plans += 1
+    finally:
+        ecrivain.fermer()
+        if archive is not None:
+            archive.close()
+    return nb_plans
+
+
+if __name__ == '__main__':
+    from beta import generer_plan_structure
+    from ZonesAllure.Zones_A import calculer_zones_allure
+    from ZonesFC.Methode_de_Karvonen.Zones_FC import calculer_zones_karvonen
+
+    format_export = input('format (json, tcx ou fit) :')
+    nb_plans = int(input('nombre de plans à exporter :'))
+    chemin = input('fichier de sortie :')
+
+    def generer_plans():
+        for i in range(nb_plans):
+            age, FCRepos, volume = 20 + i % 40, 45 + i % 25, 20 + i % 50
+            profil = {
+                'zonesAllure': calculer_zones_allure(age, 'H', 70, FCRepos),
+                'zonesFC': calculer_zones_karvonen(age, 'H', 70, FCRepos),
+                'DureeProgramme': 12,
+                'VolumeHebdoMoyenDistance': volume,
+            }
+            yield f'plan-{i}', generer_plan_structure(profil)
+
+    debut = time.perf_counter()
+    if format_export == 'fit':
+        with open(chemin, 'wb') as fichier:
+            exporter_plans(generer_plans(), format_export, fichier)
+    else:
+        with io.open(chemin, 'w', encoding='utf-8') as fichier:
+            exporter_plans(generer_plans(), format_export, fichier)
+    duree = time.perf_counter() - debut
+    print(f'\n{nb_plans} plans exportés en {duree:.2f} s ({nb_plans / duree:.0f} plans/s)')
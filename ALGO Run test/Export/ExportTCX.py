@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+from xml.sax.saxutils import escape
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Export.EtapesSeance import decomposer_seance, nommer_seance
+
+_ENTETE_TCX = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+    '<Workouts>\n'
+)
+_PIED_TCX = '</Workouts>\n</TrainingCenterDatabase>\n'
+
+
+def _cible_tcx(cible):
+    if cible is None:
+        return '<Target xsi:type="None_t"/>'
+    if cible[0] == 'fc':
+        return ('<Target xsi:type="HeartRate_t"><HeartRateZone xsi:type="CustomHeartRateZone_t">'
+                f'<Low xsi:type="HeartRateInBeatsPerMinute_t"><Value>{round(cible[1])}</Value></Low>'
+                f'<High xsi:type="HeartRateInBeatsPerMinute_t"><Value>{round(cible[2])}</Value></High>'
+                '</HeartRateZone></Target>')
+    return ('<Target xsi:type="Speed_t"><SpeedZone xsi:type="CustomSpeedZone_t">'
+            f'<LowInMetersPerSecond>{cible[1]:.3f}</LowInMetersPerSecond>'
+            f'<HighInMetersPerSecond>{cible[2]:.3f}</HighInMetersPerSecond>'
+            '</SpeedZone></Target>')
+
+
+def _etapes_tcx(etapes, compteur, balise='Step'):
+    morceaux = []
+    for etape in etapes:
+        if etape.get('repetitions') == 1:
+            # Repeat_t exige au moins deux répétitions : bloc unique écrit à plat
+            morceaux.append(_etapes_tcx(etape['etapes'], compteur, balise))
+            continue
+        compteur[0] += 1
+        if 'repetitions' in etape:
+            identifiant = compteur[0]
+            enfants = _etapes_tcx(etape['etapes'], compteur, 'Child')
+            morceaux.append(f'<{balise} xsi:type="Repeat_t"><StepId>{identifiant}</StepId>'
+                            f'<Repetitions>{etape["repetitions"]}</Repetitions>{enfants}</{balise}>')
+            continue
+        if etape['duree_type'] == 'distance':
+            duree = f'<Duration xsi:type="Distance_t"><Meters>{round(etape["duree"])}</Meters></Duration>'
+        else:
+            duree = f'<Duration xsi:type="Time_t"><Seconds>{round(etape["duree"])}</Seconds></Duration>'
+        intensite = 'Resting' if etape['intensite'] == 'recuperation' else 'Active'
+        morceaux.append(f'<{balise} xsi:type="Step_t"><StepId>{compteur[0]}</StepId>{duree}'
+                        f'<Intensity>{intensite}</Intensity>{_cible_tcx(etape["cible"])}</{balise}>')
+    return ''.join(morceaux)
+
+
+def _code_plan(numero):
+    # Numéro de plan en base 36 : court, pour tenir dans les 15 caractères d'un nom TCX
+    chiffres = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    code = ''
+    while True:
+        numero, reste = divmod(numero, 36)
+        code = chiffres[reste] + code
+        if not numero:
+            return code
+
+
+def seance_vers_tcx(nom, seance, notes=None):
+    """Élément <Workout> TCX d'une séance du plan."""
+    notes = f'<Notes>{escape(notes)}</Notes>' if notes else ''
+    return (f'<Workout Sport="Running"><Name>{escape(nom)}</Name>'
+            f'{_etapes_tcx(decomposer_seance(seance), [0])}{notes}</Workout>\n')
+
+
+class EcrivainTCX:
+    """
+    Écrit les séances d'un ou plusieurs plans dans un même document TCX, au fil de l'eau.
+
+    Les noms de séance doivent être uniques dans le document : chacun est préfixé du code
+    court du plan (son rang dans le document, en base 36) et l'identifiant complet du plan
+    est repris dans <Notes>.
+    """
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.fichier.write(_ENTETE_TCX)
+        self.nb_plans = 0
+
+    def ecrire_plan(self, identifiant, semaines):
+        code = _code_plan(self.nb_plans)
+        self.nb_plans += 1
+        for semaine in semaines:
+            for numero, seance in enumerate(semaine['seances'], 1):
+                nom = f"{code}-{nommer_seance(semaine['semaine'], numero, seance)}"[:15]
+                self.fichier.write(seance_vers_tcx(nom, seance, f"{identifiant} S{semaine['semaine']:02d}-{numero}"))
+
+    def fermer(self):
+        self.fichier.write(_PIED_TCX)
+        self.fichier.flush()
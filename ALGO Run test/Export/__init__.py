@@ -0,0 +1 @@
+# Package Export - Export des plans en séances structurées (FIT, TCX, JSON)
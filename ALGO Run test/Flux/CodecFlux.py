@@ -0,0 +1,126 @@
+import struct
+import json
+import time
+
+import numpy as np
+
+# Format binaire d'un flux :
+#   en-tête : b'DRF1' | type (uint8) | nombre d'échantillons (uint32) | échelle (float32)
+#   corps   : deltas successifs des valeurs quantifiées, encodés en zigzag puis en varint
+# La FC et la cadence sont stockées à 1 unité près, la vitesse (m/s) au cm/s près.
+MAGIC = b'DRF1'
+ENTETE = struct.Struct('<4sBIf')
+TYPES_FLUX = {
+    'fc': (0, 1.0),
+    'cadence': (1, 1.0),
+    'vitesse': (2, 100.0),
+}
+_NOMS_TYPES = {code: nom for nom, (code, _) in TYPES_FLUX.items()}
+_SEUILS_VARINT = np.array([1 << (7 * k) for k in range(1, 10)], dtype=np.uint64)
+
+
+def encoder_flux(valeurs, type_flux):
+    """Encode un flux d'échantillons (tableau 1D) en octets delta + varint."""
+    code, echelle = TYPES_FLUX[type_flux]
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    if not np.all(np.isfinite(valeurs)):
+        raise ValueError('le flux contient des valeurs non finies')
+
+    quantifie = np.rint(valeurs * echelle).astype(np.int64)
+    deltas = np.diff(quantifie, prepend=np.int64(0))
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+    # Nombre d'octets varint par valeur, puis position de départ de chaque valeur
+    nb_octets = 1 + np.searchsorted(_SEUILS_VARINT, zigzag, side='right')
+    fins = np.cumsum(nb_octets)
+    debuts = fins - nb_octets
+
+    corps = np.empty(int(fins[-1]) if len(fins) else 0, dtype=np.uint8)
+    for k in range(int(nb_octets.max()) if len(nb_octets) else 0):
+        masque = nb_octets > k
+        octet = (zigzag[masque] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        suite = (nb_octets[masque] > k + 1).astype(np.uint64) << np.uint64(7)
+        corps[debuts[masque] + k] = octet | suite
+
+    return ENTETE.pack(MAGIC, code, len(valeurs), echelle) + corps.tobytes()
+
+
+def lire_entete_flux(donnees):
+    """Retourne (type, nombre d'échantillons, échelle) sans décoder le corps."""
+    magic, code, n, echelle = ENTETE.unpack_from(donnees, 0)
+    if magic != MAGIC:
+        raise ValueError("ce n'est pas un flux DrawRun")
+    return _NOMS_TYPES[code], n, echelle
+
+
+def decoder_flux(donnees, sortie=None):
+    """
+    Décode un flux produit par encoder_flux.
+
+    :param donnees: octets, bytearray ou memoryview contenant le flux.
+    :param sortie: tampon préalloué optionnel (tableau NumPy, memoryview, array.array...)
+                   d'au moins n éléments ; les valeurs y sont écrites directement.
+    :return: le tableau des valeurs (une vue sur sortie si elle est fournie).
+    """
+    _, n, echelle = lire_entete_flux(donnees)
+    octets = np.frombuffer(donnees, dtype=np.uint8, offset=ENTETE.size)
+
+    if sortie is None:
+        cible = np.empty(n, dtype=np.float64)
+    else:
+        cible = np.asarray(sortie)
+        if cible.ndim != 1 or len(cible) < n:
+            raise ValueError('le tampon de sortie est trop petit')
+        cible = cible[:n]
+    if n == 0:
+        return cible
+
+    terminaux = octets < 0x80
+    fins = np.flatnonzero(terminaux)
+    if len(fins) != n or fins[-1] != len(octets) - 1:
+        raise ValueError('flux corrompu')
+    debuts = np.empty(n, dtype=np.intp)
+    debuts[0] = 0
+    debuts[1:] = fins[:-1] + 1
+
+    # Rang de chaque octet dans sa valeur varint, puis recomposition par somme segmentée
+    rang = np.arange(len(octets), dtype=np.int64) - np.repeat(debuts, fins - debuts + 1)
+    morceaux = (octets & 0x7F).astype(np.uint64) << (7 * rang).astype(np.uint64)
+    zigzag = np.add.reduceat(morceaux, debuts)
+
+    deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    np.cumsum(deltas, out=cible, dtype=cible.dtype)
+    if echelle != 1.0:
+        np.divide(cible, echelle, out=cible)
+    return cible
+
+
+def _generer_flux_exemple(n, graine=0):
+    rng = np.random.default_rng(graine)
+    fc = np.clip(140 + np.cumsum(rng.normal(0, 0.6, n)), 60, 200).round()
+    cadence = np.clip(170 + rng.normal(0, 2, n), 0, 220).round()
+    vitesse = np.clip(3.2 + np.cumsum(rng.normal(0, 0.02, n)), 0, 8).round(2)
+    return {'fc': fc, 'cadence': cadence, 'vitesse': vitesse}
+
+
+if __name__ == '__main__':
+    n = int(input("nombre d'échantillons par flux (ex: 3600000) :"))
+    flux = _generer_flux_exemple(n)
+    print(f"\nBenchmark du codec sur {n} échantillons :")
+    for type_flux, valeurs in flux.items():
+        debut = time.perf_counter()
+        encode = encoder_flux(valeurs, type_flux)
+        duree_encodage = time.perf_counter() - debut
+
+        tampon = np.empty(n, dtype=np.float64)
+        debut = time.perf_counter()
+        decoder_flux(memoryview(encode), sortie=tampon)
+        duree_decodage = time.perf_counter() - debut
+
+        taille_brute = valeurs.nbytes / 1e6
+        taille_json = len(json.dumps(valeurs[:min(n, 100000)].tolist())) * (n / min(n, 100000)) / 1e6
+        erreur = np.max(np.abs(tampon - valeurs))
+        print(f"{type_flux:8s}: {len(encode) / 1e6:.2f} Mo "
+              f"(float64 x{taille_brute * 1e6 / len(encode):.1f}, JSON x{taille_json * 1e6 / len(encode):.1f}) | "
+              f"encodage {taille_brute / duree_encodage:.0f} Mo/s | "
+              f"décodage {taille_brute / duree_decodage:.0f} Mo/s | erreur max {erreur:.3g}")
@@ -0,0 +1,319 @@
+import time
+
+import numpy as np
+
+# Les flux sont des dictionnaires de tableaux 1D de même longueur : 'temps' (secondes,
+# obligatoire) et des canaux parmi 'fc' (bpm), 'cadence' (pas/min), 'vitesse' (m/s),
+# 'lat' et 'lon' (degrés). Chaque étape est un générateur qui reçoit et produit des
+# morceaux de ce format, si bien qu'un fichier volumineux est traité par morceaux.
+TAILLE_MORCEAU = 65536
+# Bornes physiologiques / physiques au-delà desquelles un échantillon est remplacé par NaN
+LIMITES = {
+    'fc': (30, 230),
+    'cadence': (0, 260),
+    'vitesse': (0, 12),
+}
+ACCELERATION_MAX = 5.0      # m/s², au-delà : pic de vitesse (capteur ou GPS)
+VITESSE_MAX_GPS = 12.0      # m/s entre deux positions successives, au-delà : saut GPS
+VITESSE_PAUSE = 0.5         # m/s
+ECART_MAX = 10.0            # s sans échantillon : pause, pas d'interpolation à travers
+RAYON_TERRE = 6371000.0
+
+
+def decouper(flux, taille=TAILLE_MORCEAU):
+    """Découpe un flux complet en morceaux de taille échantillons (vues, sans copie)."""
+    n = len(flux['temps'])
+    for debut in range(0, n, taille):
+        yield {canal: valeurs[debut:debut + taille] for canal, valeurs in flux.items()}
+
+
+def concatener(morceaux):
+    """Rassemble les morceaux produits par un pipeline en un seul flux."""
+    morceaux = list(morceaux)
+    if not morceaux:
+        return {}
+    return {canal: np.concatenate([m[canal] for m in morceaux]) for canal in morceaux[0]}
+
+
+def dedoublonner(morceaux):
+    """Supprime les horodatages dupliqués ou en arrière (le premier échantillon est gardé)."""
+    dernier = -np.inf
+    for morceau in morceaux:
+        temps = np.asarray(morceau['temps'], dtype=np.float64)
+        if not len(temps):
+            continue
+        # Un échantillon est gardé s'il est strictement après tous ceux qui le précèdent
+        precedents = np.maximum.accumulate(np.concatenate(([dernier], temps[:-1])))
+        garder = temps > precedents
+        dernier = max(dernier, temps[-1], precedents[-1])
+        if garder.all():
+            yield morceau
+        else:
+            yield {canal: np.asarray(valeurs)[garder] for canal, valeurs in morceau.items()}
+
+
+def _distance_haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAYON_TERRE * np.arcsin(np.sqrt(a))
+
+
+def _ecart_vitesse(avant, apres):
+    return np.abs(apres[0] - avant[0])
+
+
+def _ecart_position(avant, apres):
+    return _distance_haversine(avant[0], avant[1], apres[0], apres[1])
+
+
+def _filtrer_sauts(temps, colonnes, reference, ecart, limite):
+    """
+    Rejette les échantillons trop éloignés (ecart > limite * dt) du dernier échantillon
+    accepté : le pic lui-même est rejeté, pas l'échantillon qui le suit.
+
+    Première passe vectorisée en prenant l'échantillon valide précédent pour référence,
+    puis correction séquentielle après chaque rejet (rares) : la référence y est le
+    dernier échantillon accepté.
+    :param reference: (temps, valeurs) du dernier échantillon accepté des morceaux
+                      précédents, ou None.
+    :return: (indices des échantillons rejetés, nouvelle référence).
+    """
+    valides = np.flatnonzero(~np.any(np.isnan(colonnes), axis=0))
+    if not len(valides):
+        return valides, reference
+    t = temps[valides]
+    valeurs = [c[valides] for c in colonnes]
+    t_ref, valeurs_ref = reference if reference is not None else (np.nan, [np.nan] * len(colonnes))
+    t_avant = np.concatenate(([t_ref], t[:-1]))
+    avant = [np.concatenate(([r], v[:-1])) for r, v in zip(valeurs_ref, valeurs)]
+    with np.errstate(invalid='ignore'):
+        accepte = ~(ecart(avant, valeurs) > limite * (t - t_avant))
+
+    k = 0
+    for suspect in np.flatnonzero(~accepte[:-1]) + 1:
+        if suspect < k or accepte[suspect - 1]:
+            continue
+        dernier = suspect - 2
+        while dernier >= 0 and not accepte[dernier]:
+            dernier -= 1
+        if dernier >= 0:
+            t_ref, valeurs_ref = t[dernier], [v[dernier] for v in valeurs]
+        k = suspect
+        while k < len(t) and not accepte[k - 1]:
+            with np.errstate(invalid='ignore'):
+                accepte[k] = not ecart(valeurs_ref, [v[k] for v in valeurs]) > limite * (t[k] - t_ref)
+            if accepte[k]:
+                t_ref, valeurs_ref = t[k], [v[k] for v in valeurs]
+            k += 1
+
+    acceptes = np.flatnonzero(accepte)
+    if len(acceptes):
+        dernier = acceptes[-1]
+        reference = (t[dernier], [v[dernier] for v in valeurs])
+    return valides[~accepte], reference
+
+
+def filtrer_aberrants(morceaux, limites=LIMITES, acceleration_max=ACCELERATION_MAX, vitesse_max_gps=VITESSE_MAX_GPS):
+    """
+    Remplace par NaN les valeurs hors limites, les pics de vitesse (accélération
+    impossible) et les positions GPS qui impliquent un saut. Vitesse et position sont
+    comparées au dernier échantillon accepté, y compris d'un morceau à l'autre : le
+    résultat ne dépend pas du découpage. Les horodatages doivent être croissants (voir
+    dedoublonner).
+    """
+    reference_vitesse = None
+    reference_position = None
+    for morceau in morceaux:
+        temps = np.asarray(morceau['temps'], dtype=np.float64)
+        if not len(temps):
+            continue
+        sortie = {'temps': temps}
+        for canal, valeurs in morceau.items():
+            if canal == 'temps':
+                continue
+            valeurs = np.array(valeurs, dtype=np.float64)
+            if canal in limites:
+                bas, haut = limites[canal]
+                valeurs[(valeurs < bas) | (valeurs > haut)] = np.nan
+            sortie[canal] = valeurs
+
+        if 'vitesse' in sortie:
+            rejetes, reference_vitesse = _filtrer_sauts(temps, [sortie['vitesse']], reference_vitesse,
+                                                        _ecart_vitesse, acceleration_max)
+            sortie['vitesse'][rejetes] = np.nan
+        if 'lat' in sortie and 'lon' in sortie:
+            rejetes, reference_position = _filtrer_sauts(temps, [sortie['lat'], sortie['lon']], reference_position,
+                                                         _ecart_position, vitesse_max_gps)
+            sortie['lat'][rejetes] = np.nan
+            sortie['lon'][rejetes] = np.nan
+        yield sortie
+
+
+def detecter_pauses(morceaux, vitesse_pause=VITESSE_PAUSE, ecart_max=ECART_MAX):
+    """
+    Ajoute le canal booléen 'pause' : vitesse sous vitesse_pause, ou premier échantillon
+    après un trou de plus de ecart_max secondes (montre mise en pause).
+    """
+    dernier = None
+    for morceau in morceaux:
+        temps = np.asarray(morceau['temps'], dtype=np.float64)
+        if not len(temps):
+            continue
+        trou = np.diff(temps, prepend=temps[0] if dernier is None else dernier) > ecart_max
+        pause = trou
+        if 'vitesse' in morceau:
+            with np.errstate(invalid='ignore'):
+                pause = pause | (np.asarray(morceau['vitesse']) < vitesse_pause)
+        dernier = temps[-1]
+        yield dict(morceau, pause=pause)
+
+
+def _interpoler(temps, valeurs, grille, ecart_max):
+    # Interpolation linéaire sur les seuls points valides, NaN à travers un trou > ecart_max
+    valides = ~np.isnan(valeurs)
+    t, v = temps[valides], valeurs[valides]
+    resultat = np.full(len(grille), np.nan)
+    if len(t) == 0:
+        return resultat
+    droite = np.clip(np.searchsorted(t, grille, side='left'), 0, len(t) - 1)
+    gauche = np.clip(droite - 1, 0, len(t) - 1)
+    exact = t[droite] == grille
+    couvert = (grille >= t[0]) & (grille <= t[-1]) & (exact | (t[droite] - t[gauche] <= ecart_max))
+    resultat[couvert] = np.interp(grille[couvert], t, v)
+    return resultat
+
+
+def _instants(morceau, temps, grille, ecart_max):
+    sortie = {'temps': grille}
+    for canal, valeurs in morceau.items():
+        if canal == 'temps':
+            continue
+        if canal == 'pause':
+            indices = np.maximum(np.searchsorted(temps, grille, side='right') - 1, 0)
+            ecart = temps[np.minimum(indices + 1, len(temps) - 1)] - temps[indices]
+            sortie[canal] = np.asarray(valeurs, dtype=bool)[indices] | (ecart > ecart_max)
+        else:
+            sortie[canal] = _interpoler(temps, np.asarray(valeurs, dtype=np.float64), grille, ecart_max)
+    return sortie
+
+
+def _a_reporter(morceau, temps, instant, ecart_max):
+    # Indice du premier échantillon encore utile pour les instants >= instant : l'échantillon
+    # qui le précède (canal 'pause') et, pour chaque canal réel, son dernier point valide
+    # avant lui s'il est assez proche pour être interpolé
+    debut = max(np.searchsorted(temps, instant, side='right') - 1, 0)
+    for canal, valeurs in morceau.items():
+        if canal in ('temps', 'pause'):
+            continue
+        valides = np.flatnonzero(~np.isnan(valeurs) & (temps <= instant))
+        if len(valides) and instant - temps[valides[-1]] <= ecart_max:
+            debut = min(debut, valides[-1])
+    return debut
+
+
+def reechantillonner(morceaux, frequence=1.0, ecart_max=ECART_MAX):
+    """
+    Rééchantillonne à frequence Hz sur la grille temps[0] + k / frequence.
+
+    Les canaux réels sont interpolés linéairement entre points valides (NaN à travers un
+    trou de plus de ecart_max secondes) ; le canal 'pause' prend la valeur de l'échantillon
+    précédent et vaut True dans les trous. Un instant n'est produit qu'une fois ses voisins
+    connus dans chaque canal : les derniers échantillons (au plus quelques ecart_max
+    secondes) sont reportés au morceau suivant, si bien que le résultat ne dépend pas du
+    découpage.
+    """
+    pas = 1.0 / frequence
+    report = None
+    origine = None
+    prochain = 0      # indice du prochain instant de la grille à produire
+    for morceau in morceaux:
+        if not len(morceau['temps']):
+            continue
+        if report is not None:
+            morceau = {canal: np.concatenate((report[canal], morceau[canal])) for canal in morceau}
+        temps = np.asarray(morceau['temps'], dtype=np.float64)
+        if origine is None:
+            origine = temps[0]
+        # Instants définitifs : avant le dernier échantillon et avant le dernier point valide
+        # de chaque canal, sauf s'il date de plus de ecart_max (plus rien à interpoler après)
+        limite = temps[-1]
+        for canal, valeurs in morceau.items():
+            if canal in ('temps', 'pause'):
+                continue
+            valides = np.flatnonzero(~np.isnan(valeurs))
+            if len(valides) and temps[-1] - temps[valides[-1]] < ecart_max:
+                limite = min(limite, temps[valides[-1]])
+        # Indices entiers : la grille ne dérive pas d'un morceau à l'autre
+        dernier = int(np.floor((limite - origine) / pas)) - 1
+        if dernier >= prochain:
+            yield _instants(morceau, temps, origine + pas * np.arange(prochain, dernier + 1), ecart_max)
+            prochain = dernier + 1
+        debut = _a_reporter(morceau, temps, origine + pas * prochain, ecart_max)
+        report = {canal: np.asarray(valeurs)[debut:] for canal, valeurs in morceau.items()}
+
+    if report is not None:
+        temps = np.asarray(report['temps'], dtype=np.float64)
+        dernier = int(np.floor((temps[-1] - origine) / pas + 1e-9))
+        if dernier >= prochain:
+            yield _instants(report, temps, origine + pas * np.arange(prochain, dernier + 1), ecart_max)
+
+
+def nettoyer_flux(morceaux, frequence=1.0, ecart_max=ECART_MAX):
+    """Pipeline complet : dedoublonner -> filtrer_aberrants -> detecter_pauses -> reechantillonner."""
+    morceaux = dedoublonner(morceaux)
+    morceaux = filtrer_aberrants(morceaux)
+    morceaux = detecter_pauses(morceaux, ecart_max=ecart_max)
+    return reechantillonner(morceaux, frequence, ecart_max)
+
+
+def verifier_decoupage(flux, tailles=(1, 7, 1000, TAILLE_MORCEAU), frequence=1.0):
+    """
+    Vérifie que filtrer_aberrants et le pipeline complet donnent le même résultat sur le
+    flux entier et découpé en morceaux de chacune des tailles ; lève AssertionError sinon.
+    """
+    etapes = {
+        'filtrer_aberrants': lambda morceaux: filtrer_aberrants(dedoublonner(morceaux)),
+        'nettoyer_flux': lambda morceaux: nettoyer_flux(morceaux, frequence),
+    }
+    for nom, etape in etapes.items():
+        entier = concatener(etape([flux]))
+        for taille in tailles:
+            decoupe = concatener(etape(decouper(flux, taille)))
+            for canal in entier:
+                assert np.array_equal(entier[canal], decoupe[canal], equal_nan=True), \
+                    f"{nom} : canal {canal} différent en morceaux de {taille} échantillons"
+
+
+def _generer_activite_brute(n, graine=0):
+    # Activité de n échantillons à ~1 Hz avec gigue, doublons, pause, pics et sauts GPS
+    rng = np.random.default_rng(graine)
+    temps = np.cumsum(rng.uniform(0.8, 1.2, n))
+    temps[n // 2:] += 120   # pause de deux minutes
+    doublons = rng.random(n) < 0.01
+    temps[1:][doublons[1:]] = temps[:-1][doublons[1:]]
+    vitesse = 3.2 + 0.4 * np.sin(temps / 300) + rng.normal(0, 0.05, n)
+    fc = 150 + 10 * np.sin(temps / 600) + rng.normal(0, 1, n)
+    fc[rng.random(n) < 0.001] = 255
+    vitesse[rng.random(n) < 0.001] = 25
+    distance = np.cumsum(vitesse)
+    lat = 45.0 + distance / 111000
+    lon = np.full(n, 5.0)
+    lat[rng.random(n) < 0.001] += 0.05
+    return {'temps': temps, 'fc': fc, 'cadence': rng.normal(172, 3, n), 'vitesse': vitesse, 'lat': lat, 'lon': lon}
+
+
+if __name__ == '__main__':
+    n = int(input("nombre d'échantillons de l'activité :"))
+    frequence = float(input('fréquence de rééchantillonnage (Hz) :'))
+    brute = _generer_activite_brute(n)
+
+    debut = time.perf_counter()
+    propre = concatener(nettoyer_flux(decouper(brute), frequence))
+    duree = time.perf_counter() - debut
+    print(f'\n{n} échantillons nettoyés en {duree * 1000:.1f} ms ({n / duree / 1e6:.1f} M échantillons/s)')
+    print(f"{len(propre['temps'])} échantillons à {frequence:g} Hz, "
+          f"{int(propre['pause'].sum())} en pause, {int(np.isnan(propre['fc']).sum())} FC manquantes")
+    # Morceaux d'un échantillon : vérification limitée au début de l'activité
+    verifier_decoupage({canal: valeurs[:20000] for canal, valeurs in brute.items()}, frequence=frequence)
+    verifier_decoupage(brute, tailles=(1000, TAILLE_MORCEAU), frequence=frequence)
+    print('Résultat identique quel que soit le découpage en morceaux')
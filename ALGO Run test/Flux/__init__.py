@@ -0,0 +1 @@
+# Package Flux - Stockage compact des flux d'échantillons (FC, cadence, vitesse)
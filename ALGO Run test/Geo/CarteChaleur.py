@@ -0,0 +1,151 @@
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+# Tuiles au format des cartes web (z/x/y, projection Web Mercator) découpées en
+# TAILLE_TUILE x TAILLE_TUILE pixels ; chaque pixel compte le nombre de traces qui y passent.
+TAILLE_TUILE = 256
+ZOOM_DEFAUT = 14
+ZOOM_MAX = 16
+TRACES_PAR_LOT = 1024
+NB_TUILES_MAX = 512   # tuiles gardées en mémoire avant déversement sur disque
+LATITUDE_MAX = 85.05112878
+
+
+def pixels_globaux(lat, lon, zoom):
+    """Coordonnées en pixels (réels) dans le monde Web Mercator au niveau zoom."""
+    largeur = TAILLE_TUILE * 2 ** zoom
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -LATITUDE_MAX, LATITUDE_MAX))
+    x = (np.asarray(lon, dtype=np.float64) + 180) / 360 * largeur
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2 * largeur
+    return x, y
+
+
+def _densifier(x, y, trace):
+    # Ajoute des points le long de chaque segment pour ne sauter aucun pixel (pas <= 1 pixel)
+    meme_trace = trace[1:] == trace[:-1]
+    pas = np.where(meme_trace, np.ceil(np.maximum(np.abs(np.diff(x)), np.abs(np.diff(y)))), 0).astype(np.int64)
+    nb = np.maximum(np.concatenate((pas, [0])), 1)   # le point lui-même puis les intermédiaires
+    depart = np.repeat(np.arange(len(x)), nb)
+    rang = np.arange(len(depart)) - np.repeat(np.cumsum(nb) - nb, nb)
+    fraction = rang / np.repeat(nb, nb)
+    suivant = np.minimum(depart + 1, len(x) - 1)
+    return (x[depart] + fraction * (x[suivant] - x[depart]),
+            y[depart] + fraction * (y[suivant] - y[depart]), trace[depart])
+
+
+class CarteChaleur:
+    """
+    Carte de chaleur par tuiles alimentée par lots de traces.
+
+    Les traces sont rastérisées par lots entièrement vectorisés ; seules les tuiles
+    touchées sont allouées, et au-delà de nb_tuiles_max tuiles en mémoire elles sont
+    cumulées dans des fichiers .npy du dossier : la mémoire reste bornée quel que soit
+    le nombre d'activités.
+    """
+
+    def __init__(self, zoom=ZOOM_DEFAUT, dossier=None, nb_tuiles_max=NB_TUILES_MAX):
+        if zoom > ZOOM_MAX:
+            raise ValueError(f'zoom limité à {ZOOM_MAX}')
+        self.zoom = zoom
+        self.dossier = dossier
+        self.nb_tuiles_max = nb_tuiles_max
+        self.tuiles = {}
+
+    def _chemin(self, tx, ty):
+        return os.path.join(self.dossier, f'{self.zoom}_{tx}_{ty}.npy')
+
+    def ajouter_traces(self, traces):
+        """Ajoute un itérable de traces (lat, lon), lot par lot."""
+        lot = []
+        for trace in traces:
+            lot.append(trace)
+            if len(lot) == TRACES_PAR_LOT:
+                self._ajouter_lot(lot)
+                lot = []
+        if lot:
+            self._ajouter_lot(lot)
+
+    def _ajouter_lot(self, lot):
+        longueurs = np.array([len(lat) for lat, _ in lot])
+        if not longueurs.sum():
+            return
+        x, y = pixels_globaux(np.concatenate([lat for lat, _ in lot]), np.concatenate([lon for _, lon in lot]), self.zoom)
+        trace = np.repeat(np.arange(len(lot)), longueurs)
+        x, y, trace = _densifier(x, y, trace)
+
+        largeur = TAILLE_TUILE * 2 ** self.zoom
+        px = np.clip(x.astype(np.int64), 0, largeur - 1)
+        py = np.clip(y.astype(np.int64), 0, largeur - 1)
+        # Un pixel ne compte qu'une fois par trace
+        cles = np.unique(trace * (largeur * largeur) + py * largeur + px)
+        pixel = cles % (largeur * largeur)
+        px, py = pixel % largeur, pixel // largeur
+
+        tuile = (py // TAILLE_TUILE) * (largeur // TAILLE_TUILE) + px // TAILLE_TUILE
+        local = (py % TAILLE_TUILE) * TAILLE_TUILE + px % TAILLE_TUILE
+        ordre = np.argsort(tuile, kind='stable')
+        tuile, local = tuile[ordre], local[ordre]
+        coupures = np.flatnonzero(np.diff(tuile)) + 1
+        for numero, pixels in zip(tuile[np.concatenate(([0], coupures))], np.split(local, coupures)):
+            cle = (int(numero % (largeur // TAILLE_TUILE)), int(numero // (largeur // TAILLE_TUILE)))
+            comptes = np.bincount(pixels, minlength=TAILLE_TUILE * TAILLE_TUILE).astype(np.uint32)
+            if cle in self.tuiles:
+                self.tuiles[cle] += comptes.reshape(TAILLE_TUILE, TAILLE_TUILE)
+            else:
+                self.tuiles[cle] = comptes.reshape(TAILLE_TUILE, TAILLE_TUILE)
+        if self.dossier is not None and len(self.tuiles) > self.nb_tuiles_max:
+            self.vider()
+
+    def vider(self):
+        """Cumule les tuiles en mémoire dans les fichiers du dossier (écriture atomique)."""
+        if self.dossier is None:
+            raise ValueError('aucun dossier de tuiles configuré')
+        os.makedirs(self.dossier, exist_ok=True)
+        for (tx, ty), comptes in self.tuiles.items():
+            chemin = self._chemin(tx, ty)
+            if os.path.exists(chemin):
+                comptes = comptes + np.load(chemin)
+            descripteur, temporaire = tempfile.mkstemp(dir=self.dossier, suffix='.tmp')
+            with os.fdopen(descripteur, 'wb') as fichier:
+                np.save(fichier, comptes)
+            os.replace(temporaire, chemin)
+        self.tuiles = {}
+
+    def tuile(self, tx, ty):
+        """Grille (TAILLE_TUILE, TAILLE_TUILE) de la tuile, mémoire et disque confondus."""
+        comptes = self.tuiles.get((tx, ty), np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.uint32))
+        if self.dossier is not None and os.path.exists(self._chemin(tx, ty)):
+            comptes = comptes + np.load(self._chemin(tx, ty))
+        return comptes
+
+
+if __name__ == '__main__':
+    from Geo.Simplification import generer_trace, simplifier_douglas_peucker
+
+    nb_traces = int(input("nombre d'activités de la ville :"))
+    zoom = int(input('niveau de zoom des tuiles (ex: 14) :'))
+    dossier = tempfile.mkdtemp(prefix='tuiles_')
+    rng = np.random.default_rng(0)
+
+    def traces():
+        for i in range(nb_traces):
+            centre = (45.76 + rng.normal(0, 0.02), 4.84 + rng.normal(0, 0.03))
+            lat, lon = generer_trace(3000, centre, graine=i)
+            gardes = simplifier_douglas_peucker(lat, lon, 5.0)
+            yield lat[gardes], lon[gardes]
+
+    carte = CarteChaleur(zoom, dossier, nb_tuiles_max=64)
+    debut = time.perf_counter()
+    carte.ajouter_traces(traces())
+    carte.vider()
+    duree = time.perf_counter() - debut
+    fichiers = os.listdir(dossier)
+    maximum = max(carte.tuile(*map(int, f[:-4].split('_')[1:])).max() for f in fichiers)
+    print(f'\n{nb_traces} activités simplifiées et rastérisées en {duree:.1f} s : '
+          f'{len(fichiers)} tuiles, jusqu\'à {maximum} passages par pixel')
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+RAYON_TERRE = 6371000.0
+TOLERANCE_DEFAUT = 5.0   # mètres
+PRECISION_POLYLINE = 5   # décimales du format polyline (Google, MapLibre)
+
+
+def projeter(lat, lon):
+    """Projection équirectangulaire locale en mètres, centrée sur la trace."""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    x = RAYON_TERRE * np.cos(np.mean(lat) if lat.size else 0.0) * lon
+    return x, RAYON_TERRE * lat
+
+
+def _distance_segments(x, y, debut, fin):
+    # Distance de chaque point au segment [debut, fin] qui l'encadre
+    ax, ay = x[debut], y[debut]
+    dx, dy = x[fin] - ax, y[fin] - ay
+    longueur2 = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(((x - ax) * dx + (y - ay) * dy) / longueur2, 0, 1)
+    t = np.where(longueur2 > 0, t, 0)
+    return np.hypot(x - ax - t * dx, y - ay - t * dy)
+
+
+def simplifier_douglas_peucker(lat, lon, tolerance=TOLERANCE_DEFAUT):
+    """
+    Simplification de Douglas-Peucker d'une trace GPS à tolerance mètres près.
+
+    Tous les segments d'un même niveau de récursion sont traités à la fois : à chaque
+    passe, chaque segment gagne son point le plus éloigné s'il dépasse la tolérance.
+    Le résultat est celui de la version récursive, en O(log n) passes vectorisées dans
+    le cas courant.
+    :return: indices des points gardés (croissants, premier et dernier inclus).
+    """
+    x, y = projeter(lat, lon)
+    n = len(x)
+    if n <= 2:
+        return np.arange(n)
+    gardes = np.zeros(n, dtype=bool)
+    gardes[[0, n - 1]] = True
+    tous = np.arange(n)
+    while True:
+        indices = np.flatnonzero(gardes)
+        segment = np.minimum(np.searchsorted(indices, tous, side='right') - 1, len(indices) - 2)
+        distances = _distance_segments(x, y, indices[segment], indices[segment + 1])
+        distances[gardes] = 0
+        maximums = np.maximum.reduceat(distances, indices[:-1])
+        candidats = np.flatnonzero((distances > tolerance) & (distances == maximums[segment]))
+        if not len(candidats):
+            return indices
+        # Le premier point de distance maximale de chaque segment, comme la version récursive
+        _, premiers = np.unique(segment[candidats], return_index=True)
+        gardes[candidats[premiers]] = True
+
+
+def encoder_polyline(lat, lon, precision=PRECISION_POLYLINE):
+    """Encode une trace au format polyline (deltas zigzag par groupes de 5 bits)."""
+    facteur = 10 ** precision
+    points = np.stack([np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)], axis=1)
+    # Arrondi au plus proche, demi vers l'infini comme l'implémentation de référence
+    quantifie = (np.sign(points) * np.floor(np.abs(points) * facteur + 0.5)).astype(np.int64)
+    deltas = np.diff(quantifie, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    nb_groupes = np.ones(len(zigzag), dtype=np.int64)
+    reste = zigzag >> np.uint64(5)
+    while np.any(reste):
+        nb_groupes += reste > 0
+        reste >>= np.uint64(5)
+    fins = np.cumsum(nb_groupes)
+    debuts = fins - nb_groupes
+    caracteres = np.empty(int(fins[-1]) if len(fins) else 0, dtype=np.uint8)
+    for k in range(int(nb_groupes.max()) if len(nb_groupes) else 0):
+        masque = nb_groupes > k
+        groupe = (zigzag[masque] >> np.uint64(5 * k)) & np.uint64(0x1F)
+        suite = (nb_groupes[masque] > k + 1).astype(np.uint64) << np.uint64(5)
+        caracteres[debuts[masque] + k] = (groupe | suite) + np.uint64(63)
+    return caracteres.tobytes().decode('ascii')
+
+
+def decoder_polyline(texte, precision=PRECISION_POLYLINE):
+    """Inverse de encoder_polyline : retourne (lat, lon)."""
+    octets = np.frombuffer(texte.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    if not len(octets):
+        return np.empty(0), np.empty(0)
+    fin_valeur = (octets & 0x20) == 0
+    numero = np.concatenate(([0], np.cumsum(fin_valeur)[:-1]))
+    debuts = np.flatnonzero(np.concatenate(([True], fin_valeur[:-1])))
+    rang = np.arange(len(octets)) - debuts[numero]
+    zigzag = np.add.reduceat((octets & 0x1F) << (5 * rang), debuts)
+    deltas = (zigzag >> 1) ^ -(zigzag & 1)
+    points = np.cumsum(deltas.reshape(-1, 2), axis=0) / 10 ** precision
+    return points[:, 0], points[:, 1]
+
+
+def generer_trace(nb_points, centre=(45.76, 4.84), graine=0):
+    """Trace de course synthétique (marche aléatoire lissée, ~3 m par point)."""
+    rng = np.random.default_rng(graine)
+    cap = np.cumsum(rng.normal(0, 0.08, nb_points))
+    pas = 3.0 + rng.normal(0, 0.3, nb_points)
+    nord = np.cumsum(pas * np.cos(cap)) + rng.normal(0, 1.5, nb_points)
+    est = np.cumsum(pas * np.sin(cap)) + rng.normal(0, 1.5, nb_points)
+    lat = centre[0] + np.degrees(nord / RAYON_TERRE)
+    lon = centre[1] + np.degrees(est / (RAYON_TERRE * np.cos(np.radians(centre[0]))))
+    return lat, lon
+
+
+if __name__ == '__main__':
+    nb_points = int(input('nombre de points de la trace :'))
+    tolerance = float(input('tolérance de simplification (m) :'))
+    lat, lon = generer_trace(nb_points)
+
+    debut = time.perf_counter()
+    gardes = simplifier_douglas_peucker(lat, lon, tolerance)
+    duree = time.perf_counter() - debut
+    complete = encoder_polyline(lat, lon)
+    simplifiee = encoder_polyline(lat[gardes], lon[gardes])
+    print(f'\n{nb_points} points simplifiés en {duree * 1000:.1f} ms : {len(gardes)} points gardés')
+    print(f'Polyline : {len(complete)} octets en pleine résolution, {len(simplifiee)} octets simplifiée')
+    lat2, lon2 = decoder_polyline(simplifiee)
+    ecart = max(np.abs(lat2 - lat[gardes]).max(), np.abs(lon2 - lon[gardes]).max())
+    print(f'Écart après décodage : {ecart:.1e} degré')
@@ -0,0 +1,188 @@
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Historique.StockageActivites import StockageActivites, SECONDES_PAR_SEMAINE
+
+SECONDES_PAR_JOUR = 24 * 3600
+# Le 1er janvier 1970 est un jeudi : on décale de 3 jours pour faire commencer les semaines le lundi
+_DECALAGE_LUNDI = 3 * SECONDES_PAR_JOUR
+GRANULARITES = ('jour', 'semaine', 'mois')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agregats (
+    athlete TEXT NOT NULL,
+    sport TEXT NOT NULL,
+    granularite TEXT NOT NULL,
+    debut INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    duree REAL NOT NULL,
+    charge REAL NOT NULL,
+    nb_activites INTEGER NOT NULL,
+    PRIMARY KEY (athlete, sport, granularite, debut)
+);
+CREATE TABLE IF NOT EXISTS agregats_remplaces (id TEXT PRIMARY KEY);
+"""
+
+# Début de période calculé par SQLite ({d} : expression de la date)
+_DEBUT_SQL = {
+    'jour': f'({{d}} / {SECONDES_PAR_JOUR}) * {SECONDES_PAR_JOUR}',
+    'semaine': f'(({{d}} + {_DECALAGE_LUNDI}) / {SECONDES_PAR_SEMAINE}) * {SECONDES_PAR_SEMAINE} - {_DECALAGE_LUNDI}',
+    'mois': "CAST(strftime('%s', {d}, 'unixepoch', 'start of month') AS INTEGER)",
+}
+VERSION_DECLENCHEURS = 1
+
+
+def calculer_periode(date, granularite):
+    """Retourne (début, fin) de la période (jour, semaine ISO ou mois civil UTC) contenant date."""
+    if granularite == 'jour':
+        debut = date - date % SECONDES_PAR_JOUR
+        return debut, debut + SECONDES_PAR_JOUR
+    if granularite == 'semaine':
+        debut = (date + _DECALAGE_LUNDI) // SECONDES_PAR_SEMAINE * SECONDES_PAR_SEMAINE - _DECALAGE_LUNDI
+        return debut, debut + SECONDES_PAR_SEMAINE
+    jour = datetime.fromtimestamp(date, timezone.utc)
+    debut = datetime(jour.year, jour.month, 1, tzinfo=timezone.utc)
+    fin = datetime(jour.year + jour.month // 12, jour.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(debut.timestamp()), int(fin.timestamp())
+
+
+def _delta_sql(source, signe):
+    # Ajoute (signe '+') ou retire ('-') les lignes de la requête source (athlete, sport,
+    # date, distance, duree, charge) des agrégats : une recherche par clé et par granularité.
+    instructions = []
+    for granularite in GRANULARITES:
+        debut = _DEBUT_SQL[granularite].format(d='o.date')
+        # Les déclencheurs n'acceptent pas d'alias sur la table modifiée
+        def cle(table):
+            return (f"{table}.athlete = o.athlete AND {table}.sport = o.sport AND {table}.granularite = "
+                    f"'{granularite}' AND {table}.debut = {debut}")
+        if signe == '+':
+            instructions.append(
+                f"INSERT INTO agregats SELECT o.athlete, o.sport, '{granularite}', {debut}, o.distance, o.duree, "
+                f'o.charge, 1 FROM ({source}) AS o WHERE true ON CONFLICT (athlete, sport, granularite, debut) '
+                'DO UPDATE SET distance = distance + excluded.distance, duree = duree + excluded.duree, '
+                'charge = charge + excluded.charge, nb_activites = nb_activites + 1;')
+        else:
+            instructions.append(
+                'UPDATE agregats SET distance = agregats.distance - o.distance, duree = agregats.duree - o.duree, '
+                'charge = agregats.charge - o.charge, nb_activites = agregats.nb_activites - 1 '
+                f"FROM ({source}) AS o WHERE {cle('agregats')};")
+            instructions.append(
+                f'DELETE FROM agregats WHERE rowid IN (SELECT ag.rowid FROM ({source}) AS o JOIN agregats AS ag '
+                f"ON {cle('ag')} WHERE ag.nb_activites <= 0);")
+    return '\n'.join(instructions)
+
+
+def _ligne_sql(ligne):
+    return (f'SELECT {ligne}.athlete AS athlete, {ligne}.sport AS sport, {ligne}.date AS date, '
+            f'{ligne}.distance AS distance, {ligne}.duree AS duree, {ligne}.charge AS charge')
+
+
+# Déclencheurs SQLite : les agrégats suivent toute écriture sur activites, quel que soit
+# l'écrivain (ClientSync, autre processus). Un INSERT OR REPLACE ne déclenche la
+# suppression de l'ancienne ligne que si recursive_triggers est actif : l'ancienne ligne
+# est donc retirée avant l'insertion et notée dans agregats_remplaces pour ne pas l'être
+# deux fois. Un INSERT en conflit échoue et annule ce retrait avec l'instruction.
+_DECLENCHEURS = f"""
+DROP TRIGGER IF EXISTS agregats_avant_insertion;
+DROP TRIGGER IF EXISTS agregats_insertion;
+DROP TRIGGER IF EXISTS agregats_suppression;
+DROP TRIGGER IF EXISTS agregats_modification;
+CREATE TRIGGER agregats_avant_insertion BEFORE INSERT ON activites
+WHEN EXISTS (SELECT 1 FROM activites WHERE id = NEW.id) BEGIN
+{_delta_sql('SELECT athlete, sport, date, distance, duree, charge FROM activites WHERE id = NEW.id', '-')}
+    INSERT INTO agregats_remplaces SELECT id FROM activites WHERE id = NEW.id;
+END;
+CREATE TRIGGER agregats_insertion AFTER INSERT ON activites BEGIN
+    DELETE FROM agregats_remplaces WHERE id = NEW.id;
+{_delta_sql(_ligne_sql('NEW'), '+')}
+END;
+CREATE TRIGGER agregats_suppression AFTER DELETE ON activites
+WHEN NOT EXISTS (SELECT 1 FROM agregats_remplaces WHERE id = OLD.id) BEGIN
+{_delta_sql(_ligne_sql('OLD'), '-')}
+END;
+CREATE TRIGGER agregats_modification AFTER UPDATE OF athlete, sport, date, distance, duree, charge ON activites BEGIN
+{_delta_sql(_ligne_sql('OLD'), '-')}
+{_delta_sql(_ligne_sql('NEW'), '+')}
+END;
+PRAGMA user_version = {VERSION_DECLENCHEURS};
+"""
+
+
+class AgregatsLongitudinaux:
+    """
+    Agrégats journaliers, hebdomadaires et mensuels matérialisés dans la base de l'historique.
+
+    Des déclencheurs SQLite mettent à jour, dans la transaction de chaque insertion,
+    remplacement ou suppression, les seules périodes touchées : les agrégats restent
+    exacts quel que soit le programme qui écrit dans la base.
+    """
+
+    def __init__(self, stockage):
+        self.stockage = stockage
+        self.connexion = stockage.connexion
+        self.connexion.executescript(_SCHEMA)
+        # Base écrite sans les déclencheurs (ou avec une ancienne version) : on les installe
+        # et on rematérialise tout, les agrégats existants pouvant être périmés.
+        version, = self.connexion.execute('PRAGMA user_version').fetchone()
+        if version != VERSION_DECLENCHEURS:
+            with self.connexion:
+                self.connexion.executescript(_DECLENCHEURS)
+            self.reconstruire()
+
+    def reconstruire(self):
+        """Rematérialise tous les agrégats depuis l'historique brut (installation des déclencheurs)."""
+        with self.connexion:
+            self.connexion.execute('DELETE FROM agregats')
+            for granularite, debut_sql in _DEBUT_SQL.items():
+                self.connexion.execute(
+                    f"INSERT INTO agregats SELECT athlete, sport, '{granularite}', {debut_sql.format(d='date')} AS debut, "
+                    'SUM(distance), SUM(duree), SUM(charge), COUNT(*) '
+                    'FROM activites GROUP BY athlete, sport, debut')
+
+    def lire_agregats(self, athlete, granularite, debut, fin, sport='course'):
+        """Périodes commençant dans [debut, fin[ sous forme de colonnes NumPy."""
+        lignes = self.connexion.execute(
+            'SELECT debut, distance, duree, charge, nb_activites FROM agregats '
+            'WHERE athlete = ? AND sport = ? AND granularite = ? AND debut >= ? AND debut < ? ORDER BY debut',
+            (athlete, sport, granularite, int(debut), int(fin))).fetchall()
+        tableau = np.array(lignes, dtype=np.float64).reshape(len(lignes), 5)
+        return {
+            'debut': tableau[:, 0].astype(np.int64),
+            'distance': tableau[:, 1],
+            'duree': tableau[:, 2],
+            'charge': tableau[:, 3],
+            'nb_activites': tableau[:, 4].astype(np.int64),
+        }
+
+    def calculer_volume_hebdo_moyen(self, athlete, date, nb_semaines=4, sport='course'):
+        """VolumeHebdoMoyenDistance (km) sur les nb_semaines complètes précédant la semaine de date."""
+        semaine_courante, _ = calculer_periode(int(date), 'semaine')
+        total, = self.connexion.execute(
+            'SELECT COALESCE(SUM(distance), 0) FROM agregats '
+            "WHERE athlete = ? AND sport = ? AND granularite = 'semaine' AND debut >= ? AND debut < ?",
+            (athlete, sport, semaine_courante - nb_semaines * SECONDES_PAR_SEMAINE, semaine_courante)).fetchone()
+        return total / nb_semaines
+
+
+if __name__ == '__main__':
+    chemin = input('chemin du fichier historique (ex: historique.db) :')
+    athlete = input("identifiant de l'athlète :")
+    stockage = StockageActivites(chemin)
+    agregats = AgregatsLongitudinaux(stockage)
+
+    maintenant = int(time.time())
+    debut = time.perf_counter()
+    volume = agregats.calculer_volume_hebdo_moyen(athlete, maintenant)
+    print(f'\nVolume hebdomadaire moyen (4 dernières semaines complètes) : {volume:.1f} km '
+          f'({(time.perf_counter() - debut) * 1e6:.0f} µs)')
+
+    mois = agregats.lire_agregats(athlete, 'mois', maintenant - 365 * SECONDES_PAR_JOUR, maintenant + 1)
+    for debut_mois, distance, duree in zip(mois['debut'], mois['distance'], mois['duree']):
+        print(f"{datetime.fromtimestamp(debut_mois, timezone.utc):%Y-%m} : {distance:.0f} km, {duree / 60:.1f} h")
+    stockage.fermer()
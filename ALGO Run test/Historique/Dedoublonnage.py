@@ -0,0 +1,184 @@
+import sys
+import heapq
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Historique.StockageActivites import StockageActivites, SECONDES_PAR_SEMAINE
+
+# Deux activités sont la même sortie reçue de deux sources si leurs intervalles
+# [date, date + durée] se recouvrent sur au moins CHEVAUCHEMENT_MIN de la plus courte et
+# si distances et durées diffèrent de moins des écarts relatifs ci-dessous (les sources
+# ne mesurent ni la distance GPS ni le temps de pause de la même façon).
+CHEVAUCHEMENT_MIN = 0.7
+ECART_DISTANCE_MAX = 0.10
+ECART_DUREE_MAX = 0.20
+# Comme mergeActivities dans l'application : la version Strava est gardée en priorité
+SOURCE_PRIORITAIRE = 'strava'
+
+
+def _racine(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def calculer_score(date1, duree1, distance1, date2, duree2, distance2):
+    """
+    Similarité de deux activités : (chevauchement, écart de distance, écart de durée).
+
+    Le chevauchement est rapporté à la plus courte des deux, les écarts à la plus grande
+    valeur. Les durées sont en minutes et les dates en secondes.
+    """
+    fin1, fin2 = date1 + duree1 * 60, date2 + duree2 * 60
+    plus_courte = min(duree1, duree2) * 60
+    chevauchement = max(0.0, min(fin1, fin2) - max(date1, date2)) / plus_courte if plus_courte > 0 else 0.0
+    ecart_distance = abs(distance1 - distance2) / max(distance1, distance2, 1e-9)
+    ecart_duree = abs(duree1 - duree2) / max(duree1, duree2, 1e-9)
+    return chevauchement, ecart_distance, ecart_duree
+
+
+def trouver_doublons(date, duree, distance, source=None, chevauchement_min=CHEVAUCHEMENT_MIN,
+                     ecart_distance_max=ECART_DISTANCE_MAX, ecart_duree_max=ECART_DUREE_MAX):
+    """
+    Regroupe les activités qui décrivent la même sortie, en O(n log n).
+
+    Les activités sont triées par début puis balayées en gardant dans un tas les
+    intervalles encore ouverts : seules les paires qui se recouvrent sont comparées, et
+    les paires retenues sont fusionnées par union-find (un groupe peut réunir les
+    versions Garmin, Strava, Polar et Suunto d'une même sortie). Deux activités de la
+    même source ne sont jamais fusionnées.
+    :return: tableau groupe (indice du représentant de chaque activité, voir choisir_representants).
+    """
+    date = np.asarray(date, dtype=np.float64)
+    duree = np.asarray(duree, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    n = len(date)
+    parents = list(range(n))
+    ordre = np.argsort(date, kind='stable')
+    fins = date + duree * 60
+
+    ouvertes = []   # tas (fin, indice) des intervalles qui peuvent encore recouvrir le suivant
+    for i in ordre.tolist():
+        while ouvertes and ouvertes[0][0] <= date[i]:
+            heapq.heappop(ouvertes)
+        for _, j in ouvertes:
+            if source is not None and source[i] == source[j]:
+                continue
+            chevauchement, ecart_distance, ecart_duree = calculer_score(
+                date[j], duree[j], distance[j], date[i], duree[i], distance[i])
+            if (chevauchement >= chevauchement_min and ecart_distance <= ecart_distance_max
+                    and ecart_duree <= ecart_duree_max):
+                racine_i, racine_j = _racine(parents, i), _racine(parents, j)
+                if racine_i != racine_j:
+                    parents[max(racine_i, racine_j)] = min(racine_i, racine_j)
+        heapq.heappush(ouvertes, (fins[i], i))
+    return np.array([_racine(parents, i) for i in range(n)], dtype=np.int64)
+
+
+def choisir_representants(groupe, duree, source=None):
+    """
+    Activité gardée pour chaque groupe : la version Strava si elle existe (comme
+    mergeActivities), sinon la plus longue. Retourne un masque des activités gardées.
+    """
+    duree = np.asarray(duree, dtype=np.float64)
+    prioritaire = np.zeros(len(groupe), dtype=bool) if source is None else \
+        np.array([SOURCE_PRIORITAIRE in str(s).lower() for s in source], dtype=bool)
+    # Tri par groupe, puis priorité et durée décroissantes : la première ligne de chaque groupe gagne
+    ordre = np.lexsort((-duree, ~prioritaire, groupe))
+    premier = np.ones(len(ordre), dtype=bool)
+    premier[1:] = groupe[ordre][1:] != groupe[ordre][:-1]
+    gardees = np.zeros(len(groupe), dtype=bool)
+    gardees[ordre[premier]] = True
+    return gardees
+
+
+def calculer_volume_hebdo_moyen_dedoublonne(stockage, athlete, fin, nb_semaines=4, sport='course'):
+    """VolumeHebdoMoyenDistance (km) sur les nb_semaines précédant fin, chaque sortie comptée une fois."""
+    debut = int(fin) - nb_semaines * SECONDES_PAR_SEMAINE
+    colonnes = stockage.lire_colonnes(athlete, debut, fin, sport)
+    groupe = trouver_doublons(colonnes['date'], colonnes['duree'], colonnes['distance'], colonnes['source'])
+    gardees = choisir_representants(groupe, colonnes['duree'], colonnes['source'])
+    return colonnes['distance'][gardees].sum() / nb_semaines
+
+
+def fusionner_doublons(stockage, athlete, debut, fin, sport=None):
+    """
+    Fusionne dans l'historique les doublons d'un athlète sur [debut, fin[.
+
+    L'activité gardée complète sa FC moyenne et son flux de FC avec ceux des doublons et
+    sa source devient 'source1 + source2' ; les doublons sont supprimés dans la même
+    transaction (les déclencheurs des agrégats les tiennent à jour).
+    :return: nombre d'activités supprimées.
+    """
+    colonnes = stockage.lire_colonnes(athlete, debut, fin, sport)
+    groupe = trouver_doublons(colonnes['date'], colonnes['duree'], colonnes['distance'], colonnes['source'])
+    gardees = choisir_representants(groupe, colonnes['duree'], colonnes['source'])
+
+    fusionnees, supprimees = [], []
+    for racine in np.unique(groupe[~gardees]):
+        membres = np.flatnonzero(groupe == racine)
+        principale = stockage.lire_activite(colonnes['id'][membres[gardees[membres]][0]])
+        sources = [principale['source']]
+        for indice in membres[~gardees[membres]]:
+            doublon = stockage.lire_activite(colonnes['id'][indice])
+            if principale['fc_moyenne'] is None:
+                principale['fc_moyenne'] = doublon['fc_moyenne']
+            if len(doublon['flux_fc'] or b'') > len(principale['flux_fc'] or b''):
+                principale['flux_fc'] = doublon['flux_fc']
+            if doublon['source'] not in sources:
+                sources.append(doublon['source'])
+            supprimees.append(doublon['id'])
+        principale['source'] = ' + '.join(str(s) for s in sources)
+        fusionnees.append(principale)
+    if supprimees:
+        stockage.fusionner_activites(fusionnees, supprimees)
+    return len(supprimees)
+
+
+def _generer_historique(nb_sorties, graine=0):
+    # Chaque sortie est reçue de 1 à 4 sources avec un léger décalage et des mesures différentes
+    rng = np.random.default_rng(graine)
+    sources = np.array(['garmin', 'strava', 'polar', 'suunto'])
+    debuts = np.cumsum(rng.uniform(0.3, 2.5, nb_sorties) * 24 * 3600).astype(np.int64)
+    durees = rng.uniform(25, 120, nb_sorties)
+    distances = durees / 60 * rng.uniform(8, 14, nb_sorties)
+    activites = []
+    for k in range(nb_sorties):
+        for s in rng.choice(sources, rng.integers(1, 5), replace=False):
+            activites.append({'id': f'{s}-{k}', 'athlete': 'demo', 'sport': 'course', 'source': str(s),
+                              'date': int(debuts[k] + rng.integers(-30, 30)),
+                              'duree': float(durees[k] * rng.uniform(0.95, 1.05)),
+                              'distance': float(distances[k] * rng.uniform(0.97, 1.03)),
+                              'fc_moyenne': None if rng.random() < 0.3 else float(rng.uniform(130, 160))})
+    return activites
+
+
+if __name__ == '__main__':
+    nb_sorties = int(input('nombre de sorties (chacune reçue de 1 à 4 sources) :'))
+    activites = _generer_historique(nb_sorties)
+    date = np.array([a['date'] for a in activites])
+    duree = np.array([a['duree'] for a in activites])
+    distance = np.array([a['distance'] for a in activites])
+    source = np.array([a['source'] for a in activites], dtype=object)
+
+    debut = time.perf_counter()
+    groupe = trouver_doublons(date, duree, distance, source)
+    gardees = choisir_representants(groupe, duree, source)
+    print(f'\n{len(activites)} activités dédoublonnées en {(time.perf_counter() - debut) * 1000:.0f} ms : '
+          f'{int(gardees.sum())} sorties retrouvées sur {nb_sorties}')
+
+    stockage = StockageActivites(':memory:')
+    stockage.inserer_activites(activites)
+    fin = int(date.max()) + 1
+    avant = stockage.calculer_volume_hebdo_moyen('demo', fin)
+    attendu = calculer_volume_hebdo_moyen_dedoublonne(stockage, 'demo', fin)
+    debut = time.perf_counter()
+    nb_supprimees = fusionner_doublons(stockage, 'demo', 0, fin)
+    print(f'{nb_supprimees} doublons fusionnés dans l\'historique en {(time.perf_counter() - debut) * 1000:.0f} ms')
+    print(f'Volume hebdomadaire moyen : {avant:.1f} km avant, {stockage.calculer_volume_hebdo_moyen("demo", fin):.1f} km '
+          f'après fusion ({attendu:.1f} km attendus)')
+    stockage.fermer()
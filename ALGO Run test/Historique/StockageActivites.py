@@ -0,0 +1,186 @@
+import sys
+import sqlite3
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Flux.CodecFlux import encoder_flux
+
+# Les dates sont des horodatages Unix (secondes, UTC) du début de l'activité,
+# les distances sont en km et les durées en minutes comme dans le reste du projet.
+SECONDES_PAR_SEMAINE = 7 * 24 * 3600
+COLONNES_NUMERIQUES = (
+    ('date', np.int64),
+    ('distance', np.float64),
+    ('duree', np.float64),
+    ('fc_moyenne', np.float64),
+    ('charge', np.float64),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activites (
+    id TEXT PRIMARY KEY,
+    athlete TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    sport TEXT NOT NULL,
+    source TEXT,
+    distance REAL NOT NULL DEFAULT 0,
+    duree REAL NOT NULL DEFAULT 0,
+    fc_moyenne REAL,
+    charge REAL NOT NULL DEFAULT 0,
+    flux_fc BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_activites_athlete_date ON activites (athlete, date);
+CREATE INDEX IF NOT EXISTS idx_activites_athlete_sport_date ON activites (athlete, sport, date);
+CREATE TABLE IF NOT EXISTS checkpoints_sync (
+    athlete TEXT NOT NULL,
+    source TEXT NOT NULL,
+    dernier_sync INTEGER NOT NULL,
+    PRIMARY KEY (athlete, source)
+);
+"""
+
+
+def _ligne_activite(activite):
+    flux_fc = activite.get('flux_fc')
+    if flux_fc is not None and not isinstance(flux_fc, (bytes, bytearray, memoryview)):
+        flux_fc = encoder_flux(flux_fc, 'fc')
+    return (
+        str(activite['id']),
+        str(activite['athlete']),
+        int(activite['date']),
+        activite.get('sport', 'course'),
+        activite.get('source'),
+        float(activite.get('distance', 0)),
+        float(activite.get('duree', 0)),
+        activite.get('fc_moyenne'),
+        float(activite.get('charge', 0)),
+        flux_fc,
+    )
+
+
+class StockageActivites:
+    """Historique des activités dans un fichier SQLite, indexé par athlète, sport et date."""
+
+    def __init__(self, chemin='historique.db'):
+        self.connexion = sqlite3.connect(str(chemin))
+        self.connexion.execute('PRAGMA journal_mode=WAL')
+        self.connexion.execute('PRAGMA synchronous=NORMAL')
+        self.connexion.executescript(_SCHEMA)
+
+    def _ecrire(self, lignes):
+        self.connexion.executemany(
+            'INSERT OR REPLACE INTO activites VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', lignes)
+
+    def fermer(self):
+        self.connexion.close()
+
+    def inserer_activites(self, activites):
+        """Insère (ou remplace) un lot d'activités dans une seule transaction."""
+        lignes = [_ligne_activite(a) for a in activites]
+        with self.connexion:
+            self._ecrire(lignes)
+        return len(lignes)
+
+    def enregistrer_lot_historique(self, activites, athlete, source, horodatage_sync):
+        """Insère un lot et avance le checkpoint de synchronisation de façon atomique."""
+        lignes = [_ligne_activite(a) for a in activites]
+        with self.connexion:
+            self._ecrire(lignes)
+            self.connexion.execute(
+                'INSERT INTO checkpoints_sync VALUES (?, ?, ?) '
+                'ON CONFLICT (athlete, source) DO UPDATE SET dernier_sync = MAX(dernier_sync, excluded.dernier_sync)',
+                (athlete, source, int(horodatage_sync)))
+        return len(lignes)
+
+    def fusionner_activites(self, activites, ids_supprimes):
+        """Remplace les activités fusionnées et supprime leurs doublons dans une seule transaction."""
+        lignes = [_ligne_activite(a) for a in activites]
+        with self.connexion:
+            self._ecrire(lignes)
+            self.connexion.executemany('DELETE FROM activites WHERE id = ?', [(str(i),) for i in ids_supprimes])
+        return len(ids_supprimes)
+
+    def lire_dernier_sync(self, athlete, source):
+        """Horodatage de la dernière synchronisation réussie (0 si jamais synchronisé)."""
+        ligne = self.connexion.execute(
+            'SELECT dernier_sync FROM checkpoints_sync WHERE athlete = ? AND source = ?',
+            (athlete, source)).fetchone()
+        return ligne[0] if ligne else 0
+
+    def supprimer_activites(self, ids):
+        with self.connexion:
+            curseur = self.connexion.executemany(
+                'DELETE FROM activites WHERE id = ?', [(str(i),) for i in ids])
+        return curseur.rowcount
+
+    def lire_activite(self, id_activite):
+        curseur = self.connexion.execute('SELECT * FROM activites WHERE id = ?', (str(id_activite),))
+        ligne = curseur.fetchone()
+        if ligne is None:
+            return None
+        return dict(zip([c[0] for c in curseur.description], ligne))
+
+    def lire_colonnes(self, athlete, debut, fin, sport=None):
+        """
+        Parcourt les activités d'un athlète sur [debut, fin[ par l'index (athlète, sport, date).
+
+        :return: un dictionnaire de colonnes NumPy (date, distance, duree, fc_moyenne, charge)
+                 plus les colonnes 'id' et 'source'. Les FC moyennes absentes valent NaN.
+        """
+        noms = ', '.join(nom for nom, _ in COLONNES_NUMERIQUES)
+        if sport is None:
+            requete = f'SELECT {noms}, id, source FROM activites WHERE athlete = ? AND date >= ? AND date < ? ORDER BY date'
+            parametres = (athlete, int(debut), int(fin))
+        else:
+            requete = (f'SELECT {noms}, id, source FROM activites '
+                       'WHERE athlete = ? AND sport = ? AND date >= ? AND date < ? ORDER BY date')
+            parametres = (athlete, sport, int(debut), int(fin))
+        lignes = self.connexion.execute(requete, parametres).fetchall()
+
+        colonnes = {}
+        for i, (nom, dtype) in enumerate(COLONNES_NUMERIQUES):
+            valeurs = (np.nan if ligne[i] is None else ligne[i] for ligne in lignes)
+            colonnes[nom] = np.fromiter(valeurs, dtype=dtype, count=len(lignes))
+        colonnes['id'] = np.array([ligne[-2] for ligne in lignes], dtype=object)
+        colonnes['source'] = np.array([ligne[-1] for ligne in lignes], dtype=object)
+        return colonnes
+
+    def calculer_volume_hebdo_moyen(self, athlete, fin, nb_semaines=4, sport='course'):
+        """VolumeHebdoMoyenDistance (km) sur les nb_semaines précédant fin, en une requête indexée."""
+        debut = int(fin) - nb_semaines * SECONDES_PAR_SEMAINE
+        total, = self.connexion.execute(
+            'SELECT COALESCE(SUM(distance), 0) FROM activites '
+            'WHERE athlete = ? AND sport = ? AND date >= ? AND date < ?',
+            (athlete, sport, debut, int(fin))).fetchone()
+        return total / nb_semaines
+
+
+if __name__ == '__main__':
+    chemin = input('chemin du fichier historique (ex: historique.db) :')
+    nb_activites = int(input("nombre d'activités à générer :"))
+    stockage = StockageActivites(chemin)
+
+    maintenant = int(time.time())
+    rng = np.random.default_rng(0)
+    dates = np.sort(rng.integers(maintenant - 52 * SECONDES_PAR_SEMAINE, maintenant, nb_activites))
+    activites = [
+        {'id': f'demo-{i}', 'athlete': 'demo', 'date': int(d), 'sport': 'course', 'source': 'demo',
+         'distance': float(rng.uniform(5, 20)), 'duree': float(rng.uniform(25, 110)), 'charge': float(rng.uniform(20, 150))}
+        for i, d in enumerate(dates)
+    ]
+
+    debut = time.perf_counter()
+    stockage.enregistrer_lot_historique(activites, 'demo', 'demo', maintenant)
+    print(f"\n{nb_activites} activités insérées en {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    debut = time.perf_counter()
+    volume = stockage.calculer_volume_hebdo_moyen('demo', maintenant)
+    print(f'Volume hebdomadaire moyen (4 semaines) : {volume:.1f} km '
+          f'({(time.perf_counter() - debut) * 1e6:.0f} µs)')
+    colonnes = stockage.lire_colonnes('demo', maintenant - 52 * SECONDES_PAR_SEMAINE, maintenant, 'course')
+    print(f"Distance totale sur un an : {colonnes['distance'].sum():.0f} km")
+    print(f"Dernière synchronisation : {stockage.lire_dernier_sync('demo', 'demo')}")
+    stockage.fermer()
@@ -0,0 +1 @@
+# Package Historique - Stockage local de l'historique des activités
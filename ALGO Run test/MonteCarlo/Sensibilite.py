@@ -0,0 +1,119 @@
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Batch.ZonesBatch import COEFFICIENTS, POURCENTAGES_ZONES, calculer_chaine_batch, calculer_zones_tps_batch
+
+# Écarts-types des perturbations gaussiennes. Entrées : erreur de mesure ou de saisie.
+# Coefficients : incertitude des régressions, exprimée sur la constante de chaque
+# formule (35 sur la constante de FCM ~ 7 bpm d'erreur sur la FCM).
+INCERTITUDES = {
+    'poids': 0.5,
+    'FCRepos': 2.0,
+    'fcm_constante': 35.0,
+    'k_base': 0.5,
+    'k_pente': 0.1,
+    'vma_constante': 1.0,
+}
+PERCENTILES = (5, 25, 50, 75, 95)
+TAILLE_LOT = 256
+GRANDEURS = ('FCM', 'VO2max', 'VMA', 'zonesFC', 'zonesVitesse', 'zonesAllure', 'zonesTPS')
+
+
+def _simuler_lot(graine, age, sexe, poids, FCRepos, Distance, nb_tirages, incertitudes, percentiles):
+    """Bandes de percentiles d'un lot d'athlètes (exécuté dans un processus de travail)."""
+    rng = np.random.default_rng(graine)
+    forme = (len(age), nb_tirages)
+
+    def perturber(nom, valeur):
+        ecart = incertitudes.get(nom, 0.0)
+        if ecart == 0.0:
+            return valeur
+        return valeur + rng.normal(0.0, ecart, forme)
+
+    coefficients = dict(COEFFICIENTS)
+    for nom in ('k_base', 'k_pente', 'vma_constante'):
+        coefficients[nom] = perturber(nom, COEFFICIENTS[nom])
+    # Même erreur de régression pour les deux sexes : seule la constante diffère
+    ecart_fcm = perturber('fcm_constante', 0.0)
+    coefficients['fcm_constante_H'] = COEFFICIENTS['fcm_constante_H'] + ecart_fcm
+    coefficients['fcm_constante_F'] = COEFFICIENTS['fcm_constante_F'] + ecart_fcm
+
+    FCRepos = perturber('FCRepos', FCRepos[:, None].astype(np.float64))
+    chaine = calculer_chaine_batch(age[:, None], sexe[:, None],
+                                   perturber('poids', poids[:, None].astype(np.float64)), FCRepos, coefficients)
+
+    def bandes(valeurs, q=percentiles):
+        # Percentiles sur l'axe des tirages : (athlètes, percentiles)
+        return np.percentile(valeurs, q, axis=1).T
+
+    resultat = {nom: bandes(chaine[nom]) for nom in ('FCM', 'VO2max', 'VMA')}
+    bornesFC = np.stack([bandes((1 - p) * FCRepos + p * chaine['FCM']) for p in POURCENTAGES_ZONES], axis=-1)
+    # Vitesse, allure et temps sont des fonctions monotones de la seule VMA : leurs
+    # percentiles se déduisent de ceux de la VMA sans matérialiser les zones par tirage.
+    # Le percentile q d'une allure (décroissante) est donné par le percentile 100 - q de la VMA.
+    bornesV = resultat['VMA'][..., None] * POURCENTAGES_ZONES
+    bornesA = 60 / (bandes(chaine['VMA'], [100 - q for q in percentiles])[..., None] * POURCENTAGES_ZONES)
+    resultat['zonesFC'] = np.stack([bornesFC[..., :-1], bornesFC[..., 1:]], axis=-1)
+    resultat['zonesVitesse'] = np.stack([bornesV[..., :-1], bornesV[..., 1:]], axis=-1)
+    resultat['zonesAllure'] = np.stack([bornesA[..., 1:], bornesA[..., :-1]], axis=-1)
+    resultat['zonesTPS'] = calculer_zones_tps_batch(resultat['zonesAllure'], Distance[:, None])
+    return resultat
+
+
+def simuler_sensibilite(age, sexe, poids, FCRepos, Distance=10, nb_tirages=10000, graine=0,
+                        incertitudes=INCERTITUDES, percentiles=PERCENTILES, nb_processus=None,
+                        taille_lot=TAILLE_LOT):
+    """
+    Bandes d'incertitude des zones et des temps prédits pour une population d'athlètes.
+
+    Les athlètes sont découpés en lots de taille_lot ; chaque lot reçoit son propre flux
+    aléatoire issu de SeedSequence(graine).spawn, si bien que le résultat ne dépend que de
+    la graine et de taille_lot, pas du nombre de processus.
+    :return: dictionnaire {grandeur: tableau (athlètes, percentiles, ...)} pour
+             'FCM', 'VO2max', 'VMA', 'zonesFC', 'zonesVitesse', 'zonesAllure' et 'zonesTPS'.
+    """
+    age, sexe, poids, FCRepos, Distance = (np.atleast_1d(np.asarray(x)) for x in (age, sexe, poids, FCRepos, Distance))
+    age, sexe, poids, FCRepos, Distance = np.broadcast_arrays(age, sexe, poids, FCRepos, Distance)
+    debuts = range(0, len(age), taille_lot)
+    graines = np.random.SeedSequence(graine).spawn(len(debuts))
+    lots = [(g, age[i:i + taille_lot], sexe[i:i + taille_lot], poids[i:i + taille_lot],
+             FCRepos[i:i + taille_lot], Distance[i:i + taille_lot], nb_tirages, incertitudes, percentiles)
+            for g, i in zip(graines, debuts)]
+
+    if nb_processus == 1 or len(lots) == 1:
+        resultats = [_simuler_lot(*lot) for lot in lots]
+    else:
+        with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+            resultats = list(executeur.map(_simuler_lot, *zip(*lots)))
+    return {nom: np.concatenate([r[nom] for r in resultats]) for nom in GRANDEURS}
+
+
+if __name__ == '__main__':
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    Distance = float(input('la distance :'))
+    nb_tirages = int(input('nombre de tirages (ex: 1000000) :'))
+
+    debut = time.perf_counter()
+    bandes = simuler_sensibilite(age, sexe, poids, FCRepos, Distance, nb_tirages)
+    print(f'\n{nb_tirages} tirages en {time.perf_counter() - debut:.2f} s')
+    print(f"VMA (percentiles {PERCENTILES}) : " + ', '.join(f'{v:.2f}' for v in bandes['VMA'][0]) + ' km/h')
+    for zone in range(5):
+        p5, p50, p95 = (bandes['zonesTPS'][0, PERCENTILES.index(p), zone] for p in (5, 50, 95))
+        print(f'Zone {zone + 1} : temps sur {Distance} km {p50[0]:.1f} - {p50[1]:.1f} min '
+              f'(bande 90 % : {p5[0]:.1f} - {p95[1]:.1f} min)')
+
+    nb_athletes = 2000
+    rng = np.random.default_rng(1)
+    debut = time.perf_counter()
+    bandes = simuler_sensibilite(rng.integers(18, 70, nb_athletes), rng.choice(['H', 'F'], nb_athletes),
+                                 rng.integers(45, 100, nb_athletes), rng.integers(40, 80, nb_athletes),
+                                 Distance, nb_tirages=500)
+    print(f'\nPopulation de {nb_athletes} athlètes x 500 tirages en {time.perf_counter() - debut:.2f} s')
@@ -0,0 +1,64 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from VitesseCritique.VitesseCritique import ajuster_vitesse_critique
+
+# Vitesse critique de nage (CSS) : pente de la droite distance = CSS * temps + D', soit
+# avec le test classique 400 m / 200 m : CSS = 200 / (T400 - T200).
+# Les vitesses sont en m/s et les allures en minutes par 100 m.
+DUREE_MIN_TEST = 1
+DUREE_MAX_TEST = 40
+
+
+def calculer_css(T400, T200):
+    """CSS (m/s) à partir des temps (secondes) d'un 400 m et d'un 200 m."""
+    if T400 <= T200:
+        return None
+    return 200 / (T400 - T200)
+
+
+def calculer_allure_css(CSS):
+    """Allure CSS en minutes par 100 m."""
+    return 100 / CSS / 60
+
+
+def calculer_css_batch(distances, temps):
+    """
+    CSS et D' de nombreux nageurs à partir de tests de longueurs quelconques.
+
+    :param distances: tableau (nageurs, tests) en mètres, NaN pour un test absent.
+    :param temps: tableau (nageurs, tests) en secondes.
+    :return: {'CSS' (m/s), 'DPrime' (m), 'allure' (min/100 m), 'r2', 'nb_tests'} ;
+             NaN pour un nageur ayant moins de deux tests exploitables.
+    """
+    ajustement = ajuster_vitesse_critique(np.asarray(temps, dtype=np.float64) / 60,
+                                          np.asarray(distances, dtype=np.float64) / 1000,
+                                          DUREE_MIN_TEST, DUREE_MAX_TEST)
+    CSS = ajustement['VitesseCritique'] / 3.6
+    return {'CSS': CSS, 'DPrime': ajustement['DPrime'], 'allure': 100 / CSS / 60,
+            'r2': ajustement['r2'], 'nb_tests': ajustement['nb_efforts']}
+
+
+if __name__ == '__main__':
+    T400 = float(input('votre temps sur 400 m (secondes) :'))
+    T200 = float(input('votre temps sur 200 m (secondes) :'))
+    CSS = calculer_css(T400, T200)
+    if CSS is None:
+        print('le temps du 400 m doit être supérieur à celui du 200 m')
+    else:
+        allure = calculer_allure_css(CSS)
+        print(f'\nCSS : {CSS:.3f} m/s, soit {int(allure)}:{int((allure - int(allure)) * 60):02d} /100 m')
+
+        nb_nageurs = 100000
+        rng = np.random.default_rng(0)
+        css_vraie = rng.uniform(0.8, 1.6, nb_nageurs)
+        distances = np.tile([200.0, 400.0, 800.0], (nb_nageurs, 1))
+        temps = (distances - rng.uniform(10, 30, (nb_nageurs, 1))) / css_vraie[:, None]
+        debut = time.perf_counter()
+        resultat = calculer_css_batch(distances, temps)
+        print(f'{nb_nageurs} nageurs ajustés en {(time.perf_counter() - debut) * 1000:.1f} ms '
+              f"(écart max {np.abs(resultat['CSS'] - css_vraie).max():.1e} m/s)")
@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+
+# Bassin par défaut quand la longueur n'est pas connue (comme l'application)
+LONGUEUR_BASSIN_DEFAUT = 25.0
+
+
+def calculer_swolf(temps_longueur, coups):
+    """SWOLF d'une longueur : temps (secondes) + nombre de coups de bras."""
+    return temps_longueur + coups
+
+
+def calculer_stats_longueurs(temps, coups, longueur_bassin=LONGUEUR_BASSIN_DEFAUT):
+    """
+    Statistiques par longueur, tous tableaux diffusables (NaN pour une longueur absente).
+    Une longueur sans coups (0 ou NaN) a swolf, distance_par_coup, frequence et
+    indice_nage à NaN, comme elle est exclue de ces moyennes dans calculer_stats_seances.
+
+    :param temps: durée de chaque longueur (secondes).
+    :param coups: coups de bras par longueur.
+    :return: {'swolf', 'vitesse' (m/s), 'allure' (min/100 m), 'distance_par_coup' (m),
+              'frequence' (coups/min), 'indice_nage' (vitesse x distance par coup)}.
+    """
+    temps = np.asarray(temps, dtype=np.float64)
+    coups = np.asarray(coups, dtype=np.float64)
+    longueur_bassin = np.asarray(longueur_bassin, dtype=np.float64)
+    avec_coups = np.isfinite(coups) & (coups > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vitesse = longueur_bassin / temps
+        distance_par_coup = np.where(avec_coups, longueur_bassin / coups, np.nan)
+        return {
+            'swolf': np.where(avec_coups, temps + coups, np.nan),
+            'vitesse': vitesse,
+            'allure': 100 / vitesse / 60,
+            'distance_par_coup': distance_par_coup,
+            'frequence': np.where(avec_coups, coups / temps * 60, np.nan),
+            'indice_nage': vitesse * distance_par_coup,
+        }
+
+
+def calculer_stats_seances(seance, temps, coups, longueur_bassin=LONGUEUR_BASSIN_DEFAUT, nb_seances=None):
+    """
+    Agrège les longueurs de tout un historique, par séance, sans boucle Python.
+
+    :param seance: numéro de séance (0 .. nb_seances - 1) de chaque longueur.
+    :param temps: durée de chaque longueur (secondes) ; coups : coups de bras par longueur.
+    :param longueur_bassin: longueur du bassin par longueur (ou scalaire).
+    :return: dictionnaire de tableaux par séance : 'nb_longueurs', 'distance' (m), 'duree' (s),
+             'swolf' (moyen), 'vitesse' (m/s), 'allure' (min/100 m), 'distance_par_coup',
+             'frequence' (coups/min), 'indice_nage'. Les longueurs sans coups comptent pour
+             la distance et la durée mais pas pour les moyennes liées aux coups.
+    """
+    seance = np.asarray(seance, dtype=np.int64)
+    temps = np.asarray(temps, dtype=np.float64)
+    coups = np.asarray(coups, dtype=np.float64)
+    longueur = np.broadcast_to(np.asarray(longueur_bassin, dtype=np.float64), temps.shape)
+    nb_seances = int(seance.max()) + 1 if nb_seances is None else nb_seances
+
+    def somme(valeurs):
+        return np.bincount(seance, weights=valeurs, minlength=nb_seances)
+
+    avec_coups = np.isfinite(coups) & (coups > 0)
+    coups_valides = np.where(avec_coups, coups, 0.0)
+    nb_longueurs = np.bincount(seance, minlength=nb_seances)
+    nb_avec_coups = somme(avec_coups.astype(np.float64))
+    distance = somme(longueur)
+    duree = somme(temps)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vitesse = distance / duree
+        distance_coups = somme(np.where(avec_coups, longueur, 0.0))
+        duree_coups = somme(np.where(avec_coups, temps, 0.0))
+        nb_coups = somme(coups_valides)
+        distance_par_coup = distance_coups / nb_coups
+        return {
+            'nb_longueurs': nb_longueurs,
+            'distance': distance,
+            'duree': duree,
+            'swolf': somme(np.where(avec_coups, temps + coups_valides, 0.0)) / nb_avec_coups,
+            'vitesse': vitesse,
+            'allure': 100 / vitesse / 60,
+            'distance_par_coup': distance_par_coup,
+            'frequence': nb_coups / duree_coups * 60,
+            'indice_nage': distance_coups / duree_coups * distance_par_coup,
+        }
+
+
+if __name__ == '__main__':
+    temps_longueur = float(input("temps d'une longueur (secondes) :"))
+    coups = int(input('nombre de coups de bras :'))
+    longueur_bassin = float(input('longueur du bassin (m) :'))
+    stats = calculer_stats_longueurs(temps_longueur, coups, longueur_bassin)
+    print(f"\nSWOLF : {stats['swolf']:.0f}")
+    print(f"Distance par coup : {stats['distance_par_coup']:.2f} m, fréquence : {stats['frequence']:.0f} coups/min")
+
+    # Historique : 2000 séances de 40 à 120 longueurs
+    rng = np.random.default_rng(0)
+    nb_par_seance = rng.integers(40, 121, 2000)
+    seance = np.repeat(np.arange(2000), nb_par_seance)
+    temps = rng.normal(24, 2, len(seance))
+    coups_historique = np.rint(rng.normal(17, 2, len(seance)))
+    debut = time.perf_counter()
+    seances = calculer_stats_seances(seance, temps, coups_historique)
+    print(f"\n{len(seance)} longueurs de 2000 séances agrégées en {(time.perf_counter() - debut) * 1000:.1f} ms "
+          f"(SWOLF moyen {np.mean(seances['swolf']):.1f})")
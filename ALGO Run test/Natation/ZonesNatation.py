@@ -0,0 +1,58 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Natation.CSS import calculer_css
+
+# Bornes des 5 zones de nage en fraction de la CSS (vitesse) :
+# Z1 récupération, Z2 endurance, Z3 tempo, Z4 seuil (autour de la CSS), Z5 VO2max
+POURCENTAGES_ZONES_NATATION = np.array([0.70, 0.80, 0.90, 0.97, 1.03, 1.10])
+
+
+def calculer_zones_natation(CSS):
+    """
+    Zones d'allure de nage (minutes par 100 m), au format de calculer_zones_allure :
+    un couple (rapide, lente) par zone.
+    """
+    vitesses = [CSS * p for p in POURCENTAGES_ZONES_NATATION]
+    return tuple((100 / vitesses[i + 1] / 60, 100 / vitesses[i] / 60) for i in range(5))
+
+
+def calculer_zones_natation_batch(CSS, dtype=np.float64):
+    """
+    Zones de nage de nombreux nageurs : tableaux de forme (..., 5, 2).
+
+    :return: {'zonesVitesse' (m/s, (basse, haute)), 'zonesAllure' (min/100 m, (rapide, lente))}.
+    """
+    bornes = np.asarray(CSS, dtype=dtype)[..., None] * POURCENTAGES_ZONES_NATATION.astype(dtype)
+    allures = 100 / bornes / 60
+    return {
+        'zonesVitesse': np.stack([bornes[..., :-1], bornes[..., 1:]], axis=-1),
+        'zonesAllure': np.stack([allures[..., 1:], allures[..., :-1]], axis=-1),
+    }
+
+
+if __name__ == '__main__':
+    T400 = float(input('votre temps sur 400 m (secondes) :'))
+    T200 = float(input('votre temps sur 200 m (secondes) :'))
+    CSS = calculer_css(T400, T200)
+    if CSS is None:
+        print('le temps du 400 m doit être supérieur à celui du 200 m')
+    else:
+        zones = calculer_zones_natation(CSS)
+        print("\nZones d'allure de nage :")
+        for i, zone in enumerate(zones, 1):
+            minutes_lent = int(zone[1])
+            secondes_lent = int((zone[1] - minutes_lent) * 60)
+            minutes_rapide = int(zone[0])
+            secondes_rapide = int((zone[0] - minutes_rapide) * 60)
+            print(f"Zone {i} : {minutes_lent}:{secondes_lent:02d} - {minutes_rapide}:{secondes_rapide:02d} /100 m")
+
+        nb_nageurs = 1000000
+        CSS_population = np.random.default_rng(0).uniform(0.8, 1.6, nb_nageurs)
+        debut = time.perf_counter()
+        calculer_zones_natation_batch(CSS_population)
+        print(f'\nZones de {nb_nageurs} nageurs en {(time.perf_counter() - debut) * 1000:.1f} ms')
@@ -0,0 +1,346 @@
+import sys
+import os
+import json
+import time
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from main import calculer
+from beta import calculer_profil, generer_plan_structure
+from ZonesAllure.Zones_A import calculer_zones_allure
+from ZonesFC.Methode_de_Karvonen.Zones_FC import calculer_zones_karvonen
+from ZonesVitesse.Zones_V import calculer_zones_vitesse
+from ZonesTPS.Zones_TPS import calculer_Zones_TPS
+from VolumePIC.VolumePIC import calculer_volume_pic
+from Batch.ZonesBatch import calculer_zones_batch, calculer_zones_tps_batch
+from Batch.VolumePICBatch import calculer_volume_pic_batch
+from Batch.CalculBatch import calculer_batch, COLONNES_REELLES
+from Batch.PrecisionReduite import (ERREUR_RELATIVE_FLOAT32, GRILLE_VERIFICATION, DISTANCES_VERIFICATION,
+                                    verifier_precision)
+from TablesPartagees.TablesProfils import TableProfils, construire_table
+from CachePlans.CachePlans import CachePlans, generer_plan_en_cache
+
+# Oracle différentiel : chaque moteur rapide (vectorisé, en cache, par table) est comparé
+# aux fonctions scalaires de référence, celles de formules_et_principes.txt, sur des
+# entrées générées aléatoirement et sur tous les coins de GRILLE_VERIFICATION.
+# Une valeur est conforme si |rapide - référence| <= tolérance * max(|référence|, 1) :
+# erreur relative, absolue autour de zéro. Les entiers (phases, répétitions) sont exacts.
+# 'precision_reduite' reprend les contrôles de verifier_precision (float32 et virgule fixe
+# int16) : son écart est le plus grand rapport erreur / borne documentée, conforme sous 1.
+TOLERANCES = {
+    'zones_batch': 1e-12,
+    'zones_float32': ERREUR_RELATIVE_FLOAT32,
+    'table_profils': 1e-12,
+    'volume_pic_batch': 1e-12,
+    'calculer_batch': 1e-12,
+    'plan_cache': 1e-12,
+    'precision_reduite': 1.0,
+}
+MOTEURS = tuple(TOLERANCES)
+# Proportion d'athlètes dont la VMA est fournie (tests, records) au lieu de la formule
+PROPORTION_VMA_FOURNIE = 0.3
+
+
+def _coins(graine):
+    # Toutes les combinaisons des bornes de la grille, pour les deux sexes
+    g = GRILLE_VERIFICATION
+    champs = ('age', 'poids', 'FCRepos', 'VolumeHebdoMoyenDistance', 'DureeProgramme', 'ObjectifTPS')
+    coins = np.array(np.meshgrid(*([0, 1] for _ in champs), [0, 1], indexing='ij')).reshape(len(champs) + 1, -1)
+    rng = np.random.default_rng(graine)
+    entrees = {champ: np.where(coins[i] == 0, g[champ][0], g[champ][1]).astype(np.float64)
+               for i, champ in enumerate(champs)}
+    entrees['sexe'] = np.where(coins[-1] == 0, 'H', 'F')
+    nb = coins.shape[1]
+    entrees['Distance'] = rng.choice(DISTANCES_VERIFICATION, nb)
+    entrees['ObjectifDistance'] = rng.choice(DISTANCES_VERIFICATION, nb)
+    return entrees
+
+
+def generer_entrees(nb_athletes, graine=0):
+    """
+    Population de test : les coins de la grille puis des athlètes tirés au hasard.
+
+    Âge, FC de repos et durée sont entiers comme dans les saisies de l'application ; poids,
+    volume et temps objectif sont au dixième (le poids non entier fait passer TableProfils
+    par son calcul direct hors grille). 'VMA' vaut NaN quand la formule est utilisée.
+    :return: dictionnaire de colonnes NumPy de longueur nb_athletes.
+    """
+    rng = np.random.default_rng(graine)
+    g = GRILLE_VERIFICATION
+    coins = _coins(graine)
+    nb = max(nb_athletes - len(coins['age']), 0)
+    aleatoires = {
+        'age': rng.integers(g['age'][0], g['age'][1] + 1, nb).astype(np.float64),
+        'sexe': rng.choice(['H', 'F'], nb),
+        'poids': np.round(rng.uniform(*g['poids'], nb), 1),
+        'FCRepos': rng.integers(g['FCRepos'][0], g['FCRepos'][1] + 1, nb).astype(np.float64),
+        'Distance': rng.choice(DISTANCES_VERIFICATION, nb),
+        'VolumeHebdoMoyenDistance': np.round(rng.uniform(*g['VolumeHebdoMoyenDistance'], nb), 1),
+        'DureeProgramme': rng.integers(g['DureeProgramme'][0], g['DureeProgramme'][1] + 1, nb).astype(np.float64),
+        'ObjectifDistance': rng.choice(DISTANCES_VERIFICATION, nb),
+        'ObjectifTPS': np.round(rng.uniform(*g['ObjectifTPS'], nb), 1),
+    }
+    entrees = {champ: np.concatenate([coins[champ], valeurs])[:nb_athletes] for champ, valeurs in aleatoires.items()}
+    VMA = np.full(nb_athletes, np.nan)
+    fournie = rng.random(nb_athletes) < PROPORTION_VMA_FOURNIE
+    VMA[fournie] = np.round(rng.uniform(8, 24, int(fournie.sum())), 2)
+    entrees['VMA'] = VMA
+    return entrees
+
+
+def _arguments(entrees, i):
+    # Arguments scalaires de l'athlète i, dans l'ordre de calculer()
+    age, poids, FCRepos, DureeProgramme = (int(entrees[c][i]) if c != 'poids' else float(entrees[c][i])
+                                           for c in ('age', 'poids', 'FCRepos', 'DureeProgramme'))
+    return (age, str(entrees['sexe'][i]), poids, FCRepos, float(entrees['Distance'][i]),
+            float(entrees['VolumeHebdoMoyenDistance'][i]), DureeProgramme,
+            float(entrees['ObjectifDistance'][i]), float(entrees['ObjectifTPS'][i]))
+
+
+def _vma(entrees, i):
+    VMA = entrees['VMA'][i]
+    return None if np.isnan(VMA) else float(VMA)
+
+
+# Références scalaires : une ligne de valeurs par athlète
+def _reference_zones(entrees, i, avec_vma=True):
+    age, sexe, poids, FCRepos, Distance = _arguments(entrees, i)[:5]
+    VMA = _vma(entrees, i) if avec_vma else None
+    return np.concatenate([np.ravel(calculer_zones_karvonen(age, sexe, poids, FCRepos)),
+                           np.ravel(calculer_zones_vitesse(age, sexe, poids, FCRepos, VMA)),
+                           np.ravel(calculer_zones_allure(age, sexe, poids, FCRepos, VMA)),
+                           np.ravel(calculer_Zones_TPS(age, sexe, poids, FCRepos, Distance, VMA))])
+
+
+def _reference_volume_pic(entrees, i):
+    age, sexe, poids, FCRepos, _, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS = \
+        _arguments(entrees, i)
+    return np.array(calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme,
+                                        ObjectifDistance, ObjectifTPS, VMA=_vma(entrees, i)))
+
+
+def _reference_calculer(entrees, i):
+    resultat = calculer(*_arguments(entrees, i), VMA=_vma(entrees, i))
+    return np.concatenate([np.ravel(x) for x in resultat])
+
+
+def _aplatir_plan(semaines):
+    # Valeurs du plan dans un ordre fixe ; les chaînes (types, phases) et la nature des
+    # couples (un tuple relu en liste n'est pas conforme) sont comparées à part
+    valeurs = []
+    libelles = []
+    for semaine in semaines:
+        libelles.append(semaine['phase'])
+        valeurs.extend((semaine['semaine'], semaine['volume'], semaine['nb_seances']))
+        for seance in semaine['seances']:
+            libelles.append(seance['type'])
+            for cle in sorted(seance):
+                if cle != 'type':
+                    if isinstance(seance[cle], (tuple, list)):
+                        libelles.append(type(seance[cle]).__name__)
+                    valeurs.extend(np.ravel(seance[cle]))
+    return np.array(valeurs, dtype=np.float64), libelles
+
+
+def _reference_plan(entrees, i):
+    age, sexe, poids, FCRepos, _, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS = \
+        _arguments(entrees, i)
+    return generer_plan_structure(calculer_profil(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance,
+                                                  DureeProgramme, ObjectifDistance, ObjectifTPS))
+
+
+# Moteurs rapides : toute la population en un appel, une ligne par athlète
+def _colonnes(entrees):
+    return (entrees['age'], entrees['sexe'], entrees['poids'], entrees['FCRepos'])
+
+
+def _zones_rapides(entrees, dtype=np.float64, zones=None):
+    n = len(entrees['age'])
+    if zones is None:
+        zones = calculer_zones_batch(*_colonnes(entrees), dtype=dtype, VMA=entrees['VMA'])
+    tps = calculer_zones_tps_batch(zones['zonesAllure'], entrees['Distance'])
+    return np.concatenate([zones[nom].reshape(n, 10) for nom in ('zonesFC', 'zonesVitesse', 'zonesAllure')]
+                          + [tps.reshape(n, 10)], axis=1)
+
+
+def _volume_pic_rapide(entrees):
+    zones = calculer_zones_batch(*_colonnes(entrees), VMA=entrees['VMA'])
+    return np.stack(calculer_volume_pic_batch(entrees['VolumeHebdoMoyenDistance'], entrees['DureeProgramme'],
+                                              entrees['ObjectifDistance'], entrees['ObjectifTPS'], zones['VMA']),
+                    axis=1)
+
+
+def _calculer_rapide(entrees):
+    resultats = calculer_batch(*(entrees[c] for c in ('age', 'sexe', 'poids', 'FCRepos', 'Distance',
+                                                       'VolumeHebdoMoyenDistance', 'DureeProgramme',
+                                                       'ObjectifDistance', 'ObjectifTPS')), VMA=entrees['VMA'])
+    # Même ordre que _reference_calculer : allure, FC, vitesse, TPS, VolumePIC, phases
+    n = len(resultats)
+    lignes = [_zones_par_athlete(resultats, prefixe, n) for prefixe in ('allure', 'fc', 'vitesse', 'tps')]
+    lignes.append(np.stack([resultats.colonne('VolumePICSecurise'), resultats.colonne('VolumePIC')], axis=1))
+    lignes.append(resultats.entiers.T.astype(np.float64))
+    return np.concatenate(lignes, axis=1)
+
+
+def _zones_par_athlete(resultats, prefixe, n):
+    indices = [i for i, nom in enumerate(COLONNES_REELLES) if nom.startswith(prefixe + '_')]
+    return resultats.reels[indices].T.reshape(n, 10)
+
+
+def _ecart(obtenu, attendu):
+    obtenu = np.asarray(obtenu, dtype=np.float64)
+    attendu = np.asarray(attendu, dtype=np.float64)
+    if obtenu.shape != attendu.shape:
+        return np.inf
+    if obtenu.size == 0:
+        return 0.0
+    return float(np.max(np.abs(obtenu - attendu) / np.maximum(np.abs(attendu), 1)))
+
+
+def _verifier_lignes(nom, entrees, reference, rapide, indices):
+    # Le moteur rapide traite toute la population, la référence un échantillon
+    debut = time.perf_counter()
+    obtenu = rapide(entrees)
+    duree_rapide = time.perf_counter() - debut
+    debut = time.perf_counter()
+    attendu = [reference(entrees, i) for i in indices]
+    duree_reference = time.perf_counter() - debut
+    ecarts = [_ecart(obtenu[i], ligne) for i, ligne in zip(indices, attendu)]
+    pire = int(np.argmax(ecarts)) if ecarts else None
+    return _rapport(nom, ecarts[pire] if ecarts else 0.0, len(indices), duree_reference / max(len(indices), 1),
+                    duree_rapide / len(entrees['age']), indices[pire] if ecarts else None)
+
+
+def _rapport(nom, ecart, nb_compares, duree_reference, duree_rapide, pire):
+    return {'moteur': nom, 'ecart': ecart, 'tolerance': TOLERANCES[nom], 'conforme': ecart <= TOLERANCES[nom],
+            'nb_compares': nb_compares, 'us_reference': duree_reference * 1e6, 'us_rapide': duree_rapide * 1e6,
+            'acceleration': duree_reference / duree_rapide if duree_rapide > 0 else np.inf, 'pire_athlete': pire}
+
+
+def _verifier_table(entrees, indices, dossier):
+    chemin = os.path.join(dossier, 'tables_profils.bin')
+    construire_table(chemin)
+    table = TableProfils(chemin)
+    sans_vma = dict(entrees, VMA=np.full(len(entrees['age']), np.nan))
+
+    def rapide(entrees):
+        return _zones_rapides(entrees, zones=table.calculer_zones(*_colonnes(entrees)))
+
+    def reference(entrees, i):
+        return _reference_zones(entrees, i, avec_vma=False)
+
+    return _verifier_lignes('table_profils', sans_vma, reference, rapide, indices)
+
+
+def _verifier_plans(entrees, indices, dossier):
+    # Le cache ne connaît pas de VMA fournie : plans calculés avec la formule. Chaque plan est
+    # demandé deux fois, le second passage (chronométré) est servi par la mémoire ; un second
+    # cache sans mémoire sur le même dossier vérifie ce qui est relu du disque (JSON).
+    cache = CachePlans(os.path.join(dossier, 'cache_plans'))
+    cache_disque = CachePlans(os.path.join(dossier, 'cache_plans'), nb_plans_memoire=0)
+    ecarts = []
+    duree_reference = 0.0
+    duree_rapide = 0.0
+    for i in indices:
+        debut = time.perf_counter()
+        attendu = _reference_plan(entrees, i)
+        duree_reference += time.perf_counter() - debut
+        arguments = _arguments(entrees, i)
+        arguments = arguments[:4] + arguments[5:]
+        generer_plan_en_cache(cache, *arguments)
+        debut = time.perf_counter()
+        obtenu = generer_plan_en_cache(cache, *arguments)
+        duree_rapide += time.perf_counter() - debut
+        valeurs_attendues, libelles_attendus = _aplatir_plan(attendu)
+        ecart = 0.0
+        for obtenu in (obtenu, generer_plan_en_cache(cache_disque, *arguments)):
+            valeurs_obtenues, libelles_obtenus = _aplatir_plan(obtenu)
+            ecart = max(ecart, _ecart(valeurs_obtenues, valeurs_attendues) if libelles_obtenus == libelles_attendus else np.inf)
+        ecarts.append(ecart)
+    pire = int(np.argmax(ecarts)) if ecarts else None
+    nb = max(len(indices), 1)
+    return _rapport('plan_cache', ecarts[pire] if ecarts else 0.0, len(indices), duree_reference / nb,
+                    duree_rapide / nb, indices[pire] if ecarts else None)
+
+
+def _verifier_precision_reduite(nb_athletes, nb_scalaires, graine):
+    # verifier_precision génère sa propre population sur GRILLE_VERIFICATION ; une assertion
+    # interne (phases différentes) rend le moteur non conforme sans interrompre l'oracle
+    debut = time.perf_counter()
+    try:
+        mesures = verifier_precision(nb_athletes, nb_scalaires, graine)
+        ecart = max(erreur / borne for erreur, borne in mesures.values())
+    except AssertionError:
+        ecart = np.inf
+    duree = time.perf_counter() - debut
+    return _rapport('precision_reduite', ecart, min(nb_scalaires, nb_athletes), np.nan, duree / nb_athletes, None)
+
+
+def verifier(moteurs=MOTEURS, nb_athletes=100000, nb_scalaires=2000, nb_plans=200, graine=0, lever=True):
+    """
+    Compare chaque moteur de moteurs (voir TOLERANCES) aux fonctions scalaires de référence.
+
+    Les nb_scalaires premiers athlètes (dont tous les coins de la grille) sont recalculés
+    par les fonctions scalaires ; les moteurs vectorisés traitent toute la population, ce
+    qui donne leur coût par athlète. 'plan_cache' compare nb_plans plans générés à ceux
+    relus du cache, 'precision_reduite' les bornes d'erreur de Batch/PrecisionReduite.py
+    (sans temps de référence propre). Les accélérations sont des rapports de temps par athlète.
+    :param lever: lève AssertionError si un moteur dépasse sa tolérance.
+    :return: liste de rapports {'moteur', 'ecart', 'tolerance', 'conforme', 'nb_compares',
+             'us_reference', 'us_rapide', 'acceleration', 'pire_athlete'}.
+    """
+    inconnus = set(moteurs) - set(MOTEURS)
+    if inconnus:
+        raise ValueError(f'moteurs inconnus : {", ".join(sorted(inconnus))} (choix : {", ".join(MOTEURS)})')
+    entrees = generer_entrees(nb_athletes, graine)
+    indices = list(range(min(nb_scalaires, nb_athletes)))
+    lignes = {
+        'zones_batch': (_reference_zones, _zones_rapides),
+        'zones_float32': (_reference_zones, lambda e: _zones_rapides(e, np.float32)),
+        'volume_pic_batch': (_reference_volume_pic, _volume_pic_rapide),
+        'calculer_batch': (_reference_calculer, _calculer_rapide),
+    }
+    rapports = []
+    with tempfile.TemporaryDirectory() as dossier:
+        for nom in moteurs:
+            if nom in lignes:
+                reference, rapide = lignes[nom]
+                rapide(entrees)   # imports et caches chargés hors mesure
+                rapports.append(_verifier_lignes(nom, entrees, reference, rapide, indices))
+            elif nom == 'table_profils':
+                rapports.append(_verifier_table(entrees, indices, dossier))
+            elif nom == 'precision_reduite':
+                rapports.append(_verifier_precision_reduite(nb_athletes, len(indices), graine))
+            else:
+                rapports.append(_verifier_plans(entrees, indices[:nb_plans], dossier))
+    if lever:
+        for rapport in rapports:
+            assert rapport['conforme'], (f"{rapport['moteur']} : écart {rapport['ecart']:.3g} > tolérance "
+                                         f"{rapport['tolerance']:.3g} (athlète {rapport['pire_athlete']})")
+    return rapports
+
+
+def enregistrer_rapports(rapports, chemin):
+    """Ajoute les rapports datés au fichier JSON lignes chemin (suivi des accélérations)."""
+    horodatage = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(chemin, 'a', encoding='utf-8') as fichier:
+        for rapport in rapports:
+            fichier.write(json.dumps(dict(rapport, date=horodatage), default=float) + '\n')
+
+
+if __name__ == '__main__':
+    nb_athletes = int(input("nombre d'athlètes (ex: 100000) :"))
+    nb_scalaires = int(input('nombre de comparaisons scalaires (ex: 2000) :'))
+    chemin = input('fichier de suivi des rapports (laisser vide pour ne pas enregistrer) :')
+    debut = time.perf_counter()
+    rapports = verifier(nb_athletes=nb_athletes, nb_scalaires=nb_scalaires, lever=False)
+    print(f'\nOracle exécuté en {time.perf_counter() - debut:.1f} s :')
+    for r in rapports:
+        print(f"  {r['moteur']:17s} {'OK   ' if r['conforme'] else 'ÉCHEC'} écart {r['ecart']:.2g} "
+              f"(tolérance {r['tolerance']:.0e}, {r['nb_compares']} comparés)  "
+              f"{r['us_reference']:8.1f} µs -> {r['us_rapide']:7.2f} µs  x{r['acceleration']:.1f}")
+    if chemin:
+        enregistrer_rapports(rapports, chemin)
@@ -0,0 +1,122 @@
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+
+# Paramètres de chaque phase : (nom, progression hebdomadaire du volume, part du volume
+# en qualité, types de séances de qualité alternés d'une semaine à l'autre).
+# L'affûtage ne progresse pas : son volume décroît de REDUCTION_AFFUTAGE par semaine.
+PARAMETRES_PHASES = (
+    ('generale', 1.10, 0.15, ('SEUIL',)),
+    ('specifique', 1.05, 0.20, ('VMA', 'SEUIL')),
+    ('affutage', 1.00, 0.25, ('VMA',)),
+)
+NOMS_PHASES = tuple(nom for nom, _, _, _ in PARAMETRES_PHASES)
+REDUCTION_RECUPERATION = 0.60
+REDUCTION_AFFUTAGE = 0.80
+
+
+def calculer_segments_phases(VolumeDepart, DureePhases, FormeCycle=4):
+    """
+    Courbe de volume et répartition des séances de tout le plan, par segments de phase.
+
+    Les phases générale et spécifique enchaînent les mêmes cycles de FormeCycle semaines
+    (une au pic précédent, FormeCycle - 2 d'augmentation, une de récupération à -40 %),
+    seule la progression change d'une phase à l'autre. L'affûtage part du dernier pic et
+    réduit le volume de 20 % par semaine pendant phaseAffutage semaines.
+
+    :param DureePhases: (phaseGenerale, phaseSpecifique, phaseAffutage) de calculer_Duree_Phases.
+    :return: dictionnaire de tableaux d'une ligne par semaine : 'phase' (indice dans
+             PARAMETRES_PHASES), 'volume', 'volume_ef', 'volume_q', 'nb_seances',
+             'nb_ef_courtes', 'volume_ef_longue', 'volume_ef_courte', 'nb_qualite'
+             et 'type_qualite' (indice dans les types de la phase).
+    """
+    longueurs = np.maximum(np.asarray(DureePhases, dtype=np.int64), 0)
+    duree_construction = int(longueurs[0] + longueurs[1])
+    phase = np.repeat(np.arange(3), longueurs)
+    progression = np.array([p for _, p, _, _ in PARAMETRES_PHASES])
+    part_qualite = np.array([q for _, _, q, _ in PARAMETRES_PHASES])
+
+    # Construction : produit cumulé des progressions sur les semaines d'augmentation
+    semaine = np.arange(duree_construction)
+    position = semaine % FormeCycle
+    augmentation = (position >= 1) & (position <= FormeCycle - 2)
+    facteurs = np.where(augmentation, progression[phase[:duree_construction]], 1.0)
+    pics = VolumeDepart * np.cumprod(facteurs)
+    volume_construction = np.where(position == FormeCycle - 1, pics * REDUCTION_RECUPERATION, pics)
+
+    # Affûtage : décroissance géométrique depuis le dernier pic atteint
+    pic = pics[-1] if duree_construction else VolumeDepart
+    volume_affutage = pic * REDUCTION_AFFUTAGE ** np.arange(1, longueurs[2] + 1)
+    volume = np.maximum(np.concatenate([volume_construction, volume_affutage]), 0)
+
+    # Répartition EF / qualité et nombre de séances (mêmes règles que calculer_NB_Seance
+    # et generer_Seance_EF, avec la part de qualité de la phase)
+    volume_q = volume * part_qualite[phase]
+    volume_ef = volume - volume_q
+    nb_seances = np.rint(2 + volume / 23).astype(np.int64)
+    nb_ef_courtes = np.maximum(nb_seances - 2, 0)
+    volume_ef_longue = 3 * np.sqrt(volume_ef)
+    volume_ef_courte = np.where(nb_ef_courtes > 0, (volume_ef - volume_ef_longue) / np.maximum(nb_ef_courtes, 1), 0.0)
+    nb_qualite = np.maximum(nb_seances - 1 - nb_ef_courtes, 0)
+
+    # Alternance des types de qualité à l'intérieur de chaque phase
+    debut_phase = np.concatenate([[0], np.cumsum(longueurs)[:-1]])
+    semaine_dans_phase = np.arange(len(phase)) - debut_phase[phase]
+    nb_types = np.array([len(types) for _, _, _, types in PARAMETRES_PHASES])
+    type_qualite = semaine_dans_phase % nb_types[phase]
+
+    return {
+        'phase': phase,
+        'volume': volume,
+        'volume_ef': volume_ef,
+        'volume_q': volume_q,
+        'nb_seances': nb_seances,
+        'nb_ef_courtes': nb_ef_courtes,
+        'volume_ef_longue': volume_ef_longue,
+        'volume_ef_courte': volume_ef_courte,
+        'nb_qualite': nb_qualite,
+        'type_qualite': type_qualite,
+    }
+
+
+def compter_augmentations(Duree, FormeCycle):
+    """Semaines d'augmentation parmi les Duree premières semaines de cycles (tableaux diffusables)."""
+    cycles, reste = np.divmod(np.asarray(Duree), np.asarray(FormeCycle))
+    return cycles * (np.asarray(FormeCycle) - 2) + np.clip(reste - 1, 0, np.asarray(FormeCycle) - 2)
+
+
+def calculer_pic_phases(VolumeDepart, phaseGenerale, phaseSpecifique, FormeCycle=4):
+    """
+    Pic de volume atteint avant l'affûtage, sans construire la courbe (tableaux diffusables).
+
+    Croissant avec la durée de chaque phase : allonger la construction ou faire passer
+    une semaine du spécifique au général ne peut qu'augmenter le pic.
+    """
+    n_generale = compter_augmentations(phaseGenerale, FormeCycle)
+    n_total = compter_augmentations(np.asarray(phaseGenerale) + np.asarray(phaseSpecifique), FormeCycle)
+    return (np.asarray(VolumeDepart, dtype=np.float64)
+            * PARAMETRES_PHASES[0][1] ** n_generale
+            * PARAMETRES_PHASES[1][1] ** (n_total - n_generale))
+
+
+if __name__ == '__main__':
+    import time
+    from DureePhases.DureePhases import calculer_Duree_Phases
+
+    VolumeDepart = float(input('votre volume hebdomadaire de depart :'))
+    ObjectifDistance = float(input('votre objectif de distance :'))
+    DureeProgramme = int(input('la duree du programme (semaines) :'))
+    DureePhases = calculer_Duree_Phases(ObjectifDistance, DureeProgramme)
+    segments = calculer_segments_phases(VolumeDepart, DureePhases)
+    print(f'\nPhases (generale, specifique, affutage) : {DureePhases}')
+    for i, (phase, volume) in enumerate(zip(segments['phase'], segments['volume']), 1):
+        print(f'Semaine {i:2d} ({NOMS_PHASES[phase]:10s}) : {volume:.1f} km')
+
+    for duree in (12, 52, 520):
+        debut = time.perf_counter()
+        calculer_segments_phases(VolumeDepart, calculer_Duree_Phases(ObjectifDistance, duree))
+        print(f'{duree} semaines : {(time.perf_counter() - debut) * 1e6:.0f} µs')
@@ -0,0 +1,185 @@
+import sys
+import os
+import time
+from functools import lru_cache
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+JOURS = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
+TOUS_LES_JOURS = 0b1111111
+WEEKEND = 0b1100000
+TYPES_QUALITE = ('VMA', 'SEUIL')
+
+
+def masque_disponibilites(jours):
+    """Masque 7 bits (bit 0 = lundi) à partir de noms de jours ou d'indices 0-6."""
+    masque = 0
+    for jour in jours:
+        if isinstance(jour, str):
+            jour = JOURS.index(jour.strip().lower())
+        masque |= 1 << jour
+    return masque
+
+
+def _voisins(masque):
+    # Jours adjacents, en bouclant sur la semaine (le dimanche touche le lundi suivant)
+    return ((masque << 1) | (masque >> 1) | (masque >> 6) | (masque << 6)) & TOUS_LES_JOURS
+
+
+def _jours_consecutifs(masque):
+    # Nombre de couples de jours consécutifs courus, à minimiser pour étaler les repos
+    return bin(masque & (((masque << 1) | (masque >> 6)) & TOUS_LES_JOURS)).count('1')
+
+
+def _bits(masque):
+    return [jour for jour in range(7) if masque >> jour & 1]
+
+
+@lru_cache(maxsize=None)
+def _resoudre(nb_longue, nb_qualite, nb_courtes, disponibilites, longue_weekend, qualite_espacee):
+    """
+    Meilleure répartition (jour_longue, masque_qualite, masque_courtes) ou None.
+
+    Recherche exhaustive par masques de bits : la semaine n'a que 7 jours, et le cache
+    fait que chaque forme de semaine n'est résolue qu'une fois par processus.
+    """
+    if nb_longue + nb_qualite + nb_courtes > bin(disponibilites).count('1'):
+        return None
+    jours_longue = [None]
+    if nb_longue:
+        autorises = disponibilites & WEEKEND if longue_weekend else disponibilites
+        jours_longue = _bits(autorises)
+
+    meilleur = None
+    meilleur_score = None
+    for jour_longue in jours_longue:
+        occupe = 0 if jour_longue is None else 1 << jour_longue
+
+        def placer_qualite(premier, restantes, masque_qualite):
+            if restantes == 0:
+                yield masque_qualite
+                return
+            for jour in range(premier, 7):
+                bit = 1 << jour
+                if not disponibilites & bit or (occupe | masque_qualite) & bit:
+                    continue
+                # Pas de qualité la veille ou le lendemain d'une autre séance dure
+                if qualite_espacee and _voisins(bit) & (occupe | masque_qualite):
+                    continue
+                yield from placer_qualite(jour + 1, restantes - 1, masque_qualite | bit)
+
+        for masque_qualite in placer_qualite(0, nb_qualite, 0):
+            libres = _bits(disponibilites & ~(occupe | masque_qualite))
+            masque_courtes = _choisir_courtes(tuple(libres), nb_courtes)
+            masque_total = occupe | masque_qualite | masque_courtes
+            # Limiter les séances dures collées (nul si la qualité est espacée), étaler les
+            # séances, puis préférer la sortie longue le dimanche et la qualité tôt
+            score = (_jours_consecutifs(occupe | masque_qualite), _jours_consecutifs(masque_total),
+                     -(jour_longue or 0), masque_qualite)
+            if meilleur_score is None or score < meilleur_score:
+                meilleur_score = score
+                meilleur = (jour_longue, masque_qualite, masque_courtes)
+    return meilleur
+
+
+@lru_cache(maxsize=None)
+def _choisir_courtes(libres, nb_courtes):
+    # Combinaison de jours libres qui minimise les jours consécutifs (ordre de parcours
+    # déterministe en cas d'égalité)
+    meilleur, meilleur_score = 0, None
+
+    def parcourir(indice, restantes, masque):
+        nonlocal meilleur, meilleur_score
+        if restantes == 0:
+            score = _jours_consecutifs(masque)
+            if meilleur_score is None or score < meilleur_score:
+                meilleur, meilleur_score = masque, score
+            return
+        for i in range(indice, len(libres) - restantes + 1):
+            parcourir(i + 1, restantes - 1, masque | 1 << libres[i])
+
+    parcourir(0, nb_courtes, 0)
+    return meilleur
+
+
+def planifier_forme(nb_longue, nb_qualite, nb_courtes, disponibilites=TOUS_LES_JOURS):
+    """
+    Place une forme de semaine sur les jours disponibles.
+
+    Les règles sont relâchées dans l'ordre si la semaine est impossible : d'abord la
+    sortie longue hors week-end, puis les séances de qualité rapprochées. Une fois
+    l'espacement relâché, le nombre de couples de séances dures (longue ou qualité) sur
+    des jours consécutifs reste minimisé en priorité.
+    :return: tuple de 7 éléments ('EF_LONGUE', 'QUALITE', 'EF_COURTE' ou None), ou None
+             s'il y a plus de séances que de jours disponibles.
+    """
+    for longue_weekend, qualite_espacee in ((True, True), (False, True), (True, False), (False, False)):
+        solution = _resoudre(nb_longue, nb_qualite, nb_courtes, disponibilites, longue_weekend, qualite_espacee)
+        if solution is not None:
+            break
+    else:
+        return None
+    jour_longue, masque_qualite, masque_courtes = solution
+    calendrier = [None] * 7
+    if jour_longue is not None:
+        calendrier[jour_longue] = 'EF_LONGUE'
+    for jour in _bits(masque_qualite):
+        calendrier[jour] = 'QUALITE'
+    for jour in _bits(masque_courtes):
+        calendrier[jour] = 'EF_COURTE'
+    return tuple(calendrier)
+
+
+def planifier_semaine(semaine, disponibilites=TOUS_LES_JOURS):
+    """
+    Ajoute la clé 'jour' (0 = lundi) à chaque séance d'une semaine de generer_plan_structure.
+
+    :return: True si la semaine a pu être placée, False sinon (séances laissées sans jour).
+    """
+    seances = semaine['seances']
+    par_type = {'EF_LONGUE': [], 'QUALITE': [], 'EF_COURTE': []}
+    for seance in seances:
+        par_type['QUALITE' if seance['type'] in TYPES_QUALITE else seance['type']].append(seance)
+    calendrier = planifier_forme(len(par_type['EF_LONGUE']), len(par_type['QUALITE']),
+                                 len(par_type['EF_COURTE']), disponibilites)
+    if calendrier is None:
+        return False
+    for jour, type_seance in enumerate(calendrier):
+        if type_seance is not None:
+            par_type[type_seance].pop(0)['jour'] = jour
+    # Ordre chronologique dans la semaine
+    seances.sort(key=lambda seance: seance['jour'])
+    return True
+
+
+def planifier_plan(semaines, disponibilites=TOUS_LES_JOURS):
+    """Place toutes les semaines d'un plan ; retourne les numéros des semaines impossibles."""
+    return [semaine['semaine'] for semaine in semaines if not planifier_semaine(semaine, disponibilites)]
+
+
+if __name__ == '__main__':
+    from PlanSemaine.NBSeance import calculer_NB_Seance
+    from PlanSemaine.SeanceEF import generer_Seance_EF
+
+    VolumeDistance = float(input('votre volume de distance :'))
+    jours = input('vos jours disponibles (ex: lundi,mercredi,jeudi,samedi,dimanche) :')
+    disponibilites = masque_disponibilites(jours.split(',')) if jours.strip() else TOUS_LES_JOURS
+
+    NBSeance = calculer_NB_Seance(VolumeDistance)
+    NBSeanceEFCourte = generer_Seance_EF(VolumeDistance)[3]
+    NBSeanceQualite = max(0, NBSeance - 1 - NBSeanceEFCourte)
+    calendrier = planifier_forme(1, NBSeanceQualite, NBSeanceEFCourte, disponibilites)
+    if calendrier is None:
+        print(f'\nImpossible de placer {NBSeance} seances sur vos jours disponibles')
+    else:
+        print('\nVotre semaine :')
+        for jour, type_seance in zip(JOURS, calendrier):
+            print(f"{jour:9s} : {type_seance or 'repos'}")
+
+    # Saison d'une cohorte : les formes de semaine se répètent et sont servies par le cache
+    nb_semaines = 100000
+    debut = time.perf_counter()
+    for i in range(nb_semaines):
+        planifier_forme(1, 1 + i % 2, i % 4, (disponibilites | (1 << (i % 7))) & TOUS_LES_JOURS)
+    print(f'\n{nb_semaines} semaines planifiées en {(time.perf_counter() - debut) * 1000:.0f} ms')
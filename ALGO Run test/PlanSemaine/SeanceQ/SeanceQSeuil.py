@@ -0,0 +1,65 @@
+import sys
+import os
+from functools import lru_cache
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from ZonesAllure.Zones_A import calculer_zones_allure
+from PlanSemaine.SeanceQ.SeanceQVMA import VolumeEchauffement, arrondir_volume_q
+
+DistancesRepetitionSeuil = (3000, 2000, 1500, 1000)
+NBRepetitionsMinSeuil = 2
+
+
+@lru_cache(maxsize=4096)
+def _compiler_Seance_Q_Seuil(VolumeBucket, zonesAllure):
+    VolumeTravail = max(0, VolumeBucket - VolumeEchauffement) * 1000
+    DistanceRepetition = DistancesRepetitionSeuil[-1]
+    for Distance in DistancesRepetitionSeuil:
+        if VolumeTravail / Distance >= NBRepetitionsMinSeuil:
+            DistanceRepetition = Distance
+            break
+    NBRepetitions = round(VolumeTravail / DistanceRepetition)
+
+    AllureRapide, AllureLente = zonesAllure[3]
+    AllureZ2 = (zonesAllure[1][0] + zonesAllure[1][1]) / 2
+    if NBRepetitions == 0:
+        return (0, 0, 0.0, AllureRapide, AllureLente, VolumeBucket * AllureZ2)
+    # Récupération courte au seuil : 1 minute par km de répétition
+    Recuperation = DistanceRepetition / 1000
+    TempsEstime = (VolumeEchauffement * AllureZ2
+                   + NBRepetitions * DistanceRepetition / 1000 * (AllureRapide + AllureLente) / 2
+                   + (NBRepetitions - 1) * Recuperation)
+    return (NBRepetitions, DistanceRepetition, Recuperation, AllureRapide, AllureLente, TempsEstime)
+
+
+def generer_Seance_Q_Seuil(VolumeQ, zonesAllure):
+    """
+    Séance au seuil en Zone 4 pour un volume de qualité donné (km).
+
+    Même format, même cache et même séance sans travail (NBRepetitions = 0) que
+    generer_Seance_Q_VMA.
+    """
+    VolumeBucket = arrondir_volume_q(VolumeQ)
+    return _compiler_Seance_Q_Seuil(VolumeBucket, tuple(tuple(zone) for zone in zonesAllure))
+
+
+if __name__=='__main__':
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    VolumeQ = float(input('votre volume de qualite de la seance :'))
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+    NBRepetitions, DistanceRepetition, Recuperation, AllureRapide, AllureLente, TempsEstime = generer_Seance_Q_Seuil(VolumeQ, zonesAllure)
+    if NBRepetitions == 0:
+        print(f"\nVolume trop faible pour une seance au seuil : footing en Zone 2")
+    else:
+        print(f"\nSeance au seuil : {NBRepetitions} x {DistanceRepetition} m, recuperation {Recuperation:.1f} min")
+    minutes_lent = int(AllureLente)
+    secondes_lent = int((AllureLente - minutes_lent) * 60)
+    minutes_rapide = int(AllureRapide)
+    secondes_rapide = int((AllureRapide - minutes_rapide) * 60)
+    print(f"Allure cible : {minutes_lent}:{secondes_lent:02d} - {minutes_rapide}:{secondes_rapide:02d} min/km")
+    print(f"Temps estime : ~{int(TempsEstime)} minutes")
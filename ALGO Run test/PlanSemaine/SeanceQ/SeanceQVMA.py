@@ -0,0 +1,75 @@
+import sys
+import os
+from functools import lru_cache
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from ZonesAllure.Zones_A import calculer_zones_allure
+
+# Échauffement + retour au calme en Zone 2 inclus dans le volume de la séance (km)
+VolumeEchauffement = 2
+DistancesRepetitionVMA = (1000, 800, 600, 400, 300, 200)
+NBRepetitionsMinVMA = 6
+
+
+@lru_cache(maxsize=4096)
+def _compiler_Seance_Q_VMA(VolumeBucket, zonesAllure):
+    VolumeTravail = max(0, VolumeBucket - VolumeEchauffement) * 1000
+    DistanceRepetition = DistancesRepetitionVMA[-1]
+    for Distance in DistancesRepetitionVMA:
+        if VolumeTravail / Distance >= NBRepetitionsMinVMA:
+            DistanceRepetition = Distance
+            break
+    NBRepetitions = round(VolumeTravail / DistanceRepetition)
+
+    AllureRapide, AllureLente = zonesAllure[4]
+    AllureZ2 = (zonesAllure[1][0] + zonesAllure[1][1]) / 2
+    if NBRepetitions == 0:
+        # Volume trop faible pour une répétition après l'échauffement : pas de travail
+        return (0, 0, 0.0, AllureRapide, AllureLente, VolumeBucket * AllureZ2)
+    # Récupération en footing de même durée que la répétition (1:1)
+    Recuperation = (DistanceRepetition / 1000) * (AllureRapide + AllureLente) / 2
+    TempsEstime = (VolumeEchauffement * AllureZ2
+                   + NBRepetitions * DistanceRepetition / 1000 * (AllureRapide + AllureLente) / 2
+                   + (NBRepetitions - 1) * Recuperation)
+    return (NBRepetitions, DistanceRepetition, Recuperation, AllureRapide, AllureLente, TempsEstime)
+
+
+def arrondir_volume_q(VolumeQ):
+    """Volume (km) sur lequel une séance de qualité est construite : tranche de 0.5 km."""
+    return round(VolumeQ * 2) / 2
+
+
+def generer_Seance_Q_VMA(VolumeQ, zonesAllure):
+    """
+    Séance de VMA en Zone 5 pour un volume de qualité donné (km).
+
+    Le modèle est mis en cache par tranche de 0.5 km (arrondir_volume_q) et par table de
+    zones d'allure. NBRepetitions vaut 0 si le volume ne laisse aucune répétition après
+    l'échauffement : la séance n'est alors qu'un footing en Zone 2.
+    :return: (NBRepetitions, DistanceRepetition en m, Recuperation en min,
+              AllureRapide, AllureLente, TempsEstime en min)
+    """
+    VolumeBucket = arrondir_volume_q(VolumeQ)
+    return _compiler_Seance_Q_VMA(VolumeBucket, tuple(tuple(zone) for zone in zonesAllure))
+
+
+if __name__=='__main__':
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    VolumeQ = float(input('votre volume de qualite de la seance :'))
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+    NBRepetitions, DistanceRepetition, Recuperation, AllureRapide, AllureLente, TempsEstime = generer_Seance_Q_VMA(VolumeQ, zonesAllure)
+    if NBRepetitions == 0:
+        print(f"\nVolume trop faible pour une seance de VMA : footing en Zone 2")
+    else:
+        print(f"\nSeance de VMA : {NBRepetitions} x {DistanceRepetition} m, recuperation {Recuperation:.1f} min")
+    minutes_lent = int(AllureLente)
+    secondes_lent = int((AllureLente - minutes_lent) * 60)
+    minutes_rapide = int(AllureRapide)
+    secondes_rapide = int((AllureRapide - minutes_rapide) * 60)
+    print(f"Allure cible : {minutes_lent}:{secondes_lent:02d} - {minutes_rapide}:{secondes_rapide:02d} min/km")
+    print(f"Temps estime : ~{int(TempsEstime)} minutes")
@@ -0,0 +1,207 @@
+import sys
+import os
+import json
+import heapq
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+# Catégories de records : meilleur temps (minutes) sur une distance standard (km)
+# et meilleure distance (km) sur une durée standard (minutes).
+DISTANCES_STANDARD = (1, 5, 10, 21.0975, 42.195)
+DUREES_STANDARD = (6, 12, 30, 60)
+CATEGORIES = [('distance', d) for d in DISTANCES_STANDARD] + [('duree', t) for t in DUREES_STANDARD]
+
+
+def calculer_meilleurs_efforts(temps, distance):
+    """
+    Meilleurs efforts d'une activité à partir de ses flux cumulés.
+
+    :param temps: temps écoulé en secondes (croissant).
+    :param distance: distance cumulée en mètres (croissante).
+    :return: dictionnaire {('distance', km): minutes, ('duree', min): km}.
+    """
+    temps = np.asarray(temps, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    efforts = {}
+    for km in DISTANCES_STANDARD:
+        cibles = distance + km * 1000
+        valides = cibles <= distance[-1]
+        if np.any(valides):
+            arrivees = np.interp(cibles[valides], distance, temps)
+            efforts[('distance', km)] = float(np.min(arrivees - temps[valides])) / 60
+    for minutes in DUREES_STANDARD:
+        cibles = temps + minutes * 60
+        valides = cibles <= temps[-1]
+        if np.any(valides):
+            arrivees = np.interp(cibles[valides], temps, distance)
+            efforts[('duree', minutes)] = float(np.max(arrivees - distance[valides])) / 1000
+    return efforts
+
+
+def _cle_tas(categorie, valeur):
+    # La racine du tas est toujours le moins bon effort conservé :
+    # le plus long temps pour une distance, la plus courte distance pour une durée.
+    return -valeur if categorie[0] == 'distance' else valeur
+
+
+class IndexRecords:
+    """
+    Top-k des meilleurs efforts d'un athlète par catégorie, mis à jour en O(log k).
+
+    Chaque catégorie garde k efforts de réserve en plus du top-k pour absorber les
+    suppressions, et retient le meilleur effort écarté du tas (seuils). Une suppression ne
+    fait que marquer l'activité ; la purge a lieu à la lecture suivante, et une catégorie
+    n'est reconstruite depuis l'historique (via la fonction source) que si moins de k
+    efforts restants battent ce seuil : un effort écarté pourrait alors faire partie du top-k.
+    """
+
+    def __init__(self, k=3, chemin=None, source=None):
+        self.k = k
+        self.capacite = 2 * k
+        self.chemin = chemin
+        self.source = source
+        self.tas = {categorie: [] for categorie in CATEGORIES}
+        self.seuils = {}
+        self.a_reconstruire = set()
+        self.supprimees = set()
+        if chemin is not None and os.path.exists(chemin):
+            self.charger()
+
+    def _inserer(self, categorie, id_activite, date, valeur):
+        tas = self.tas[categorie]
+        entree = (_cle_tas(categorie, valeur), date, id_activite, valeur)
+        if len(tas) < self.capacite:
+            heapq.heappush(tas, entree)
+            return
+        if entree > tas[0]:
+            entree = heapq.heapreplace(tas, entree)
+        # entree est maintenant l'effort écarté
+        seuil = self.seuils.get(categorie)
+        if seuil is None or entree > seuil:
+            self.seuils[categorie] = entree
+
+    def ajouter_activite(self, id_activite, date, efforts):
+        """
+        Ajoute les meilleurs efforts d'une activité (voir calculer_meilleurs_efforts). Une
+        activité déjà indexée (nouvelle synchronisation, import d'une autre source) est
+        remplacée : ses anciens efforts sont retirés avant l'insertion.
+        """
+        self.supprimees.discard(id_activite)
+        modifiees = self._retirer({id_activite})
+        for categorie, valeur in efforts.items():
+            if categorie in self.tas:
+                self._inserer(categorie, id_activite, date, valeur)
+        self._verifier_seuils(modifiees)
+
+    def supprimer_activite(self, id_activite):
+        self.supprimees.add(id_activite)
+
+    def _retirer(self, ids):
+        # Retire des tas les efforts des activités ids ; retourne les catégories modifiées
+        modifiees = []
+        for categorie, tas in self.tas.items():
+            restants = [e for e in tas if e[2] not in ids]
+            if len(restants) != len(tas):
+                heapq.heapify(restants)
+                self.tas[categorie] = restants
+                modifiees.append(categorie)
+        return modifiees
+
+    def _verifier_seuils(self, categories):
+        # Moins de k efforts conservés battent le meilleur effort écarté : reconstruction
+        for categorie in categories:
+            seuil = self.seuils.get(categorie)
+            if seuil is not None and sum(e > seuil for e in self.tas[categorie]) < self.k:
+                self.a_reconstruire.add(categorie)
+
+    def _purger(self):
+        if not self.supprimees:
+            return
+        self._verifier_seuils(self._retirer(self.supprimees))
+        self.supprimees.clear()
+
+    def _reconstruire(self):
+        if not self.a_reconstruire or self.source is None:
+            return
+        categories = self.a_reconstruire
+        for categorie in categories:
+            self.tas[categorie] = []
+            self.seuils.pop(categorie, None)
+        for id_activite, date, efforts in self.source():
+            for categorie in categories:
+                if categorie in efforts:
+                    self._inserer(categorie, id_activite, date, efforts[categorie])
+        self.a_reconstruire = set()
+
+    def records(self, categorie):
+        """Les k meilleurs efforts de la catégorie, du meilleur au moins bon : [(valeur, date, id)]."""
+        self._purger()
+        self._reconstruire()
+        meilleurs = heapq.nlargest(self.k, self.tas[categorie])
+        return [(valeur, date, id_activite) for _, date, id_activite, valeur in meilleurs]
+
+    def calculer_vma_records(self):
+        """VMA (km/h) estimée par le meilleur effort de 6 minutes, ou None sans record."""
+        meilleurs = self.records(('duree', 6))
+        if not meilleurs:
+            return None
+        return meilleurs[0][0] * 10
+
+    def sauvegarder(self, chemin=None):
+        """Écrit l'index sur disque de façon atomique (fichier temporaire puis renommage)."""
+        chemin = chemin or self.chemin
+        self._purger()
+        donnees = {
+            'k': self.k,
+            'tas': {f'{t}:{v}': tas for (t, v), tas in self.tas.items()},
+            'seuils': {f'{t}:{v}': seuil for (t, v), seuil in self.seuils.items()},
+            'a_reconstruire': [f'{t}:{v}' for t, v in self.a_reconstruire],
+        }
+        dossier = os.path.dirname(os.path.abspath(chemin))
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+        with os.fdopen(descripteur, 'w') as fichier:
+            json.dump(donnees, fichier)
+        os.replace(temporaire, chemin)
+
+    def charger(self, chemin=None):
+        chemin = chemin or self.chemin
+        with open(chemin) as fichier:
+            donnees = json.load(fichier)
+        noms = {f'{t}:{v}': (t, v) for t, v in CATEGORIES}
+        self.k = donnees['k']
+        self.capacite = 2 * self.k
+        self.tas = {categorie: [] for categorie in CATEGORIES}
+        for nom, tas in donnees['tas'].items():
+            self.tas[noms[nom]] = [tuple(entree) for entree in tas]
+        self.seuils = {noms[nom]: tuple(seuil) for nom, seuil in donnees['seuils'].items()}
+        self.a_reconstruire = {noms[nom] for nom in donnees['a_reconstruire']}
+
+
+if __name__ == '__main__':
+    from VolumePIC.VolumePIC import calculer_volume_pic
+
+    chemin = input("chemin de l'index de records (ex: records.json) :")
+    nb_activites = int(input("nombre d'activités à indexer :"))
+    index = IndexRecords(chemin=chemin)
+
+    rng = np.random.default_rng(0)
+    for i in range(nb_activites):
+        vitesse = rng.uniform(2.8, 4.2, 3600)
+        distance = np.cumsum(vitesse)
+        index.ajouter_activite(f'demo-{i}', i, calculer_meilleurs_efforts(np.arange(1, 3601), distance))
+    index.sauvegarder()
+
+    print('\nVos records :')
+    for categorie in CATEGORIES:
+        meilleurs = index.records(categorie)
+        if meilleurs:
+            unite = 'minutes' if categorie[0] == 'distance' else 'km'
+            print(f"{categorie[0]} {categorie[1]} : {meilleurs[0][0]:.2f} {unite}")
+
+    VMA = index.calculer_vma_records()
+    print(f'\nVMA estimée par les records : {VMA:.2f} km/h')
+    VolumePIC = calculer_volume_pic(30, 'H', 70, 55, 40, 12, 10, 50, VMA=VMA)
+    print(f'Le volume pic de performance (10 km en 50 min) : {VolumePIC[1]:.2f}')
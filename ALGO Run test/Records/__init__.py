@@ -0,0 +1 @@
+# Package Records - Index des records personnels
@@ -0,0 +1,190 @@
+import html
+import string
+import time
+from functools import lru_cache
+
+# Textes des plans par langue, au format de str.format. Chaque séance est un titre suivi
+# de lignes de détail ; les mises en page (MISES_EN_PAGE) les habillent en texte,
+# Markdown ou HTML. Chaque combinaison langue / format / élément est compilée une seule
+# fois en f-string (voir _compiler) : le rendu d'une semaine n'analyse plus aucun modèle.
+MODELES = {
+    'fr': {
+        'semaine': 'SEMAINE {semaine}/{total} (phase {phase})',
+        'volume': 'Volume total cible : {volume:.1f} km en {nb_seances} séances.',
+        'EF_LONGUE': ('Endurance Fondamentale (Longue) :', (
+            'Distance : {distance:.1f} km',
+            'Zone de travail : Zone 2 (Endurance)',
+            'Allure cible : {allure_lente}-{allure_rapide} min/km',
+            'FC cible : {fc_bas:.0f}-{fc_haut:.0f} bpm',
+            'Temps estimé : ~{temps} minutes',
+        )),
+        'EF_COURTE': ('Endurance Fondamentale (Courte) :', (
+            'Distance : {distance:.1f} km',
+            'Zone de travail : Zone 2 (Endurance)',
+            'Allure / FC : Mêmes que la sortie longue',
+            'Temps estimé : ~{temps} minutes',
+        )),
+        'QUALITE': ('Qualité - {titre} (Zone {zone}) :', (
+            "Distance : {distance:.1f} km (dont {echauffement} km d'échauffement/retour au calme)",
+            'Travail : {nb_repetitions} x {distance_repetition} m, récupération {recuperation} min',
+            'Allure travail : {allure_lente}-{allure_rapide} min/km',
+            'Temps estimé total (avec échauffement/calme) : ~{temps} minutes',
+        )),
+        'phases': {'generale': 'generale', 'specifique': 'specifique', 'affutage': 'affutage'},
+        'qualite': {'VMA': 'VMA', 'SEUIL': 'Seuil'},
+    },
+    'en': {
+        'semaine': 'WEEK {semaine}/{total} ({phase} phase)',
+        'volume': 'Target volume: {volume:.1f} km over {nb_seances} sessions.',
+        'EF_LONGUE': ('Easy run (long):', (
+            'Distance: {distance:.1f} km',
+            'Training zone: Zone 2 (Endurance)',
+            'Target pace: {allure_lente}-{allure_rapide} min/km',
+            'Target HR: {fc_bas:.0f}-{fc_haut:.0f} bpm',
+            'Estimated time: ~{temps} minutes',
+        )),
+        'EF_COURTE': ('Easy run (short):', (
+            'Distance: {distance:.1f} km',
+            'Training zone: Zone 2 (Endurance)',
+            'Pace / HR: same as the long run',
+            'Estimated time: ~{temps} minutes',
+        )),
+        'QUALITE': ('Workout - {titre} (Zone {zone}):', (
+            'Distance: {distance:.1f} km (including {echauffement} km warm-up/cool-down)',
+            'Main set: {nb_repetitions} x {distance_repetition} m, {recuperation} min recovery',
+            'Work pace: {allure_lente}-{allure_rapide} min/km',
+            'Total estimated time (with warm-up/cool-down): ~{temps} minutes',
+        )),
+        'phases': {'generale': 'general', 'specifique': 'specific', 'affutage': 'taper'},
+        'qualite': {'VMA': 'VO2max intervals', 'SEUIL': 'Threshold'},
+    },
+}
+# Habillage de chaque élément : '%s' reçoit le texte de MODELES
+MISES_EN_PAGE = {
+    'texte': {
+        'debut': '', 'fin': '',
+        'semaine': '\n--- %s ---\n', 'volume': '%s\n', 'fin_semaine': '',
+        'seance': '  {numero}. %s\n', 'detail': '     - %s\n', 'fin_seance': '',
+    },
+    'markdown': {
+        'debut': '', 'fin': '',
+        'semaine': '\n## %s\n\n', 'volume': '%s\n\n', 'fin_semaine': '',
+        'seance': '{numero}. **%s**\n', 'detail': '   - %s\n', 'fin_seance': '',
+    },
+    'html': {
+        'debut': '<div class="plan">\n', 'fin': '</div>\n',
+        'semaine': '<section class="semaine">\n<h2>%s</h2>\n', 'volume': '<p>%s</p>\n<ol>\n',
+        'fin_semaine': '</ol>\n</section>\n',
+        'seance': '<li>%s\n<ul>\n', 'detail': '<li>%s</li>\n', 'fin_seance': '</ul></li>\n',
+    },
+}
+LANGUES = tuple(MODELES)
+FORMATS = tuple(MISES_EN_PAGE)
+TYPES_QUALITE = ('VMA', 'SEUIL')
+
+
+# Expression évaluée pour chaque champ des modèles : s est la semaine ou la séance
+# structurée, A la conversion d'allure en cache, P et Q les noms localisés.
+EXPRESSIONS = {
+    'semaine': 's[_semaine]', 'total': 'total', 'phase': 'P(s.get(_phase, _generale), s.get(_phase, _generale))',
+    'volume': 's[_volume]', 'nb_seances': 's[_nb_seances]', 'numero': 'numero',
+    'distance': 's[_distance]', 'temps': 'int(s[_temps_estime])', 'zone': 's[_zone]', 'titre': 'Q[s[_type]]',
+    'allure_lente': 'A(s[_allure][1])', 'allure_rapide': 'A(s[_allure][0])',
+    'fc_bas': 's[_fc][0]', 'fc_haut': 's[_fc][1]', 'echauffement': 's[_echauffement]',
+    'nb_repetitions': 's[_nb_repetitions]', 'distance_repetition': 's[_distance_repetition]',
+    'recuperation': 'A(s[_recuperation])',
+}
+_CLES = {f'_{cle}': cle for cle in ('semaine', 'phase', 'generale', 'volume', 'nb_seances', 'distance', 'temps_estime',
+                                     'zone', 'type', 'allure', 'fc', 'echauffement', 'nb_repetitions',
+                                     'distance_repetition', 'recuperation')}
+
+
+@lru_cache(maxsize=4096)
+def allure_chaine(allure_minutes):
+    """Allure décimale (min/km) en chaîne min:sec, comme get_allure_string, mise en cache."""
+    minutes = int(allure_minutes)
+    secondes = int((allure_minutes - minutes) * 60)
+    return f"{minutes}:{secondes:02d}"
+
+
+def _compiler(modele, globales):
+    # Transforme un modèle str.format en fonction f(numero, s, total) : chaque champ est
+    # remplacé par son expression de EXPRESSIONS, puis le tout est compilé en f-string.
+    morceaux = []
+    for texte, champ, format_champ, conversion in string.Formatter().parse(modele):
+        morceaux.append(texte.replace('{', '{{').replace('}', '}}'))
+        if champ is not None:
+            morceaux.append('{' + EXPRESSIONS[champ] + (f'!{conversion}' if conversion else '')
+                            + (f':{format_champ}' if format_champ else '') + '}')
+    return eval(compile(f"lambda numero, s, total: f{''.join(morceaux)!r}", '<modele>', 'eval'), globales)
+
+
+def _compiler_langue_format(langue, format_sortie):
+    modeles = MODELES[langue]
+    page = MISES_EN_PAGE[format_sortie]
+    # En HTML, seul le texte fixe des modèles est échappé (les valeurs sont numériques)
+    echapper = (lambda texte: html.escape(texte, quote=False)) if format_sortie == 'html' else (lambda texte: texte)
+    globales = dict(_CLES, A=allure_chaine,
+                    P={cle: echapper(nom) for cle, nom in modeles['phases'].items()}.get,
+                    Q={cle: echapper(nom) for cle, nom in modeles['qualite'].items()})
+    compiles = {
+        'debut': page['debut'], 'fin': page['fin'], 'fin_semaine': page['fin_semaine'],
+        'semaine': _compiler(page['semaine'] % echapper(modeles['semaine']), globales),
+        'volume': _compiler(page['volume'] % echapper(modeles['volume']), globales),
+    }
+    for type_seance in ('EF_LONGUE', 'EF_COURTE', 'QUALITE'):
+        titre, details = modeles[type_seance]
+        modele = page['seance'] % echapper(titre) + ''.join(page['detail'] % echapper(d) for d in details)
+        compiles[type_seance] = _compiler(modele + page['fin_seance'], globales)
+    for type_seance in TYPES_QUALITE:
+        compiles[type_seance] = compiles['QUALITE']
+    return compiles
+
+
+_COMPILES = {(langue, format_sortie): _compiler_langue_format(langue, format_sortie)
+             for langue in LANGUES for format_sortie in FORMATS}
+
+
+def rendre_plan(semaines, langue='fr', format_sortie='texte', total=None):
+    """
+    Met en forme un plan structuré (voir generer_plan_structure).
+
+    :param langue: une des LANGUES ('fr', 'en').
+    :param format_sortie: un des FORMATS ('texte', 'markdown', 'html').
+    :param total: nombre de semaines du plan complet, affiché dans « SEMAINE n/total » ;
+                  à fournir quand semaines n'est qu'une partie du plan (len(semaines) sinon).
+    """
+    if (langue, format_sortie) not in _COMPILES:
+        raise ValueError(f'rendu inconnu : {langue}/{format_sortie} (langues {LANGUES}, formats {FORMATS})')
+    modeles = _COMPILES[langue, format_sortie]
+    if total is None:
+        total = len(semaines)
+    entete, volume, fin_semaine = modeles['semaine'], modeles['volume'], modeles['fin_semaine']
+    morceaux = [modeles['debut']]
+    for semaine in semaines:
+        morceaux.append(entete(0, semaine, total))
+        morceaux.append(volume(0, semaine, total))
+        for numero, seance in enumerate(semaine['seances'], 1):
+            morceaux.append(modeles[seance['type']](numero, seance, total))
+        morceaux.append(fin_semaine)
+    morceaux.append(modeles['fin'])
+    return ''.join(morceaux)
+
+
+if __name__ == '__main__':
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from beta import calculer_profil, generer_plan_structure
+
+    langue = input(f'langue ({", ".join(LANGUES)}) :')
+    format_sortie = input(f'format ({", ".join(FORMATS)}) :')
+    profil = calculer_profil(30, 'H', 70, 55, 40, 12, 10, 50)
+    semaines = generer_plan_structure(profil)
+    print(rendre_plan(semaines[:2], langue, format_sortie, total=len(semaines)))
+
+    nb_rendus = 1000
+    debut = time.perf_counter()
+    for _ in range(nb_rendus):
+        rendre_plan(semaines, langue, format_sortie)
+    print(f'Plan de {len(semaines)} semaines rendu en {(time.perf_counter() - debut) / nb_rendus * 1e6:.0f} µs')
@@ -0,0 +1,142 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Batch.VolumePICBatch import calculer_volume_pic_batch
+from Batch.DureePhasesBatch import calculer_Duree_Phases_batch
+from PlanSemaine.PhasesPlan import calculer_pic_phases
+from VMA.Formule_de_Leger_et_Mercier.Formule_de_Leger_et_Mercier import calculer_formule_de_Leger_Mercier
+
+DUREES_DEFAUT = np.arange(6, 31)
+FORMES_CYCLE_DEFAUT = (3, 4, 5)
+
+
+def calculer_volume_atteint(VolumeDepart, DureeProgramme, FormeCycle, ObjectifDistance):
+    """Volume hebdomadaire maximal atteint avant l'affûtage (tableaux diffusables)."""
+    phaseGenerale, phaseSpecifique, _ = calculer_Duree_Phases_batch(ObjectifDistance, DureeProgramme)
+    return calculer_pic_phases(VolumeDepart, phaseGenerale, phaseSpecifique, FormeCycle)
+
+
+def evaluer_grille(ObjectifDistance, ObjectifTPS, VMA, volumes_depart, durees=DUREES_DEFAUT,
+                   formes_cycle=FORMES_CYCLE_DEFAUT, volume_max=None):
+    """
+    Évalue toute la grille (DureeProgramme, VolumeDepart, FormeCycle) en une passe vectorisée.
+
+    Une combinaison est faisable si le volume atteint avant l'affûtage couvre le
+    VolumePIC de l'objectif sans dépasser le VolumePICSecurise ni volume_max, et si
+    les phases générale et spécifique durent au moins une semaine.
+    :return: dictionnaire de tableaux de forme (len(durees), len(volumes_depart), len(formes_cycle)).
+    """
+    D = np.asarray(durees, dtype=np.int64)[:, None, None]
+    V0 = np.asarray(volumes_depart, dtype=np.float64)[None, :, None]
+    L = np.asarray(formes_cycle, dtype=np.int64)[None, None, :]
+
+    VolumePICSecurise, VolumePIC = calculer_volume_pic_batch(V0, D, ObjectifDistance, ObjectifTPS, VMA)
+    phaseGenerale, phaseSpecifique, _ = calculer_Duree_Phases_batch(ObjectifDistance, D)
+    VolumeAtteint = calculer_volume_atteint(V0, D, L, ObjectifDistance)
+
+    faisable = (VolumeAtteint >= VolumePIC) & (VolumeAtteint <= VolumePICSecurise) \
+        & (phaseGenerale >= 1) & (phaseSpecifique >= 1)
+    if volume_max is not None:
+        faisable &= VolumeAtteint <= volume_max
+    forme = np.broadcast_shapes(D.shape, V0.shape, L.shape)
+    return {
+        'DureeProgramme': np.broadcast_to(D, forme),
+        'VolumeDepart': np.broadcast_to(V0, forme),
+        'FormeCycle': np.broadcast_to(L, forme),
+        'VolumeAtteint': np.broadcast_to(VolumeAtteint, forme),
+        'VolumePICSecurise': np.broadcast_to(VolumePICSecurise, forme),
+        'VolumePIC': float(VolumePIC),
+        'faisable': np.broadcast_to(faisable, forme),
+    }
+
+
+def chercher_duree_minimale(ObjectifDistance, VolumePIC, VolumeDepart, FormeCycle, duree_min, duree_max):
+    """
+    Plus petite DureeProgramme dont le volume atteint couvre VolumePIC, par bissection entière
+    menée en parallèle sur tous les couples (VolumeDepart, FormeCycle).
+
+    Le volume atteint est croissant (au sens large) avec la durée : la construction et la
+    phase générale ne raccourcissent jamais quand la durée augmente (voir calculer_pic_phases).
+    Vaut duree_max + 1 si même duree_max ne suffit pas.
+    """
+    VolumeDepart, FormeCycle = np.broadcast_arrays(np.asarray(VolumeDepart, dtype=np.float64),
+                                                   np.asarray(FormeCycle, dtype=np.int64))
+    bas = np.full(VolumeDepart.shape, duree_min, dtype=np.int64)
+    haut = np.full(VolumeDepart.shape, duree_max + 1, dtype=np.int64)
+    while np.any(bas < haut):
+        milieu = (bas + haut) // 2
+        suffit = calculer_volume_atteint(VolumeDepart, milieu, FormeCycle, ObjectifDistance) >= VolumePIC
+        actif = bas < haut
+        haut = np.where(actif & suffit, milieu, haut)
+        bas = np.where(actif & ~suffit, milieu + 1, bas)
+    return bas
+
+
+def resoudre_objectif(age, sexe, poids, FCRepos, ObjectifDistance, ObjectifTPS, volumes_depart,
+                      durees=DUREES_DEFAUT, formes_cycle=FORMES_CYCLE_DEFAUT, volume_max=None, VMA=None):
+    """
+    Options de programme permettant d'atteindre l'objectif.
+
+    Pour chaque volume de départ et chaque forme de cycle, la durée minimale est trouvée par
+    bissection puis l'option est validée sur la grille (sécurité, volume_max, phases).
+    :return: liste de dictionnaires triés par durée puis volume de départ.
+    """
+    if VMA is None:
+        VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
+    durees = np.asarray(durees, dtype=np.int64)
+    volumes_depart = np.asarray(volumes_depart, dtype=np.float64)
+    formes_cycle = np.asarray(formes_cycle, dtype=np.int64)
+    grille = evaluer_grille(ObjectifDistance, ObjectifTPS, VMA, volumes_depart, durees, formes_cycle, volume_max)
+
+    V0 = volumes_depart[:, None]
+    L = formes_cycle[None, :]
+    duree_min = chercher_duree_minimale(ObjectifDistance, grille['VolumePIC'], V0, L, durees[0], durees[-1])
+
+    # La durée minimale peut tomber hors de la grille ou être refusée (sécurité) : on prend
+    # alors la première durée faisable de la grille qui soit au moins égale.
+    faisable = grille['faisable'] & (durees[:, None, None] >= duree_min[None, :, :])
+    trouve = faisable.any(axis=0)
+    indice_duree = faisable.argmax(axis=0)
+    ivolume, iforme = np.nonzero(trouve)
+    idurees = indice_duree[ivolume, iforme]
+
+    phaseGenerale, phaseSpecifique, phaseAffutage = calculer_Duree_Phases_batch(ObjectifDistance, durees[idurees])
+    options = [{
+        'DureeProgramme': int(durees[d]),
+        'VolumeDepart': float(volumes_depart[v]),
+        'FormeCycle': int(formes_cycle[f]),
+        'VolumeAtteint': float(grille['VolumeAtteint'][d, v, f]),
+        'VolumePIC': grille['VolumePIC'],
+        'VolumePICSecurise': float(grille['VolumePICSecurise'][d, v, f]),
+        'DureePhases': (int(g), int(s), int(a)),
+    } for d, v, f, g, s, a in zip(idurees, ivolume, iforme, phaseGenerale, phaseSpecifique, phaseAffutage)]
+    options.sort(key=lambda option: (option['DureeProgramme'], option['VolumeDepart'], option['FormeCycle']))
+    return options
+
+
+if __name__ == '__main__':
+    age = int(input('votre age :'))
+    sexe = input('entrez H si vous etes un homme et F si vous etes une femme :')
+    poids = int(input('votre poids :'))
+    FCRepos = int(input('votre FC au repos :'))
+    ObjectifDistance = float(input('votre objectif de distance :'))
+    ObjectifTPS = float(input('votre objectif de temps :'))
+    VolumeHebdoMoyenDistance = float(input('votre volume hebdomadaire moyen actuel :'))
+    DureeMax = int(input('la duree maximale du programme (semaines) :'))
+
+    # Volumes de départ envisagés : de 70 % à 100 % du volume actuel
+    volumes_depart = np.round(np.linspace(0.7, 1.0, 7) * VolumeHebdoMoyenDistance, 1)
+    debut = time.perf_counter()
+    options = resoudre_objectif(age, sexe, poids, FCRepos, ObjectifDistance, ObjectifTPS,
+                                volumes_depart, durees=np.arange(4, DureeMax + 1))
+    print(f'\n{len(options)} options trouvées en {(time.perf_counter() - debut) * 1000:.2f} ms')
+    if options:
+        print(f"Volume pic de performance visé : {options[0]['VolumePIC']:.1f} km")
+    for option in options[:15]:
+        print(f"{option['DureeProgramme']:2d} semaines, départ {option['VolumeDepart']:.1f} km, "
+              f"cycles de {option['FormeCycle']} semaines -> pic {option['VolumeAtteint']:.1f} km, "
+              f"phases {option['DureePhases']}")
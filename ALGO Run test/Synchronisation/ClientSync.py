@@ -0,0 +1,207 @@
+import sys
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Historique.StockageActivites import StockageActivites
+
+STATUTS_A_REESSAYER = {429, 500, 502, 503, 504}
+
+
+class ErreurSynchronisation(Exception):
+    pass
+
+
+class PoolConnexions:
+    """Connexions HTTP/1.1 keep-alive réutilisées vers un même hôte."""
+
+    def __init__(self, hote, port, taille=8):
+        self.hote = hote
+        self.port = port
+        self.taille = taille
+        self._libres = asyncio.Queue()
+        self._nb_ouvertes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquerir(self):
+        async with self._condition:
+            while self._libres.empty() and self._nb_ouvertes >= self.taille:
+                await self._condition.wait()
+            if not self._libres.empty():
+                return self._libres.get_nowait()
+            self._nb_ouvertes += 1
+        try:
+            return await asyncio.open_connection(self.hote, self.port)
+        except OSError:
+            await self._oublier()
+            raise
+
+    async def liberer(self, connexion, reutilisable=True):
+        if reutilisable:
+            async with self._condition:
+                self._libres.put_nowait(connexion)
+                self._condition.notify()
+        else:
+            connexion[1].close()
+            await self._oublier()
+
+    async def _oublier(self):
+        async with self._condition:
+            self._nb_ouvertes -= 1
+            self._condition.notify()
+
+    async def fermer(self):
+        while not self._libres.empty():
+            _, ecrivain = self._libres.get_nowait()
+            ecrivain.close()
+            await ecrivain.wait_closed()
+        self._nb_ouvertes = 0
+
+
+class ClientSync:
+    """
+    Client asynchrone de synchronisation des activités.
+
+    Les requêtes passent par un pool de connexions, un sémaphore borne le nombre de requêtes
+    en vol et toutes les requêtes attendent la fin d'une fenêtre de limitation annoncée par
+    le fournisseur (Retry-After ou X-RateLimit-Remaining à 0). Les échecs transitoires sont
+    réessayés avec un backoff exponentiel à gigue complète.
+    """
+
+    def __init__(self, hote, port, concurrence=8, taille_pool=8, tentatives_max=5,
+                 delai_base=0.1, delai_max=5.0, par_page=100, taille_lot=50):
+        self.pool = PoolConnexions(hote, port, taille_pool)
+        self.hote = hote
+        self.semaphore = asyncio.Semaphore(concurrence)
+        self.tentatives_max = tentatives_max
+        self.delai_base = delai_base
+        self.delai_max = delai_max
+        self.par_page = par_page
+        self.taille_lot = taille_lot
+        self._reprise = 0.0
+        self.nb_requetes = 0
+        self.nb_nouvelles_tentatives = 0
+
+    async def fermer(self):
+        await self.pool.fermer()
+
+    async def _envoyer(self, chemin):
+        lecteur, ecrivain = connexion = await self.pool.acquerir()
+        try:
+            ecrivain.write(f'GET {chemin} HTTP/1.1\r\nHost: {self.hote}\r\nConnection: keep-alive\r\n\r\n'.encode())
+            await ecrivain.drain()
+            ligne = await lecteur.readline()
+            if not ligne:
+                raise ConnectionError('connexion fermée par le fournisseur')
+            statut = int(ligne.split(b' ', 2)[1])
+            entetes = {}
+            while True:
+                ligne = await lecteur.readline()
+                if ligne in (b'\r\n', b'\n', b''):
+                    break
+                cle, valeur = ligne.decode('latin-1').split(':', 1)
+                entetes[cle.strip().lower()] = valeur.strip()
+            corps = await lecteur.readexactly(int(entetes.get('content-length', 0)))
+        except BaseException:
+            await self.pool.liberer(connexion, reutilisable=False)
+            raise
+        await self.pool.liberer(connexion, reutilisable=entetes.get('connection', '').lower() != 'close')
+        return statut, entetes, corps
+
+    def _noter_limite(self, statut, entetes):
+        boucle = asyncio.get_running_loop()
+        attente = 0.0
+        if statut == 429:
+            attente = float(entetes.get('retry-after', self.delai_base))
+        elif entetes.get('x-ratelimit-remaining') == '0':
+            attente = float(entetes.get('x-ratelimit-reset', 0))
+        if attente > 0:
+            self._reprise = max(self._reprise, boucle.time() + attente)
+
+    async def requete_json(self, chemin):
+        """GET avec limitation de débit partagée et nouvelles tentatives."""
+        boucle = asyncio.get_running_loop()
+        async with self.semaphore:
+            for tentative in range(self.tentatives_max):
+                attente = self._reprise - boucle.time()
+                if attente > 0:
+                    await asyncio.sleep(attente)
+                self.nb_requetes += 1
+                try:
+                    statut, entetes, corps = await self._envoyer(chemin)
+                except (OSError, asyncio.IncompleteReadError):
+                    statut, entetes, corps = None, {}, b''
+                if statut is not None:
+                    self._noter_limite(statut, entetes)
+                    if statut == 200:
+                        return json.loads(corps)
+                    if statut not in STATUTS_A_REESSAYER:
+                        raise ErreurSynchronisation(f'{chemin} : statut HTTP {statut}')
+                self.nb_nouvelles_tentatives += 1
+                if statut != 429:
+                    await asyncio.sleep(random.uniform(0, min(self.delai_max, self.delai_base * 2 ** tentative)))
+        raise ErreurSynchronisation(f'{chemin} : échec après {self.tentatives_max} tentatives')
+
+    async def lister_activites(self, athlete, apres=0):
+        """Toutes les activités postérieures au curseur, page par page, triées par date."""
+        activites = []
+        page = 1
+        while True:
+            resultat = await self.requete_json(
+                f'/athletes/{athlete}/activities?after={int(apres)}&page={page}&per_page={self.par_page}')
+            activites.extend(resultat)
+            if len(resultat) < self.par_page:
+                return activites
+            page += 1
+
+    async def recuperer_flux_par_lots(self, ids):
+        """Récupère les flux de plusieurs activités en parallèle (dans la limite de concurrence)."""
+        resultats = await asyncio.gather(*(self.requete_json(f'/activities/{i}/streams') for i in ids))
+        return dict(zip(ids, resultats))
+
+    async def synchroniser_incremental(self, athlete, stockage, source='mock'):
+        """
+        Récupère les activités depuis le dernier checkpoint et les enregistre par lots.
+
+        Le checkpoint avance après chaque lot : une synchronisation interrompue reprend
+        au dernier lot enregistré.
+        """
+        curseur = stockage.lire_dernier_sync(athlete, source)
+        activites = await self.lister_activites(athlete, curseur)
+        for i in range(0, len(activites), self.taille_lot):
+            lot = activites[i:i + self.taille_lot]
+            flux = await self.recuperer_flux_par_lots([a['id'] for a in lot])
+            a_enregistrer = [
+                dict(a, athlete=athlete, source=source, flux_fc=flux[a['id']]['fc'])
+                for a in lot
+            ]
+            stockage.enregistrer_lot_historique(a_enregistrer, athlete, source, lot[-1]['date'])
+        return len(activites)
+
+
+if __name__ == '__main__':
+    from Synchronisation.FournisseurMock import FournisseurMock
+
+    nb_athletes = int(input("nombre d'athlètes à synchroniser :"))
+    concurrence = int(input('nombre de requêtes simultanées :'))
+
+    async def mesurer():
+        fournisseur = FournisseurMock(activites_par_athlete=200, latence=0.01, limite_requetes=1000, taux_erreur=0.01)
+        port = await fournisseur.demarrer()
+        client = ClientSync('127.0.0.1', port, concurrence=concurrence, taille_pool=concurrence)
+        stockage = StockageActivites(':memory:')
+        debut = time.perf_counter()
+        nombres = await asyncio.gather(*(
+            client.synchroniser_incremental(f'athlete{i}', stockage) for i in range(nb_athletes)))
+        duree = time.perf_counter() - debut
+        await client.fermer()
+        await fournisseur.arreter()
+        total = sum(nombres)
+        print(f'\n{total} activités synchronisées en {duree:.2f} s ({total / duree:.0f} activités/s)')
+        print(f'{client.nb_requetes} requêtes ({client.nb_requetes / duree:.0f} req/s), '
+              f'{client.nb_nouvelles_tentatives} nouvelles tentatives, {fournisseur.nb_refus} refus 429')
+
+    asyncio.run(mesurer())
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit, parse_qs
+
+# Faux fournisseur HTTP local (style Strava) pour tester et mesurer le client de synchronisation
+# hors ligne. Il simule une latence par requête, une limite de requêtes par fenêtre fixe
+# (réponses 429 avec Retry-After) et une part d'erreurs serveur transitoires.
+#
+#   GET /athletes/<athlete>/activities?after=<horodatage>&page=<n>&per_page=<m>
+#   GET /activities/<id>/streams
+
+
+class FournisseurMock:
+
+    def __init__(self, activites_par_athlete=500, latence=0.02, limite_requetes=600,
+                 fenetre=1.0, taux_erreur=0.0, graine=0):
+        self.latence = latence
+        self.limite_requetes = limite_requetes
+        self.fenetre = fenetre
+        self.taux_erreur = taux_erreur
+        self.activites_par_athlete = activites_par_athlete
+        self.rng = random.Random(graine)
+        self.activites = {}
+        self.nb_requetes = 0
+        self.nb_refus = 0
+        self._debut_fenetre = time.monotonic()
+        self._requetes_fenetre = 0
+        self._serveur = None
+        self._connexions = {}
+
+    def _activites_athlete(self, athlete):
+        if athlete not in self.activites:
+            rng = random.Random(f'{athlete}')
+            date = 1_700_000_000
+            liste = []
+            for i in range(self.activites_par_athlete):
+                date += rng.randint(12 * 3600, 72 * 3600)
+                duree = rng.uniform(25, 120)
+                liste.append({
+                    'id': f'{athlete}-{i}',
+                    'date': date,
+                    'sport': 'course',
+                    'distance': round(duree / rng.uniform(4.5, 6.5), 2),
+                    'duree': round(duree, 1),
+                    'fc_moyenne': rng.randint(125, 165),
+                })
+            self.activites[athlete] = liste
+        return self.activites[athlete]
+
+    def _flux(self, id_activite):
+        rng = random.Random(id_activite)
+        fc = 130
+        valeurs = []
+        for _ in range(600):
+            fc = min(195, max(90, fc + rng.randint(-2, 2)))
+            valeurs.append(fc)
+        return {'fc': valeurs}
+
+    def _verifier_limite(self):
+        maintenant = time.monotonic()
+        if maintenant - self._debut_fenetre >= self.fenetre:
+            self._debut_fenetre = maintenant
+            self._requetes_fenetre = 0
+        self._requetes_fenetre += 1
+        reset = self.fenetre - (maintenant - self._debut_fenetre)
+        restantes = max(0, self.limite_requetes - self._requetes_fenetre)
+        return self._requetes_fenetre <= self.limite_requetes, restantes, reset
+
+    def _router(self, chemin):
+        url = urlsplit(chemin)
+        morceaux = url.path.strip('/').split('/')
+        parametres = {cle: valeurs[0] for cle, valeurs in parse_qs(url.query).items()}
+        if len(morceaux) == 3 and morceaux[0] == 'athletes' and morceaux[2] == 'activities':
+            apres = int(parametres.get('after', 0))
+            page = int(parametres.get('page', 1))
+            par_page = int(parametres.get('per_page', 50))
+            nouvelles = [a for a in self._activites_athlete(morceaux[1]) if a['date'] > apres]
+            return 200, nouvelles[(page - 1) * par_page:page * par_page]
+        if len(morceaux) == 3 and morceaux[0] == 'activities' and morceaux[2] == 'streams':
+            return 200, self._flux(morceaux[1])
+        return 404, {'erreur': 'ressource inconnue'}
+
+    async def _traiter_connexion(self, lecteur, ecrivain):
+        self._connexions[asyncio.current_task()] = ecrivain
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                _, chemin, _ = ligne.decode('latin-1').split(' ', 2)
+                while (await lecteur.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+
+                self.nb_requetes += 1
+                await asyncio.sleep(self.latence)
+                autorisee, restantes, reset = self._verifier_limite()
+                entetes = {
+                    'X-RateLimit-Limit': self.limite_requetes,
+                    'X-RateLimit-Remaining': restantes,
+                    'X-RateLimit-Reset': f'{reset:.3f}',
+                }
+                if not autorisee:
+                    self.nb_refus += 1
+                    statut, contenu = 429, {'erreur': 'limite de requêtes atteinte'}
+                    entetes['Retry-After'] = f'{reset:.3f}'
+                elif self.rng.random() < self.taux_erreur:
+                    statut, contenu = 503, {'erreur': 'indisponible'}
+                else:
+                    statut, contenu = self._router(chemin)
+
+                corps = json.dumps(contenu).encode()
+                entetes['Content-Type'] = 'application/json'
+                entetes['Content-Length'] = len(corps)
+                reponse = f'HTTP/1.1 {statut} X\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in entetes.items()) + '\r\n'
+                ecrivain.write(reponse.encode('latin-1') + corps)
+                await ecrivain.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._connexions.pop(asyncio.current_task(), None)
+            ecrivain.close()
+
+    async def demarrer(self, hote='127.0.0.1', port=0):
+        """Démarre le serveur et retourne le port d'écoute."""
+        self._serveur = await asyncio.start_server(self._traiter_connexion, hote, port)
+        return self._serveur.sockets[0].getsockname()[1]
+
+    async def arreter(self):
+        self._serveur.close()
+        taches = list(self._connexions)
+        for ecrivain in self._connexions.values():
+            ecrivain.close()
+        await asyncio.gather(*taches, return_exceptions=True)
+        await self._serveur.wait_closed()
+
+
+if __name__ == '__main__':
+    port = int(input("port d'écoute :"))
+
+    async def servir():
+        fournisseur = FournisseurMock()
+        await fournisseur.demarrer(port=port)
+        print(f'Fournisseur simulé sur http://127.0.0.1:{port} (Ctrl+C pour arrêter)')
+        await asyncio.Event().wait()
+
+    asyncio.run(servir())
@@ -0,0 +1 @@
+# Package Synchronisation - Récupération des activités auprès des fournisseurs
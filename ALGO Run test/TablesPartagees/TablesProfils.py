@@ -0,0 +1,209 @@
+import sys
+import os
+import time
+import struct
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Batch.ZonesBatch import COEFFICIENTS, calculer_chaine_batch, calculer_zones_depuis
+
+# Fichier de table : en-tête fixe de 128 octets (grille et coefficients de construction,
+# dans l'ordre de CLES_COEFFICIENTS) puis un tableau float64 C-contigu de forme
+# (sexe, âge, poids, FCRepos, grandeur), sexe 0 = 'H' et 1 = 'F', grille au pas de 1.
+MAGIC = b'DRT2'
+CLES_COEFFICIENTS = tuple(COEFFICIENTS)
+ENTETE = struct.Struct(f'<4sI6i{len(CLES_COEFFICIENTS)}d')
+TAILLE_ENTETE = 128
+GRANDEURS_TABLE = ('FCM', 'VO2max', 'VMA')
+# (minimum, nombre de valeurs) pour l'âge (ans), le poids (kg) et la FC de repos (bpm)
+GRILLE = ((10, 81), (30, 121), (30, 71))
+# À incrémenter avec les formules de la chaîne FCM -> VMA
+VERSION_TABLES = 1
+
+
+def construire_table(chemin, coefficients=COEFFICIENTS, version=VERSION_TABLES, grille=GRILLE):
+    """
+    Calcule la table sur toute la grille et la publie de façon atomique.
+
+    La table est écrite dans un fichier temporaire du même dossier puis renommée sur
+    chemin avec os.replace : les processus déjà attachés gardent l'ancienne table (son
+    inode reste valide tant qu'elle est projetée) jusqu'à leur prochain actualiser().
+    """
+    (age_min, nb_age), (poids_min, nb_poids), (fc_min, nb_fc) = grille
+    age = np.arange(age_min, age_min + nb_age, dtype=np.float64)[None, :, None, None]
+    poids = np.arange(poids_min, poids_min + nb_poids, dtype=np.float64)[None, None, :, None]
+    FCRepos = np.arange(fc_min, fc_min + nb_fc, dtype=np.float64)[None, None, None, :]
+    sexe = np.array(['H', 'F'])[:, None, None, None]
+    chaine = calculer_chaine_batch(age, sexe, poids, FCRepos, coefficients)
+
+    forme = (2, nb_age, nb_poids, nb_fc, len(GRANDEURS_TABLE))
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            entete = ENTETE.pack(MAGIC, version, age_min, nb_age, poids_min, nb_poids, fc_min, nb_fc,
+                                 *(float(coefficients[cle]) for cle in CLES_COEFFICIENTS))
+            fichier.write(entete.ljust(TAILLE_ENTETE, b'\0'))
+            valeurs = np.empty(forme, dtype=np.float64)
+            for i, nom in enumerate(GRANDEURS_TABLE):
+                valeurs[..., i] = chaine[nom]
+            fichier.write(valeurs.tobytes())
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, chemin)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+
+def _est_sexe(sexe, lettre):
+    # Les tableaux de chaînes d'un caractère sont comparés comme des entiers (code UCS-4),
+    # plusieurs fois plus vite que la comparaison de chaînes de NumPy
+    if sexe.dtype == np.dtype('<U1'):
+        return sexe.view('<u4') == ord(lettre)
+    return sexe == lettre
+
+
+class TableProfils:
+    """
+    Table FCM / VO2max / VMA projetée en lecture seule depuis un fichier partagé.
+
+    Tous les processus qui attachent le même fichier partagent les mêmes pages en
+    mémoire : le coût mémoire ne dépend plus du nombre de processus. Une recherche est
+    un seul accès indexé (np.take sur l'indice à plat de la ligne), environ deux fois
+    plus rapide que calculer_chaine_batch. Les zones, calculées ensuite à partir de FCM
+    et VMA, coûtent autant dans les deux cas. Les valeurs hors grille ou non entières
+    sont calculées directement avec les coefficients de construction de la table, si
+    bien que les résultats sont toujours ceux de la table qu'on lit.
+    """
+
+    def __init__(self, chemin, intervalle_verification=1.0):
+        self.chemin = chemin
+        self.intervalle_verification = intervalle_verification
+        self._derniere_verification = 0.0
+        self.inode = None
+        self.attacher()
+
+    def attacher(self):
+        with open(self.chemin, 'rb') as fichier:
+            statut = os.fstat(fichier.fileno())
+            entete = fichier.read(ENTETE.size)
+            if entete[:len(MAGIC)] != MAGIC or len(entete) < ENTETE.size:
+                raise ValueError(f"{self.chemin} n'est pas une table de profils (ou d'un ancien format : "
+                                 f"la reconstruire avec construire_table)")
+            _, version, age_min, nb_age, poids_min, nb_poids, fc_min, nb_fc, *coefficients = ENTETE.unpack(entete)
+            # La projection reste valide après la fermeture du fichier et son remplacement
+            self.valeurs = np.memmap(fichier, dtype=np.float64, mode='r', offset=TAILLE_ENTETE,
+                                     shape=(2, nb_age, nb_poids, nb_fc, len(GRANDEURS_TABLE)))
+        # Une ligne de GRANDEURS_TABLE par profil, indicée à plat
+        self._lignes = self.valeurs.reshape(-1, len(GRANDEURS_TABLE))
+        self.version = version
+        self.coefficients = dict(zip(CLES_COEFFICIENTS, coefficients))
+        self.minimums = (age_min, poids_min, fc_min)
+        self.tailles = (nb_age, nb_poids, nb_fc)
+        self.inode = (statut.st_dev, statut.st_ino)
+        self._derniere_verification = time.monotonic()
+
+    def actualiser(self, forcer=False):
+        """Rattache la table si le fichier a été remplacé ; retourne True en cas de bascule."""
+        maintenant = time.monotonic()
+        if not forcer and maintenant - self._derniere_verification < self.intervalle_verification:
+            return False
+        self._derniere_verification = maintenant
+        statut = os.stat(self.chemin)
+        if (statut.st_dev, statut.st_ino) == self.inode:
+            return False
+        self.attacher()
+        return True
+
+    def rechercher(self, age, sexe, poids, FCRepos):
+        """FCM, VO2max et VMA pour des tableaux d'athlètes : {'FCM', 'VO2max', 'VMA'}."""
+        self.actualiser()
+        age, sexe, poids, FCRepos = np.broadcast_arrays(np.asarray(age), np.asarray(sexe), np.asarray(poids),
+                                                        np.asarray(FCRepos))
+        # Sexe autre que 'H'/'F' : hors table, calculer_chaine_batch donne des NaN
+        femme = _est_sexe(sexe, 'F')
+        dans_grille = femme | _est_sexe(sexe, 'H')
+        indice = femme.astype(np.intp)
+        for valeur, minimum, taille in zip((age, poids, FCRepos), self.minimums, self.tailles):
+            with np.errstate(invalid='ignore'):  # NaN ou infini : hors grille
+                entier = valeur.astype(np.intp)
+            if valeur.dtype.kind != 'i':
+                dans_grille &= entier == valeur
+            entier -= minimum
+            # Une valeur négative devient très grande en non signé : un seul test de bornes
+            dans_grille &= entier.view(np.uintp) < taille
+            indice = indice * taille + entier
+        indice = np.where(dans_grille, indice, 0)
+        valeurs = self._lignes.take(indice, axis=0)
+
+        resultat = {nom: valeurs[..., i] for i, nom in enumerate(GRANDEURS_TABLE)}
+        if not np.all(dans_grille):
+            hors = ~dans_grille
+            chaine = calculer_chaine_batch(age[hors].astype(np.float64), sexe[hors], poids[hors].astype(np.float64),
+                                           FCRepos[hors].astype(np.float64), self.coefficients)
+            for nom in GRANDEURS_TABLE:
+                resultat[nom][hors] = chaine[nom]
+        return resultat
+
+    def calculer_zones(self, age, sexe, poids, FCRepos):
+        """Zones FC, de vitesse et d'allure (voir calculer_zones_batch) servies par la table."""
+        resultat = self.rechercher(age, sexe, poids, FCRepos)
+        resultat.update(calculer_zones_depuis(resultat['FCM'], resultat['VMA'], FCRepos))
+        return resultat
+
+
+def _travailleur(chemin, nb_requetes, graine):
+    table = TableProfils(chemin)
+    rng = np.random.default_rng(graine)
+    debut = time.perf_counter()
+    zones = table.calculer_zones(rng.integers(18, 70, nb_requetes), rng.choice(['H', 'F'], nb_requetes),
+                                 rng.integers(45, 100, nb_requetes), rng.integers(40, 80, nb_requetes))
+    return os.getpid(), time.perf_counter() - debut, float(zones['VMA'].mean())
+
+
+def _chronometrer(fonction, arguments):
+    debut = time.perf_counter()
+    fonction(*arguments)
+    return time.perf_counter() - debut
+
+
+if __name__ == '__main__':
+    from concurrent.futures import ProcessPoolExecutor
+
+    chemin = input('chemin de la table partagée (ex: tables_profils.bin) :')
+    nb_processus = int(input('nombre de processus :'))
+
+    debut = time.perf_counter()
+    construire_table(chemin)
+    print(f'\nTable construite en {(time.perf_counter() - debut) * 1000:.0f} ms '
+          f'({os.path.getsize(chemin) / 1e6:.1f} Mo partagés par tous les processus)')
+
+    # Recherche dans la table contre calcul direct de la chaîne, meilleur de 20 passages
+    table = TableProfils(chemin)
+    rng = np.random.default_rng(0)
+    profils = (rng.integers(18, 70, 100000), rng.choice(['H', 'F'], 100000),
+               rng.integers(45, 100, 100000), rng.integers(40, 80, 100000))
+    durees = {}
+    for nom, fonction in (('table', table.rechercher), ('formules', calculer_chaine_batch)):
+        durees[nom] = min(_chronometrer(fonction, profils) for _ in range(20))
+    print(f"100000 profils : table {durees['table'] * 1000:.1f} ms, formules {durees['formules'] * 1000:.1f} ms "
+          f"(x{durees['formules'] / durees['table']:.1f})")
+
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        for pid, duree, vma in executeur.map(_travailleur, [chemin] * nb_processus,
+                                             [100000] * nb_processus, range(nb_processus)):
+            print(f'Processus {pid} : 100000 profils en {duree * 1000:.1f} ms (VMA moyenne {vma:.2f} km/h)')
+
+    # Bascule atomique : un processus attaché voit la nouvelle table à sa prochaine vérification
+    table = TableProfils(chemin)
+    coefficients = dict(COEFFICIENTS, vma_constante=2.0)
+    construire_table(chemin, coefficients, version=VERSION_TABLES + 1)
+    print(f'\nAvant bascule : version {table.version}, VMA {table.rechercher(30, "H", 70, 55)["VMA"]:.3f}')
+    table.actualiser(forcer=True)
+    print(f'Après bascule : version {table.version}, VMA {table.rechercher(30, "H", 70, 55)["VMA"]:.3f}')
+    construire_table(chemin)
@@ -0,0 +1,150 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from Records.IndexRecords import CATEGORIES
+
+# Modèle de vitesse critique : distance = VitesseCritique * temps + D', valable pour
+# les efforts d'environ 2 à 30 minutes.
+DUREE_MIN_VC = 2
+DUREE_MAX_VC = 30
+# La VMA correspond à la vitesse tenue environ 6 minutes (comme calculer_vma_records)
+DUREE_VMA = 6
+# Modèle de Riegel : temps = coefficient * distance ** exposant
+EXPOSANT_RIEGEL_DEFAUT = 1.06
+
+
+def matrices_efforts(efforts):
+    """
+    Met les efforts de plusieurs athlètes sous forme de deux tableaux (athlètes, efforts)
+    complétés par NaN.
+
+    :param efforts: liste (par athlète) de listes de couples (temps en minutes, distance en km).
+    :return: (temps, distance).
+    """
+    largeur = max((len(e) for e in efforts), default=0)
+    temps = np.full((len(efforts), largeur), np.nan)
+    distance = np.full((len(efforts), largeur), np.nan)
+    for i, efforts_athlete in enumerate(efforts):
+        if efforts_athlete:
+            temps[i, :len(efforts_athlete)], distance[i, :len(efforts_athlete)] = zip(*efforts_athlete)
+    return temps, distance
+
+
+def efforts_depuis_records(index):
+    """Meilleur effort de chaque catégorie d'un IndexRecords : [(minutes, km)]."""
+    efforts = []
+    for categorie in CATEGORIES:
+        meilleurs = index.records(categorie)
+        if meilleurs:
+            valeur = meilleurs[0][0]
+            efforts.append((valeur, categorie[1]) if categorie[0] == 'distance' else (categorie[1], valeur))
+    return efforts
+
+
+def _regression(x, y, valides):
+    # Moindres carrés y = pente * x + origine, ligne par ligne, sur les seules valeurs valides
+    poids = valides.astype(np.float64)
+    x = np.where(valides, x, 0.0)
+    y = np.where(valides, y, 0.0)
+    n = poids.sum(axis=-1)
+    Sx, Sy = x.sum(axis=-1), y.sum(axis=-1)
+    Sxx, Sxy = (x * x).sum(axis=-1), (x * y).sum(axis=-1)
+    denominateur = n * Sxx - Sx * Sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pente = (n * Sxy - Sx * Sy) / denominateur
+        origine = (Sy - pente * Sx) / n
+        residus = np.where(valides, y - pente[..., None] * x - origine[..., None], 0.0)
+        ecarts = np.where(valides, y - (Sy / n)[..., None], 0.0)
+        r2 = 1 - (residus ** 2).sum(axis=-1) / (ecarts ** 2).sum(axis=-1)
+    # Deux points distincts au minimum
+    degenere = (n < 2) | (denominateur <= 1e-12 * np.maximum(n * Sxx, 1e-300))
+    return pente, origine, r2, n, degenere
+
+
+def ajuster_vitesse_critique(temps, distance, duree_min=DUREE_MIN_VC, duree_max=DUREE_MAX_VC):
+    """
+    Vitesse critique et D' de tous les athlètes par moindres carrés vectorisés.
+
+    :param temps: tableau (athlètes, efforts) en minutes, NaN pour un effort absent.
+    :param distance: tableau (athlètes, efforts) en km.
+    :return: dictionnaire de tableaux par athlète {'VitesseCritique' (km/h), 'DPrime' (m),
+             'VMA' (km/h), 'r2', 'nb_efforts'} ; NaN si l'ajustement est impossible.
+    """
+    temps = np.asarray(temps, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    valides = np.isfinite(temps) & np.isfinite(distance) & (temps >= duree_min) & (temps <= duree_max)
+    pente, origine, r2, n, degenere = _regression(temps, distance, valides)
+    invalide = degenere | ~(pente > 0)
+    VitesseCritique = np.where(invalide, np.nan, pente * 60)
+    DPrime = np.where(invalide, np.nan, np.maximum(origine, 0) * 1000)
+    return {
+        'VitesseCritique': VitesseCritique,
+        'DPrime': DPrime,
+        'VMA': VitesseCritique + DPrime / 1000 / DUREE_VMA * 60,
+        'r2': np.where(invalide, np.nan, r2),
+        'nb_efforts': n.astype(np.int64),
+    }
+
+
+def ajuster_riegel(temps, distance):
+    """
+    Coefficient et exposant de Riegel personnels (régression en log-log), tous athlètes à la fois.
+
+    Avec un seul effort, l'exposant vaut EXPOSANT_RIEGEL_DEFAUT et seul le coefficient est ajusté.
+    :return: {'coefficient' (minutes pour 1 km), 'exposant', 'nb_efforts'} ; NaN sans effort.
+    """
+    temps = np.asarray(temps, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    valides = np.isfinite(temps) & np.isfinite(distance) & (temps > 0) & (distance > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_distance = np.log(np.where(valides, distance, 1.0))
+        log_temps = np.log(np.where(valides, temps, 1.0))
+    pente, origine, _, n, degenere = _regression(log_distance, log_temps, valides)
+    exposant = np.where(degenere, EXPOSANT_RIEGEL_DEFAUT, pente)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moyenne = np.where(valides, log_temps - exposant[..., None] * log_distance, 0.0).sum(axis=-1) / n
+    origine = np.where(degenere, moyenne, origine)
+    return {
+        'coefficient': np.where(n > 0, np.exp(origine), np.nan),
+        'exposant': np.where(n > 0, exposant, np.nan),
+        'nb_efforts': n.astype(np.int64),
+    }
+
+
+def predire_temps_riegel(coefficient, exposant, distance):
+    """Temps prédit (minutes) sur distance (km)."""
+    return np.asarray(coefficient) * np.asarray(distance, dtype=np.float64) ** np.asarray(exposant)
+
+
+if __name__ == '__main__':
+    from Batch.ZonesBatch import calculer_zones_batch
+
+    nb_athletes = int(input("nombre d'athlètes à ajuster :"))
+    rng = np.random.default_rng(0)
+    vc_vraie = rng.uniform(9, 18, nb_athletes)       # km/h
+    dprime_vraie = rng.uniform(100, 300, nb_athletes)  # m
+    durees = np.sort(rng.uniform(2, 30, (nb_athletes, 6)), axis=1)
+    distance = (vc_vraie[:, None] * durees / 60 + dprime_vraie[:, None] / 1000) * rng.normal(1, 0.005, durees.shape)
+    durees[rng.random(durees.shape) < 0.2] = np.nan  # efforts manquants
+
+    debut = time.perf_counter()
+    vc = ajuster_vitesse_critique(durees, distance)
+    riegel = ajuster_riegel(durees, distance)
+    duree = time.perf_counter() - debut
+    ajustes = np.isfinite(vc['VitesseCritique'])
+    print(f'\n{nb_athletes} athlètes ajustés en {duree * 1000:.1f} ms ({ajustes.sum()} avec au moins deux efforts)')
+    print(f"Erreur médiane sur la vitesse critique : {np.median(np.abs(vc['VitesseCritique'] - vc_vraie)[ajustes]):.3f} km/h")
+    print(f"Exposant de Riegel médian : {np.nanmedian(riegel['exposant']):.3f}")
+
+    age = rng.integers(18, 70, nb_athletes)
+    sexe = rng.choice(['H', 'F'], nb_athletes)
+    poids = rng.integers(45, 100, nb_athletes)
+    FCRepos = rng.integers(40, 80, nb_athletes)
+    formule = calculer_zones_batch(age, sexe, poids, FCRepos)
+    ajustees = calculer_zones_batch(age, sexe, poids, FCRepos, VMA=vc['VMA'])
+    print(f"VMA médiane : {np.median(formule['VMA']):.2f} km/h par la formule, "
+          f"{np.median(ajustees['VMA']):.2f} km/h par la vitesse critique")
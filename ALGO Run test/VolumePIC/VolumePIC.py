@@ -4,11 +4,13 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from VMA.Formule_de_Leger_et_Mercier.Formule_de_Leger_et_Mercier import calculer_formule_de_Leger_Mercier
 
-def calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS):
+def calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA=None):
     DureeProgramme = DureeProgramme-3
     VolumePICSecurise = VolumeHebdoMoyenDistance * 1.10**DureeProgramme
     Vcible = ObjectifDistance / ObjectifTPS
-    VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
+    # La VMA mesurée (records, tests) remplace l'estimation par la formule si elle est fournie
+    if VMA is None:
+        VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
     A = 10 * (Vcible / VMA) - 5
     VolumePIC = ObjectifDistance * (1 + (A / ObjectifTPS))
     return(VolumePICSecurise, VolumePIC)
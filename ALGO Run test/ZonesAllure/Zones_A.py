@@ -15,13 +15,15 @@ from ZonesVitesse.Z3_V_70_80 import calculer_zone3_vitesse
 from ZonesVitesse.Z4_V_80_90 import calculer_zone4_vitesse
 from ZonesVitesse.Z5_V_90_100 import calculer_zone5_vitesse
 
-def calculer_zones_allure(age, sexe, poids, FCRepos):
+def calculer_zones_allure(age, sexe, poids, FCRepos, VMA=None):
     FCM = calculer_fcm(age, sexe, poids)
     if FCM is None:
         print('entrez soit H soit F :')
         return None, None, None, None, None
 
-    VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
+    # Une VMA mesurée ou ajustée (VitesseCritique) remplace l'estimation par la formule
+    if VMA is None:
+        VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
     
     if VMA is None or VMA <= 0:
         print("Avertissement : La VMA n'a pas pu être calculée ou est nulle. Impossible de déterminer les zones d'allure.")
@@ -8,12 +8,12 @@ from ZonesTPS.Zones_TPS_Z3 import calculer_Zones_TPS_Z3
 from ZonesTPS.Zones_TPS_Z4 import calculer_Zones_TPS_Z4
 from ZonesTPS.Zones_TPS_Z5 import calculer_Zones_TPS_Z5
 
-def calculer_Zones_TPS(age, sexe, poids, FCRepos, Distance):
-    zonesTPSZ1 = calculer_Zones_TPS_Z1(age, sexe, poids, FCRepos, Distance)
-    zonesTPSZ2 = calculer_Zones_TPS_Z2(age, sexe, poids, FCRepos, Distance)
-    zonesTPSZ3 = calculer_Zones_TPS_Z3(age, sexe, poids, FCRepos, Distance)
-    zonesTPSZ4 = calculer_Zones_TPS_Z4(age, sexe, poids, FCRepos, Distance)
-    zonesTPSZ5 = calculer_Zones_TPS_Z5(age, sexe, poids, FCRepos, Distance)
+def calculer_Zones_TPS(age, sexe, poids, FCRepos, Distance, VMA=None):
+    zonesTPSZ1 = calculer_Zones_TPS_Z1(age, sexe, poids, FCRepos, Distance, VMA)
+    zonesTPSZ2 = calculer_Zones_TPS_Z2(age, sexe, poids, FCRepos, Distance, VMA)
+    zonesTPSZ3 = calculer_Zones_TPS_Z3(age, sexe, poids, FCRepos, Distance, VMA)
+    zonesTPSZ4 = calculer_Zones_TPS_Z4(age, sexe, poids, FCRepos, Distance, VMA)
+    zonesTPSZ5 = calculer_Zones_TPS_Z5(age, sexe, poids, FCRepos, Distance, VMA)
     return(zonesTPSZ1, zonesTPSZ2, zonesTPSZ3, zonesTPSZ4, zonesTPSZ5)
 
 if __name__ == '__main__':
@@ -4,8 +4,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from ZonesAllure.Zones_A import calculer_zones_allure
 
-def calculer_Zones_TPS_Z1(age, sexe, poids, FCRepos, Distance):
-    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+def calculer_Zones_TPS_Z1(age, sexe, poids, FCRepos, Distance, VMA=None):
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
     zonesTPSZ1Bas = zonesAllure[0][0]*Distance
     zonesTPSZ1Haut = zonesAllure[0][1]*Distance
     return(zonesTPSZ1Bas, zonesTPSZ1Haut)
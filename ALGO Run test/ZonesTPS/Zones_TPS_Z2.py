@@ -4,8 +4,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from ZonesAllure.Zones_A import calculer_zones_allure
 
-def calculer_Zones_TPS_Z2(age, sexe, poids, FCRepos, Distance):
-    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+def calculer_Zones_TPS_Z2(age, sexe, poids, FCRepos, Distance, VMA=None):
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
     zonesTPSZ2Bas = zonesAllure[1][0]*Distance
     zonesTPSZ2Haut = zonesAllure[1][1]*Distance
     return(zonesTPSZ2Bas, zonesTPSZ2Haut)
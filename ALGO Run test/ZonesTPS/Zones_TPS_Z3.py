@@ -4,8 +4,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from ZonesAllure.Zones_A import calculer_zones_allure
 
-def calculer_Zones_TPS_Z3(age, sexe, poids, FCRepos, Distance):
-    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+def calculer_Zones_TPS_Z3(age, sexe, poids, FCRepos, Distance, VMA=None):
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
     zonesTPSZ3Bas = zonesAllure[2][0]*Distance
     zonesTPSZ3Haut = zonesAllure[2][1]*Distance
     return(zonesTPSZ3Bas, zonesTPSZ3Haut)
@@ -4,8 +4,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from ZonesAllure.Zones_A import calculer_zones_allure
 
-def calculer_Zones_TPS_Z4(age, sexe, poids, FCRepos, Distance):
-    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
+def calculer_Zones_TPS_Z4(age, sexe, poids, FCRepos, Distance, VMA=None):
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
     zonesTPSZ4Bas = zonesAllure[3][0]*Distance
     zonesTPSZ4Haut = zonesAllure[3][1]*Distance
     return(zonesTPSZ4Bas, zonesTPSZ4Haut)
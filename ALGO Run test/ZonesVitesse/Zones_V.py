@@ -10,12 +10,13 @@ from ZonesVitesse.Z3_V_70_80 import calculer_zone3_vitesse
 from ZonesVitesse.Z4_V_80_90 import calculer_zone4_vitesse
 from ZonesVitesse.Z5_V_90_100 import calculer_zone5_vitesse
 
-def calculer_zones_vitesse(age, sexe, poids, FCRepos):
+def calculer_zones_vitesse(age, sexe, poids, FCRepos, VMA=None):
     FCM = calculer_fcm(age, sexe, poids)
     if FCM is None:
         print('entrez soit H soit F :')
     else:
-        VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
+        if VMA is None:
+            VMA = calculer_formule_de_Leger_Mercier(age, sexe, poids, FCRepos)
         Z1 = calculer_zone1_vitesse(VMA, FCM, FCRepos)
         Z2 = calculer_zone2_vitesse(VMA, FCM, FCRepos)
         Z3 = calculer_zone3_vitesse(VMA, FCM, FCRepos)
@@ -3,6 +3,7 @@
 
 # --- Manipulation du Path Système ---
 import sys
+import time
 from pathlib import Path
 project_root = Path(__file__).resolve().parent
 if str(project_root) not in sys.path:
@@ -15,112 +16,148 @@ from VMA.Formule_de_Leger_et_Mercier.Formule_de_Leger_et_Mercier import calculer
 from VO2max.Formule_Niels_Uth.Formule_Niels_Uth import calculer_VO2max_formule_Niels_Uth
 from VO2max.Formule_Niels_Uth.K_dynamique_équation_de_régression_de_Ari_Voutilainen.K_dynamique import calculer_K_dynamique
 from VolumePIC.VolumePIC import calculer_volume_pic
-from PlanSemaine.NBSeance import calculer_NB_Seance
-from PlanSemaine.SeanceEF import generer_Seance_EF
-from PlanSemaine.VolumeDistance import calculer_Volume_Distance_Type
+from PlanSemaine.PhasesPlan import calculer_segments_phases, PARAMETRES_PHASES
+from PlanSemaine.SeanceQ.SeanceQVMA import generer_Seance_Q_VMA, VolumeEchauffement, arrondir_volume_q
+from PlanSemaine.SeanceQ.SeanceQSeuil import generer_Seance_Q_Seuil
 from ZonesAllure.Zones_A import calculer_zones_allure
 from ZonesFC.Methode_de_Karvonen.Zones_FC import calculer_zones_karvonen
 from ZonesTPS.Zones_TPS import calculer_Zones_TPS
 from ZonesVitesse.Zones_V import calculer_zones_vitesse
+from Rendu.RenduPlans import rendre_plan, allure_chaine, LANGUES
+from PlanSemaine.Planificateur import planifier_plan, masque_disponibilites, JOURS, TOUS_LES_JOURS
+from Historique.StockageActivites import StockageActivites
+from Historique.Dedoublonnage import calculer_volume_hebdo_moyen_dedoublonne
+
+# Longueur des cycles de progression (semaines), récupération comprise
+FORME_CYCLE_DEFAUT = 4
 
 # --- Fonctions de Génération du Plan Détaillé ---
 
 def get_allure_string(allure_minutes):
     """Convertit une allure décimale en chaîne min:sec."""
-    minutes = int(allure_minutes)
-    secondes = int((allure_minutes - minutes) * 60)
-    return f"{minutes}:{secondes:02d}"
+    return allure_chaine(allure_minutes)
 
-def generer_plan_entrainement_complet(profil):
+def generer_plan_structure(profil):
     """
-    Génère le plan d'entraînement détaillé semaine par semaine avec une progression cyclique.
+    Génère le plan semaine par semaine, phase par phase, sous forme structurée.
+
+    Les volumes, la répartition EF / qualité et le nombre de séances de chaque semaine
+    viennent de calculer_segments_phases (phases de profil['DureePhases'], ou tout le
+    programme en phase générale si elles sont absentes).
+
+    Chaque semaine est un dictionnaire {'semaine', 'phase', 'volume', 'nb_seances', 'seances'} et
+    chaque séance un dictionnaire {'type', 'distance', 'zone', 'allure', 'fc', 'temps_estime'} ;
+    les séances de qualité ajoutent 'echauffement', 'nb_repetitions', 'distance_repetition'
+    et 'recuperation'. Les allures sont des couples (rapide, lente) en min/km.
     """
     duree_totale = int(profil['DureeProgramme'])
-    volume_initial = profil['VolumeHebdoMoyenDistance']
-
-    plan_complet_str = ""
-    volume_semaine_precedente = volume_initial
-    volume_pic_cycle_precedent = volume_initial
-
-    # Logique de progression par cycles de 4 semaines (3 d'augmentation, 1 de récupération)
-    for semaine in range(1, duree_totale + 1):
-        plan_complet_str += f"\n--- SEMAINE {semaine}/{duree_totale} ---\n"
-
-        semaine_dans_cycle = (semaine - 1) % 4
-
-        if semaine_dans_cycle == 0:  # Semaine 1 du cycle
-            if semaine == 1:
-                volume_semaine = volume_initial
-            else:
-                # Le nouveau cycle commence au pic du cycle précédent pour une surcharge progressive
-                volume_semaine = volume_pic_cycle_precedent
-        elif semaine_dans_cycle < 3:  # Semaines 2 et 3: augmentation
-            volume_semaine = volume_semaine_precedente * 1.10
-        else:  # Semaine 4: récupération
-            volume_semaine = volume_semaine_precedente * 0.60  # Réduction de 40%
-
-        # Mettre à jour le pic si nécessaire (fin de la 3ème semaine)
-        if semaine_dans_cycle == 2:
-            volume_pic_cycle_precedent = volume_semaine
-        
-        volume_semaine_precedente = volume_semaine
-        volume_semaine = max(0, volume_semaine)
-        
-        nb_seances = calculer_NB_Seance(volume_semaine)
-        volume_ef, volume_q = calculer_Volume_Distance_Type(volume_semaine)
-        _, vol_ef_longue, vol_ef_courte, nb_ef_courtes = generer_Seance_EF(volume_semaine)
-        nb_seances_qualite = nb_seances - (1 + nb_ef_courtes)
-        if nb_seances_qualite < 0: nb_seances_qualite = 0
-        
-        plan_complet_str += f"Volume total cible : {volume_semaine:.1f} km en {nb_seances} séances.\n"
-        
-        # Détail des séances
-        allure_z2_min, allure_z2_max = profil['zonesAllure'][1]
-        allure_z2_moyenne = (allure_z2_min + allure_z2_max) / 2
-        
-        # Séance 1: EF Longue
-        temps_estime_efl = vol_ef_longue * allure_z2_moyenne
-        plan_complet_str += (
-            f"  1. Endurance Fondamentale (Longue) :\n"
-            f"     - Distance : {vol_ef_longue:.1f} km\n"
-            f"     - Zone de travail : Zone 2 (Endurance)\n"
-            f"     - Allure cible : {get_allure_string(allure_z2_max)}-{get_allure_string(allure_z2_min)} min/km\n"
-            f"     - FC cible : {profil['zonesFC'][1][0]:.0f}-{profil['zonesFC'][1][1]:.0f} bpm\n"
-            f"     - Temps estimé : ~{int(temps_estime_efl)} minutes\n"
-        )
-
-        # Séances EF Courtes
+    DureePhases = profil.get('DureePhases') or (duree_totale, 0, 0)
+    forme_cycle = int(profil.get('FormeCycle', FORME_CYCLE_DEFAUT))
+    segments = calculer_segments_phases(profil['VolumeHebdoMoyenDistance'], DureePhases, forme_cycle)
+
+    allure_z2_min, allure_z2_max = profil['zonesAllure'][1]
+    allure_z2_moyenne = (allure_z2_min + allure_z2_max) / 2
+    fc_z2 = tuple(profil['zonesFC'][1])
+    generateurs_q = {'VMA': (5, generer_Seance_Q_VMA), 'SEUIL': (4, generer_Seance_Q_Seuil)}
+
+    semaines = []
+    colonnes = zip(segments['phase'], segments['volume'], segments['volume_q'], segments['nb_seances'],
+                   segments['nb_ef_courtes'], segments['volume_ef_longue'], segments['volume_ef_courte'],
+                   segments['nb_qualite'], segments['type_qualite'])
+    for semaine, (phase, volume_semaine, volume_q, nb_seances, nb_ef_courtes, vol_ef_longue,
+                  vol_ef_courte, nb_seances_qualite, type_qualite) in enumerate(colonnes, 1):
+        nom_phase, _, _, types_qualite = PARAMETRES_PHASES[phase]
+
+        # Séance 1: EF Longue, puis les séances EF Courtes
+        seances = [{
+            'type': 'EF_LONGUE',
+            'distance': float(vol_ef_longue),
+            'zone': 2,
+            'allure': (allure_z2_min, allure_z2_max),
+            'fc': fc_z2,
+            'temps_estime': float(vol_ef_longue) * allure_z2_moyenne,
+        }]
         for i in range(nb_ef_courtes):
-             temps_estime_efc = vol_ef_courte * allure_z2_moyenne
-             plan_complet_str += (
-                f"  {2+i}. Endurance Fondamentale (Courte) :\n"
-                f"     - Distance : {vol_ef_courte:.1f} km\n"
-                f"     - Zone de travail : Zone 2 (Endurance)\n"
-                f"     - Allure / FC : Mêmes que la sortie longue\n"
-                f"     - Temps estimé : ~{int(temps_estime_efc)} minutes\n"
-            )
-
-        # Séances de Qualité
+            seances.append({
+                'type': 'EF_COURTE',
+                'distance': float(vol_ef_courte),
+                'zone': 2,
+                'allure': (allure_z2_min, allure_z2_max),
+                'fc': fc_z2,
+                'temps_estime': float(vol_ef_courte) * allure_z2_moyenne,
+            })
+
+        # Séances de Qualité : types de la phase, alternés d'une semaine à l'autre
         if nb_seances_qualite > 0:
-            volume_par_seance_q = volume_q / nb_seances_qualite
-            allure_z4_min, allure_z4_max = profil['zonesAllure'][3]
-            allure_z4_moyenne = (allure_z4_min + allure_z4_max) / 2
-
-            # Estimation du temps pour une séance de qualité type
-            # (Ex: 2km échauffement/calme en Z2 + reste du volume en Z4)
-            vol_travail_z4 = max(0, volume_par_seance_q - 2)
-            temps_estime_q = (2 * allure_z2_moyenne) + (vol_travail_z4 * allure_z4_moyenne)
-
-            plan_complet_str += (
-                f"  - {nb_seances_qualite} séance(s) de Qualité (Total: {volume_q:.1f} km) :\n"
-                f"     - NOTE : La logique pour le contenu (ex: 6x400m) n'est pas définie. Ceci est une suggestion.\n"
-                f"     - Suggestion : Alterner des séances de VMA (Zone 5) et de Seuil (Zone 4).\n"
-                f"     - Ex. pour une séance au seuil de {volume_par_seance_q:.1f}km :\n"
-                f"       - Allure travail : {get_allure_string(allure_z4_max)}-{get_allure_string(allure_z4_min)} min/km (Zone 4).\n"
-                f"       - Temps estimé total (avec échauffement/calme) : ~{int(temps_estime_q)} minutes.\n"
-            )
-            
-    return plan_complet_str
+            volume_par_seance_q = float(volume_q) / nb_seances_qualite
+            for j in range(nb_seances_qualite):
+                type_q = types_qualite[(type_qualite + j) % len(types_qualite)]
+                zone, generer_seance_q = generateurs_q[type_q]
+                seance_q = generer_seance_q(volume_par_seance_q, profil['zonesAllure'])
+                nb_rep, distance_rep, recuperation, allure_rapide, allure_lente, temps_estime_q = seance_q
+                if nb_rep == 0:
+                    # Volume trop faible pour du travail après l'échauffement : footing en Zone 2
+                    seances.append({
+                        'type': 'EF_COURTE',
+                        'distance': volume_par_seance_q,
+                        'zone': 2,
+                        'allure': (allure_z2_min, allure_z2_max),
+                        'fc': fc_z2,
+                        'temps_estime': volume_par_seance_q * allure_z2_moyenne,
+                    })
+                    continue
+                seances.append({
+                    'type': type_q,
+                    # Volume sur lequel la séance est construite (tranche de 0.5 km)
+                    'distance': arrondir_volume_q(volume_par_seance_q),
+                    'zone': zone,
+                    'allure': (allure_rapide, allure_lente),
+                    'fc': tuple(profil['zonesFC'][zone - 1]),
+                    'temps_estime': temps_estime_q,
+                    'echauffement': VolumeEchauffement,
+                    'nb_repetitions': nb_rep,
+                    'distance_repetition': distance_rep,
+                    'recuperation': recuperation,
+                })
+
+        semaines.append({'semaine': semaine, 'phase': nom_phase, 'volume': float(volume_semaine),
+                         'nb_seances': int(nb_seances), 'seances': seances})
+
+    return semaines
+
+def formater_plan(semaines, langue='fr', format_sortie='texte', total=None):
+    """
+    Met en forme un plan structuré (voir generer_plan_structure) en texte, Markdown ou HTML,
+    en français ou en anglais (voir Rendu/RenduPlans.py). total : nombre de semaines du plan
+    complet quand semaines n'en est qu'une partie.
+    """
+    return rendre_plan(semaines, langue, format_sortie, total)
+
+def generer_plan_entrainement_complet(profil, langue='fr', format_sortie='texte', disponibilites=None):
+    """
+    Génère le plan d'entraînement détaillé semaine par semaine, sous forme de texte.
+    disponibilites : masque des jours disponibles (voir PlanSemaine/Planificateur.py) ; s'il
+    est fourni, les séances sont placées sur les jours et listées dans l'ordre de la semaine.
+    """
+    semaines = generer_plan_structure(profil)
+    if disponibilites is not None:
+        planifier_plan(semaines, disponibilites)
+    return formater_plan(semaines, langue, format_sortie)
+
+def calculer_profil(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA=None):
+    """
+    Calcule le profil complet (zones, volume pic, phases) utilisé par la génération du plan.
+    VMA remplace, si elle est fournie, l'estimation par la formule de Léger et Mercier.
+    """
+    profil = {}
+    profil['zonesAllure'] = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
+    profil['zonesVitesse'] = calculer_zones_vitesse(age, sexe, poids, FCRepos, VMA)
+    profil['zonesFC'] = calculer_zones_karvonen(age, sexe, poids, FCRepos)
+    profil['VolumePIC'] = calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA=VMA)
+    profil['DureePhases'] = calculer_Duree_Phases(ObjectifDistance, DureeProgramme)
+    profil['DureeProgramme'] = DureeProgramme
+    profil['VolumeHebdoMoyenDistance'] = VolumeHebdoMoyenDistance
+    return profil
 
 # --- Bloc d'Exécution Principal ---
 if __name__ == '__main__':
@@ -131,29 +168,45 @@ if __name__ == '__main__':
         sexe = input('Entrez H (Homme) ou F (Femme) : ').upper()
         poids = int(input('Votre poids (en kg) : '))
         FCRepos = int(input('Votre FC au repos (bpm) : '))
-        VolumeHebdoMoyenDistance = float(input('Votre volume hebdomadaire moyen de course (en km) : '))
+        chemin_historique = input("Fichier d'historique (laisser vide pour saisir votre volume) : ")
+        if chemin_historique:
+            athlete = input("Votre identifiant d'athlète : ")
+            # Une sortie synchronisée par plusieurs sources (Garmin, Strava...) n'est comptée qu'une fois
+            VolumeHebdoMoyenDistance = calculer_volume_hebdo_moyen_dedoublonne(StockageActivites(chemin_historique),
+                                                                               athlete, time.time())
+            print(f"Volume hebdomadaire moyen sur les 4 dernières semaines : {VolumeHebdoMoyenDistance:.1f} km")
+        else:
+            VolumeHebdoMoyenDistance = float(input('Votre volume hebdomadaire moyen de course (en km) : '))
         print("\n--- Objectifs de votre Plan ---")
         ObjectifDistance = float(input('Votre objectif de distance de course (en km) : '))
         ObjectifTPS = float(input('Votre objectif de temps pour cette distance (en minutes) : '))
         DureeProgramme = float(input('Durée totale de votre programme (en semaines) : '))
+        langue = input(f"Langue du plan ({'/'.join(LANGUES)}, fr par défaut) : ").strip().lower() or 'fr'
+        while langue not in LANGUES:
+            langue = input(f"Langue inconnue, choisissez parmi {', '.join(LANGUES)} : ").strip().lower() or 'fr'
         
         # --- Calcul du Profil Complet ---
-        profil = {}
-        profil['zonesAllure'] = calculer_zones_allure(age, sexe, poids, FCRepos)
-        profil['zonesVitesse'] = calculer_zones_vitesse(age, sexe, poids, FCRepos)
-        profil['zonesFC'] = calculer_zones_karvonen(age, sexe, poids, FCRepos)
-        profil['VolumePIC'] = calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS)
-        profil['DureePhases'] = calculer_Duree_Phases(ObjectifDistance, DureeProgramme)
-        profil['DureeProgramme'] = DureeProgramme
-        profil['VolumeHebdoMoyenDistance'] = VolumeHebdoMoyenDistance
+        profil = calculer_profil(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS)
+
+        jours = input('Vos jours disponibles (ex: lundi,mercredi,samedi,dimanche ; vide = tous) : ')
+        disponibilites = masque_disponibilites(jours.split(',')) if jours.strip() else TOUS_LES_JOURS
 
         # --- Génération et Affichage du Plan ---
+        semaines = generer_plan_structure(profil)
+        impossibles = planifier_plan(semaines, disponibilites)
         print('\n\n--- VOTRE PLAN D\'ENTRAÎNEMENT DÉTAILLÉ ---')
-        plan_detaille = generer_plan_entrainement_complet(profil)
+        plan_detaille = formater_plan(semaines, langue)
         print(plan_detaille)
+
+        print('\n--- CALENDRIER ---')
+        for semaine in semaines:
+            if semaine['semaine'] in impossibles:
+                print(f"Semaine {semaine['semaine']} : trop de séances pour vos jours disponibles")
+                continue
+            print(f"Semaine {semaine['semaine']} : "
+                  + ', '.join(f"{JOURS[seance['jour']]} {seance['type']}" for seance in semaine['seances']))
         
         print("\nNOTE: Ce plan est une proposition générée automatiquement.")
-        print("Les séances de 'Qualité' sont à structurer (ex: intervalles, fartlek, seuil).")
 
     except (ValueError, TypeError):
         print("\nErreur : Donnée invalide. Veuillez vérifier que toutes les valeurs numériques sont correctes.")
@@ -5,12 +5,12 @@ from ZonesTPS.Zones_TPS import calculer_Zones_TPS
 from VolumePIC.VolumePIC import calculer_volume_pic
 from DureePhases.DureePhases import calculer_Duree_Phases
 
-def calculer(age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS):
-    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos)
-    zonesVitesse = calculer_zones_vitesse(age, sexe, poids, FCRepos)
+def calculer(age, sexe, poids, FCRepos, Distance, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA=None):
+    zonesAllure = calculer_zones_allure(age, sexe, poids, FCRepos, VMA)
+    zonesVitesse = calculer_zones_vitesse(age, sexe, poids, FCRepos, VMA)
     zonesFC = calculer_zones_karvonen(age, sexe, poids, FCRepos)
-    zonesTPS = calculer_Zones_TPS(age, sexe, poids, FCRepos, Distance)
-    VolumePIC = calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS)
+    zonesTPS = calculer_Zones_TPS(age, sexe, poids, FCRepos, Distance, VMA)
+    VolumePIC = calculer_volume_pic(age, sexe, poids, FCRepos, VolumeHebdoMoyenDistance, DureeProgramme, ObjectifDistance, ObjectifTPS, VMA=VMA)
     DureePhases = calculer_Duree_Phases(ObjectifDistance, DureeProgramme)
     return (zonesAllure, zonesFC, zonesVitesse, zonesTPS, VolumePIC, DureePhases)
 